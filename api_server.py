@@ -0,0 +1,263 @@
+"""JSON API over the results, for scripts and other services.
+
+Serves the same data as the app's load_data() (the results store, or the
+results file merged with results.d and reloaded when it changes):
+
+    GET /models                                       models, district count and mean WER
+    GET /models/{model}/districts                     WER and sample count per district
+    GET /models/{model}/districts/{district}/samples  one page, ?page=1&per_page=50
+    GET /models/{model}/wer                           WER per district, in one district order for all models
+
+Each response is encoded, gzip-compressed and given a content-hash ETag
+once per data version; the model and district listings are built as soon
+as a new version is seen. Serving a request is then a dict lookup, and a
+poll whose If-None-Match still matches gets an empty 304.
+
+    python api_server.py --port 8767
+    curl --compressed http://localhost:8767/models/Google/districts
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+
+from comparison import get_wer_matrix
+from data_cache import Memo
+from live_results import results_source
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+DATA_FILE = Path(os.environ.get("ASR_DATA_FILE", DATA_DIR / "sample5renamed.json.json"))
+RESULTS_DIR = Path(os.environ.get("ASR_RESULTS_DIR", DATA_DIR / "results.d"))
+RESULTS_STORE_DIR = Path(os.environ.get("ASR_RESULTS_STORE_DIR", DATA_DIR / "results_store"))
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+# Bodies smaller than this aren't worth a Content-Encoding
+MIN_GZIP_BYTES = 256
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Response:
+    """An encoded JSON body, its gzip form (if smaller) and ETag"""
+    __slots__ = ("status", "body", "gzipped", "etag")
+
+    def __init__(self, value: Any, status: int = 200):
+        self.status = status
+        self.body = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        gzipped = gzip.compress(self.body, 6) if len(self.body) >= MIN_GZIP_BYTES else None
+        self.gzipped = gzipped if gzipped is not None and len(gzipped) < len(self.body) else None
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+
+
+def _wer(value) -> Optional[float]:
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class ResultsApi:
+    """Routes API paths to cached responses over the current results"""
+
+    def __init__(self, source: Callable[[], Any], max_responses: int = 4096):
+        self._source = source
+        self._responses = Memo(max_entries=max_responses, name='api_responses')
+        self._warm_lock = threading.Lock()
+        self._warmed = None
+
+    def _data(self) -> Tuple[Any, Tuple[Optional[str], int]]:
+        data = self._source()
+        version = (getattr(data, 'version', None), id(data))
+        if self._warmed != version:
+            with self._warm_lock:
+                if self._warmed != version:
+                    # Responses hold their data alive: drop the superseded versions'
+                    self._responses.retain(lambda key: key[0] == version)
+                    self._warmed = version
+                    try:
+                        self._warm(data, version)
+                    except Exception:
+                        # The failing routes answer 500 on their own; the rest stay up
+                        logger.exception("Building the listings of version %s failed", version[0])
+        return data, version
+
+    def _warm(self, data, version):
+        """Build the listings of a new data version before serving it"""
+        self._cached(data, version, ('models',))
+        for model in data:
+            self._cached(data, version, ('districts', model))
+            self._cached(data, version, ('wer', model))
+
+    def _cached(self, data, version, route: Tuple) -> Response:
+        if version != self._warmed:
+            # A request still on a superseded version: answer without caching it
+            return Response(self._build(data, version, route))
+        return self._responses.get((version, route), lambda: Response(self._build(data, version, route)), refs=data)
+
+    def _build(self, data, version, route: Tuple) -> Dict[str, Any]:
+        kind = route[0]
+        if kind == 'models':
+            matrix = get_wer_matrix(data, version[0])
+            models = []
+            for model in data:
+                row = matrix.row(model)
+                present = row[~np.isnan(row)]
+                models.append({'name': model, 'districts': len(data[model]),
+                               'mean_wer': _wer(present.mean()) if len(present) else None})
+            return {'version': version[0], 'models': models}
+        model = route[1]
+        if kind == 'districts':
+            return {'model': model, 'districts': {
+                district: {'wer': _wer(district_data['WER']), 'samples': len(district_data.get('Samples', {}))}
+                for district, district_data in data[model].items()
+            }}
+        if kind == 'wer':
+            matrix = get_wer_matrix(data, version[0])
+            return {'model': model, 'districts': matrix.districts,
+                    'wer': [_wer(value) for value in matrix.row(model).tolist()]}
+        _, model, district, page, per_page = route
+        samples = data[model][district].get('Samples', {})
+        start = (page - 1) * per_page
+        return {
+            'model': model, 'district': district, 'page': page, 'per_page': per_page, 'total': len(samples),
+            'samples': [dict(sample, id=sample_id) for sample_id, sample in islice(samples.items(), start, start + per_page)],
+        }
+
+    def get(self, path: str) -> Response:
+        """Response for a request path (with query string); raises ApiError"""
+        parsed = urlparse(path)
+        parts = [unquote(part) for part in parsed.path.strip('/').split('/')]
+        if not parts or parts[0] != 'models':
+            raise ApiError(404, "Not found")
+        data, version = self._data()
+        if len(parts) == 1:
+            return self._cached(data, version, ('models',))
+        model = parts[1]
+        if model not in data:
+            raise ApiError(404, f"Unknown model '{model}'")
+        if parts[2:] == ['districts']:
+            return self._cached(data, version, ('districts', model))
+        if parts[2:] == ['wer']:
+            return self._cached(data, version, ('wer', model))
+        if len(parts) == 5 and parts[2] == 'districts' and parts[4] == 'samples':
+            district = parts[3]
+            if district not in data[model]:
+                raise ApiError(404, f"Unknown district '{district}' for model '{model}'")
+            query = parse_qs(parsed.query)
+            try:
+                page = int(query.get('page', ['1'])[0])
+                per_page = int(query.get('per_page', [str(DEFAULT_PER_PAGE)])[0])
+            except ValueError:
+                raise ApiError(400, "page and per_page must be integers")
+            if page < 1 or not 1 <= per_page <= MAX_PER_PAGE:
+                raise ApiError(400, f"page must be >= 1 and per_page between 1 and {MAX_PER_PAGE}")
+            return self._cached(data, version, ('samples', model, district, page, per_page))
+        raise ApiError(404, "Not found")
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    return header.strip() == '*' or etag in (tag.strip() for tag in header.split(','))
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    api: ResultsApi = None
+    # Keep-alive: pollers reuse one connection. Headers and body are separate
+    # writes, so Nagle would hold the body back for the client's delayed ACK
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _serve(self, with_body: bool):
+        try:
+            response = self.api.get(self.path)
+        except ApiError as e:
+            response = Response({'error': str(e)}, e.status)
+        except Exception as e:
+            # e.g. a malformed record; answer rather than drop the connection
+            response = Response({'error': f"Internal error: {e}"}, 500)
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+        if response.status == 200:
+            headers['ETag'] = response.etag
+            if _etag_matches(self.headers.get('If-None-Match'), response.etag):
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+        body = response.body
+        if response.gzipped is not None and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = response.gzipped
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(body))
+        self.send_response(response.status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._serve(with_body=True)
+
+    def do_HEAD(self):
+        self._serve(with_body=False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_api(data_file=DATA_FILE, results_dir=RESULTS_DIR, store_dir=RESULTS_STORE_DIR,
+              host='127.0.0.1', port=8767, interval=5.0):
+    try:
+        ApiRequestHandler.api = ResultsApi(results_source(data_file, results_dir, store_dir, interval))
+        ApiRequestHandler.api.get('/models')
+        server = ThreadingHTTPServer((host, port), ApiRequestHandler)
+        print(f"Serving the results API on http://{host}:{server.server_port}/models")
+        server.serve_forever()
+        return True
+    except KeyboardInterrupt:
+        return True
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve the results as a JSON API with ETags and gzip')
+    parser.add_argument('--data', default=str(DATA_FILE), help='Path to the results JSON file')
+    parser.add_argument('--results-dir', default=str(RESULTS_DIR), help='Directory of more results files')
+    parser.add_argument('--store-dir', default=str(RESULTS_STORE_DIR),
+                        help='Results store written by results_store.py (used when present)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8767, help='Port to listen on')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between checks for changed results')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided arguments
+    serve_api(args.data, args.results_dir, args.store_dir, args.host, args.port, args.interval)
@@ -1,20 +1,43 @@
 import streamlit as st
-import json
-import folium
-from streamlit_folium import folium_static, st_folium
-import pandas as pd
-import requests
-from typing import Dict, Any, List
-from shapely.geometry import Point, shape
+from typing import Dict, Any
 import base64
 from pathlib import Path
 import os
+import math
+import threading
+from functools import partial
+from itertools import islice
+from urllib.parse import quote
+from bootstrap import CONFIDENCE, format_estimate, format_interval, get_wer_intervals, get_wer_intervals_nowait
+from comparison import get_comparison_view, get_wer_matrix
+from data_cache import cache_stats, file_version, load_file, load_json, memo_stats
+from district_join import get_district_join, read_district_join
+from error_analysis import KINDS, MAX_TOP, format_item, get_error_tables_nowait, update_error_tables
+from instrumentation import end_run, metrics, serve_metrics, stage, start_run
+from live_results import ResultsSnapshot, get_live_results, results_source
+from map_cache import get_rendered_map, render_cache_stats, show_rendered_map
+from map_layers import get_india_layer, get_view_layer, get_wer_layers
+from map_styles import BIN_COLORS, BIN_LABELS, get_district_bins, make_styles, wer_color
+from search_index import get_search_index
+from topology import read_topojson
 
 # Get absolute path to this file's directory
 CURRENT_DIR = Path(__file__).parent
-LOGO_DIR = CURRENT_DIR / "logo"
+STATIC_DIR = CURRENT_DIR / "static"  # Logos, served at app/static/ (.streamlit/config.toml)
 DATA_DIR = CURRENT_DIR / "data"
 STATES_DIR = CURRENT_DIR / "states"  # Directory for state data
+DATA_FILE = Path(os.environ.get("ASR_DATA_FILE", DATA_DIR / "sample5renamed.json.json")) # Using updated filename from your paste
+INDIA_LAYER_FILE = DATA_DIR / "india_districts.json"  # Output of merge_states.py
+DISTRICT_JOIN_FILE = DATA_DIR / "district_join.json"  # Output of district_join.py
+RESULTS_STORE_DIR = Path(os.environ.get("ASR_RESULTS_STORE_DIR", DATA_DIR / "results_store"))  # Output of results_store.py
+RESULTS_DIR = Path(os.environ.get("ASR_RESULTS_DIR", DATA_DIR / "results.d"))  # More results files, merged over DATA_FILE
+RESULTS_POLL_SECONDS = float(os.environ.get("RESULTS_POLL_SECONDS", 5))  # How often result files are checked for changes
+SAMPLE_PAGE_SIZES = [10, 20, 50]  # Sample Analysis page sizes
+SEARCH_RESULT_LIMIT = 20  # Transcript search results shown
+TILE_SERVER_URL = os.environ.get("TILE_SERVER_URL")  # e.g. http://localhost:8765 (tile_server.py)
+AUDIO_PROXY_URL = os.environ.get("AUDIO_PROXY_URL")  # e.g. http://localhost:8766 (audio_proxy.py)
+DEBUG_PANEL = bool(os.environ.get("DEBUG_PANEL"))  # Or ?debug=1 in the URL
+PERF_METRICS_PORT = os.environ.get("PERF_METRICS_PORT")  # Prometheus /metrics (instrumentation.py)
 
 # Set page configuration
 st.set_page_config(
@@ -22,8 +45,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Inject CSS for theme-aware styling
-st.markdown("""
+# Theme-aware styles for the whole page, injected once per rerun
+APP_CSS = """
     <style>
     .sample-box {
         padding: 10px;
@@ -123,96 +146,106 @@ st.markdown("""
         border-radius: 5px;
         margin: 10px 0;
     }
-    </style>
-    
-    <script>
-    function downloadAudio(url, filename) {
-        fetch(url)
-            .then(response => response.blob())
-            .then(blob => {
-                const a = document.createElement('a');
-                a.href = URL.createObjectURL(blob);
-                a.download = filename;
-                document.body.appendChild(a);
-                a.click();
-                document.body.removeChild(a);
-            });
-    }
-    .logo-container {
+
+    /* Header and footer */
+    .navbar {
         display: flex;
-        align-items: center;
         justify-content: space-between;
-        padding: 10px 0;
+        align-items: center;
+        padding: 10px 20px;
+        background-color: var(--secondary-background-color);
+        border-radius: 5px;
         margin-bottom: 20px;
     }
-    
-    .logo-img {
-        max-height: 60px;
+    .navbar .title {
+        font-size: 50px;
+        font-weight: bold;
+        color: #00B4FF;
+        font-family: Arial, sans-serif;
+        text-decoration: none;
+    }
+    .navbar .title:hover {
+        color: #0056b3;
+        text-decoration: none;
+    }
+    .navbar .subtitle {
+        font-size: 20px;
+        color: var(--text-color);
+        font-family: Arial, sans-serif;
+        margin-top: -10px;
+    }
+    .navbar .spacer {
+        flex-grow: 1;
+    }
+    .navbar img {
+        max-height: 80px;
+        width: auto;
+    }
+
+    .footer {
+        width: 100%;
+        background-color: white;
+        text-align: center;
+        padding: 120px 0;
+        margin-top: 100px;
+        border-top: 1px solid #eee;
+    }
+    .footer-content {
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        max-width: 800px;
+        margin: 0 auto;
+    }
+    .footer img.google-logo {
+        height: 100px;
+        width: auto;
+        object-fit: contain;
+    }
+    .footer img.bhashini-logo {
+        height: 350px;  /* Increased height for Bhashini logo */
+        width: auto;
+        object-fit: contain;
+        margin-left: -10px;  /* Negative margin to bring logos closer */
+    }
+    .footer img {
+        height: 80px;
         width: auto;
+        object-fit: contain;
+        margin: 0 20px;
     }
     
-    .logo-title {
-        color: var(--text-color);
-        font-size: 24px;
-        margin: 0;
-        padding: 0;
+    .footer-text {
+        color: #666;
+        font-size: 14px;
+        margin-bottom: -50px;  /* Decreased bottom margin */
+        margin-top: 0px;    /* Decreased top margin */
     }
-    </script>
-""", unsafe_allow_html=True)
+    </style>
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Helper functions
-def get_base64_encoded_image(image_path):
+def png_data_uri(raw):
+    return "data:image/png;base64," + base64.b64encode(raw).decode()
+
+def logo_src(file_name):
+    """Image URL of a logo in static/
+
+    Linked from Streamlit's static file server when static serving is on,
+    so browsers fetch and cache it once; otherwise inlined as a data URI,
+    encoded once per process.
+    """
+    if st.get_option("server.enableStaticServing"):
+        return f"app/static/{file_name}"
     try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
+        return load_file(STATIC_DIR / file_name, png_data_uri)
     except Exception as e:
-        st.error(f"Error loading image {image_path}: {str(e)}")
+        st.error(f"Error loading image {file_name}: {str(e)}")
         return ""
     
 def add_logo():
-    # Load all logos using absolute paths
-    logo_artpark = LOGO_DIR / "ARTPARK.png"
-    logo_iisc = LOGO_DIR / "IISC.png"
-    logo_bhashini = LOGO_DIR / "bhashini.png"
-
-    
     st.markdown(f"""
-        <style>
-        .navbar {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 10px 20px;
-            background-color: var(--secondary-background-color);
-            border-radius: 5px;
-            margin-bottom: 20px;
-        }}
-        .navbar .title {{
-            font-size: 50px;
-            font-weight: bold;
-            color: #00B4FF;
-            font-family: Arial, sans-serif;
-            text-decoration: none;
-        }}
-        .navbar .title:hover {{
-            color: #0056b3;
-            text-decoration: none;
-        }}
-        .navbar .subtitle {{
-            font-size: 20px;
-            color: var(--text-color);
-            font-family: Arial, sans-serif;
-            margin-top: -10px;
-        }}
-        .navbar .spacer {{
-            flex-grow: 1;
-        }}
-        .navbar img {{
-            max-height: 80px;
-            width: auto;
-        }}
-        </style>
-        
         <!-- Navbar -->
         <div class="navbar">
             <div>
@@ -222,10 +255,10 @@ def add_logo():
                 <div class="subtitle">State-of-the-art ASR performance on VAANI data</div>
             </div>
             <div class="spacer"></div>
-            <img src="data:image/png;base64,{get_base64_encoded_image(logo_iisc)}" alt="IISC Logo">
-            <img src="data:image/png;base64,{get_base64_encoded_image(logo_bhashini)}" alt="Bhashini Logo" style="max-height: 60px; width: auto; margin-right: 20px;">
+            <img src="{logo_src('IISC.png')}" alt="IISC Logo">
+            <img src="{logo_src('bhashini.png')}" alt="Bhashini Logo" style="max-height: 60px; width: auto; margin-right: 20px;">
             <a href="https://artpark.in/language-data-ai" target="_blank">
-                <img src="data:image/png;base64,{get_base64_encoded_image(logo_artpark)}" alt="ARTPARK Logo">
+                <img src="{logo_src('ARTPARK.png')}" alt="ARTPARK Logo">
             </a>
         </div>
     """, unsafe_allow_html=True)
@@ -234,121 +267,391 @@ def add_logo():
     st.markdown("<br>", unsafe_allow_html=True)
 
 def add_footer():
-    logo_google = LOGO_DIR / "google.png"
-    logo_bmgf = LOGO_DIR / "bmgf.png"
-    logo_giz = LOGO_DIR / "giz-logo.png"
     st.markdown(f"""
-        <style>
-        .footer {{
-            width: 100%;
-            background-color: white;
-            text-align: center;
-            padding: 120px 0;
-            margin-top: 100px;
-            border-top: 1px solid #eee;
-        }}
-        .footer-content {{
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            max-width: 800px;
-            margin: 0 auto;
-        }}
-        .footer img.google-logo {{
-            height: 100px;
-            width: auto;
-            object-fit: contain;
-        }}
-        .footer img.bhashini-logo {{
-            height: 350px;  /* Increased height for Bhashini logo */
-            width: auto;
-            object-fit: contain;
-            margin-left: -10px;  /* Negative margin to bring logos closer */
-        }}
-        .footer img {{
-            height: 80px;
-            width: auto;
-            object-fit: contain;
-            margin: 0 20px;
-        }}
-        
-        .footer-text {{
-            color: #666;
-            font-size: 14px;
-            margin-bottom: -50px;  /* Decreased bottom margin */
-            margin-top: 0px;    /* Decreased top margin */
-        }}
-        </style>
-        
         <div class="footer">
             <div class="footer-text">Supported By</div>
             <div class="footer-content">
-                <img class="bhashini-logo" src="data:image/png;base64,{base64.b64encode(open(logo_google, 'rb').read()).decode()}" alt="Google Logo">
-                <img src="data:image/png;base64,{base64.b64encode(open(logo_bmgf, 'rb').read()).decode()}" alt="BMGF Logo">
-                <img src="data:image/png;base64,{base64.b64encode(open(logo_giz, 'rb').read()).decode()}" alt="GIZ Logo">
+                <img class="bhashini-logo" src="{logo_src('google.png')}" alt="Google Logo">
+                <img src="{logo_src('bmgf.png')}" alt="BMGF Logo">
+                <img src="{logo_src('giz-logo.png')}" alt="GIZ Logo">
             </div>
         </div>
     """, unsafe_allow_html=True)
     
 def load_state_geojson(state_name: str) -> Dict[str, Any]:
-    """Load GeoJSON for specified state"""
+    """Load GeoJSON for specified state (shared, read-only copy)
+
+    Prefers the TopoJSON file written by topojson_convert.py when present.
+    """
+    topojson_path = STATES_DIR / f"{state_name}.topojson"
     file_path = STATES_DIR / f"{state_name}.json"
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if topojson_path.exists():
+            return load_file(topojson_path, read_topojson)
+        return load_json(file_path)
     except Exception as e:
         st.error(f"Error loading {state_name} GeoJSON: {str(e)}")
         return None
 
+def load_india_layer(base_geojsons: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Load the merged all-India district layer written by merge_states.py,
+    or build it from the state layers if it has not been generated"""
+    if INDIA_LAYER_FILE.exists():
+        try:
+            return load_json(INDIA_LAYER_FILE)
+        except Exception as e:
+            st.error(f"Error loading merged district layer: {str(e)}")
+    return get_india_layer(base_geojsons)
+
 def load_data():
-    """Load sample data for ASR metrics"""
+    """Load sample data for ASR metrics (shared, read-only copy)
+
+    Uses the memory-mapped store written by results_store.py when present, so
+    only the model/district slices a rerun touches are decoded. Otherwise
+    serves the current snapshot of DATA_FILE merged with the files in
+    RESULTS_DIR, which is swapped in the background when any of them change.
+    """
     try:
-        file_path = DATA_DIR / "sample5renamed.json.json" # Using updated filename from your paste
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        data = results_source(DATA_FILE, RESULTS_DIR, RESULTS_STORE_DIR, RESULTS_POLL_SECONDS)()
+        if not data:
+            raise ValueError(f"no results in '{DATA_FILE}'")
+        return data
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
 
+def data_version(data) -> str:
+    """Version token of the loaded results, used to key derived caches"""
+    return getattr(data, 'version', None) or file_version(DATA_FILE)
+
+def data_summary(data, join):
+    """Model, district and state counts for the Data Summary panel
+
+    Counted from the loaded data's keys, so no records are decoded: the
+    results store lists its models and districts in meta.json, and a live
+    snapshot is already parsed. States are those of the districts' joined
+    features.
+    """
+    districts = set()
+    for model_districts in data.values():
+        districts.update(model_districts.keys())
+    states = {join.state_of(district) for district in districts} - {None}
+    return {'models': len(data), 'districts': len(districts), 'states': len(states)}
+
 def get_color(wer):
-    wer = float(wer)
-    if wer <= 20:
-        return '#00ff00'  # bright green
-    elif wer <= 50:
-        return '#ffa500'  # orange
+    return wer_color(float(wer))
+
+def wer_label(wer, estimate=None):
+    """'43.84%', with the samples' WER and bootstrap interval when there are samples"""
+    if estimate is None:
+        return f"{wer}%"
+    return f"{wer}% ({format_estimate(*estimate)})"
+
+def wer_view(model_data, bins, intervals=None):
+    """The WER map in the same shape as the comparison views
+
+    `intervals` ({district: (sample WER, bootstrap interval)}) are added to
+    the labels.
+    """
+    intervals = intervals or {}
+    return {
+        'bins': bins,
+        'labels': {district: wer_label(model_data[district]['WER'], intervals.get(district))
+                   for district in model_data},
+        'colors': BIN_COLORS,
+        'legend': list(zip(BIN_COLORS, BIN_LABELS)),
+        'label_name': 'WER',
+    }
+
+def load_wer_view(data, model):
+    """(view key, WER view) of a model
+
+    Labels show the bare WER until the bootstrap intervals, resampled in the
+    background, are ready; the key tells the two apart.
+    """
+    intervals = get_wer_intervals_nowait(data, data_version(data))
+    view = wer_view(data[model], get_district_bins(data, model, data_version(data)),
+                    intervals.by_district(model) if intervals is not None else None)
+    return ('wer', model, data_version(data), intervals is not None), view
+
+def load_wer_layer(data, model, view_key, view, join, base_geojsons):
+    """The merged district layer annotated with a WER view, once per view key"""
+    return get_wer_layers({'india': load_india_layer(base_geojsons)}, model, data[model], data_version(data),
+                          view['bins'], join.feature_districts, view['labels'], labels_key=view_key)['india']
+
+def get_view_map(view_key, view, india_layer, join, clicked_district, **layer_properties):
+    """Map of a view, built and rendered once per (view, highlighted district, data version)"""
+    render_key = (view_key, clicked_district, id(india_layer), id(join))
+    def build():
+        with stage('build_map'):
+            return build_map(india_layer, view, clicked_district, join, **layer_properties)
+    return get_rendered_map(render_key, build, refs=india_layer)
+
+def legend_html(legend):
+    """Map legend from (colour, label) pairs, e.g. a view's legend"""
+    items = "".join(
+        f"""
+            <div style="display: flex; align-items: center; margin-right: 10px;">
+                <div style="width: 20px; height: 20px; background-color: {color}; margin-right: 10px; opacity: 0.7; border: 1px solid var(--text-color);"></div>
+                <span style="color: var(--text-color);">{label}</span>
+            </div>"""
+        for color, label in legend
+    )
+    return f"""
+        <div style="position: absolute; top: 20px; left: 35px; padding: 20px; background-color: var(--secondary-background-color); border-radius: 10px; display: flex; justify-content: space-around; z-index: 1000;">{items}
+        </div>
+    """
+
+def load_district_join(data, base_geojsons):
+    """District join written by district_join.py, or built here when the file
+    is missing or doesn't cover every district of the loaded results"""
+    if DISTRICT_JOIN_FILE.exists():
+        join = load_file(DISTRICT_JOIN_FILE, read_district_join)
+        if join.covers(district for model in data for district in data[model]):
+            return join
+    return get_district_join(data, data_version(data), base_geojsons)
+
+def find_clicked_district(clicked_lat, clicked_lng, all_geojsons, model_data, join):
+    """Find which (state, district) was clicked on the map across all states"""
+    from spatial_index import get_district_index  # shapely, only needed once a map is clicked
+
+    index = get_district_index(all_geojsons)
+    ids = {join.district_ids[district] for district in model_data if district in join.district_ids}
+    fid = index.locate_feature(clicked_lat, clicked_lng, ids=ids)
+    if fid is None:
+        return None, None
+    return join.features[fid]['state'], join.feature_districts[fid]
+
+def build_map(india_layer, view, clicked_district, join, bin_property='wer_bin', label_property='wer'):
+    """Build the all-India district map of a view with the clicked district highlighted
+
+    `india_layer` features carry the view's bin and tooltip label in
+    `bin_property` and `label_property`. Without an `india_layer`, districts
+    are loaded from the tile server, styled by feature ID through `join`.
+    """
+    import folium
+    from map_elements import BinnedGeoJson, TiledDistrictLayer
+
+    # India map bounds
+    INDIA_BOUNDS = [[8.0, 68.0], [37.0, 97.0]]
+
+    # Create map
+    m = folium.Map(
+        location=[23.0, 82.0],  # Center of India (approx)
+        zoom_start=5,  # Increased zoom level by 1
+        tiles='OpenStreetMap',
+        min_zoom=5,
+        max_zoom=10,
+        scrollWheelZoom=True,  # Enable scrolling for the all-India view
+        dragging=True  # Enable dragging for the all-India view
+    )
+
+    # Highlight the clicked district if the view has a value for it
+    highlight = None
+    styles = make_styles(view['colors'])
+    if clicked_district in view['bins']:
+        highlight = join.district_ids.get(clicked_district)
+
+    tooltip_style = "background-color: white; color: #333333; font-family: arial; font-size: 12px; padding: 10px;"
+    if india_layer is None:
+        # Only the tiles in view are fetched, simplified for the current zoom
+        ids = join.district_ids
+        TiledDistrictLayer(
+            TILE_SERVER_URL,
+            {ids[district]: value for district, value in view['bins'].items() if district in ids},
+            {ids[district]: value for district, value in view['labels'].items() if district in ids},
+            view['label_name'],
+            highlight=highlight,
+            styles=styles,
+            tooltip_style=tooltip_style
+        ).add_to(m)
     else:
-        return '#ff0000'  # red
+        # Add all districts to the map as one layer, styled by bin
+        BinnedGeoJson(
+            india_layer,
+            highlight=highlight,
+            styles=styles,
+            bin_property=bin_property,
+            name='districts',
+            tooltip=folium.GeoJsonTooltip(
+                fields=['district', label_property],
+                aliases=['District:', f"{view['label_name']}:"],
+                style=tooltip_style
+            )
+        ).add_to(m)
 
-def find_clicked_district(clicked_lat, clicked_lng, all_geojsons, model_data):
-    """Find which district was clicked on the map across all states"""
-    click_point = Point(clicked_lng, clicked_lat)
+    # Fit the map to India bounds
+    m.fit_bounds(INDIA_BOUNDS)
     
-    for state_name, geojson_data in all_geojsons.items():
-        if not geojson_data:
-            continue
-            
-        for feature in geojson_data['features']:
-            district = feature['properties']['district']
-            if district in model_data:
-                try:
-                    if shape(feature['geometry']).contains(click_point):
-                        return state_name, district
-                except Exception:
-                    continue
-    
-    return None, None
-
-def add_wer_to_geojson(geojson_data, model_data):
-    """Add WER data from model to GeoJSON properties"""
-    for feature in geojson_data['features']:
-        district = feature['properties']['district']
-        district = district.strip().title()  # Normalize format
-        if district in model_data:
-            feature['properties']['wer'] = f"{model_data[district]['WER']}%"
-        else:
-            # Debug print for missing districts
-            feature['properties']['wer'] = 'N/A'
-    return geojson_data
+    return m
+
+def audio_url(url):
+    """Route sample audio through the caching proxy when one is configured"""
+    if AUDIO_PROXY_URL:
+        return f"{AUDIO_PROXY_URL.rstrip('/')}/audio?url={quote(url, safe='')}"
+    return url
+
+def prefetch_audio(urls):
+    """Ask the audio proxy to download clips in the background"""
+    if not AUDIO_PROXY_URL:
+        return
+    def post():
+        import requests
+
+        try:
+            requests.post(f"{AUDIO_PROXY_URL.rstrip('/')}/prefetch", json=urls, timeout=5)
+        except requests.RequestException:
+            pass
+    # Don't hold up the rerun waiting for the proxy
+    threading.Thread(target=post, daemon=True).start()
+
+def render_sample(sample_id, sample_data, key_prefix):
+    """One collapsed sample card; the audio player is only created on request"""
+    with st.expander(f"{sample_id}", expanded=False):
+        audio_col, download_col = st.columns([3, 1])
+        with audio_col:
+            if st.toggle("Load audio", key=f"audio_{key_prefix}_{sample_id}"):
+                st.audio(audio_url(sample_data['URL']), format='audio/wav')
+        with download_col:
+            st.markdown(f"""
+                <div style="height: 40px; display: flex; align-items: center; justify-content: center;">
+                    <a href="{audio_url(sample_data['URL'])}" 
+                       style="text-decoration: none; padding: 8px 15px; background-color: var(--primary-color); 
+                              color: white; border-radius: 5px; display: inline-flex; align-items: center; gap: 5px;"
+                       download="sample_{sample_id}.wav" target="_blank">
+                        <span>📥</span> Download
+                    </a>
+                </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("**Model Output:**")
+        st.markdown(f"""<div class="sample-box">{sample_data['ModelOutput']}</div>""", unsafe_allow_html=True)
+        st.markdown("**Reference:**")
+        st.markdown(f"""<div class="sample-box">{sample_data['Reference']}</div>""", unsafe_allow_html=True)
+
+def render_samples(samples, key_prefix):
+    """One page of a district's samples in two columns
+
+    Only the samples on the current page are read and rendered, so the
+    widget count per rerun depends on the page size, not the district size.
+    """
+    if not samples:
+        st.info("No samples available for this district")
+        return
+    
+    # Warm the audio cache with the whole district once per session
+    prefetched = st.session_state.setdefault('prefetched_audio', set())
+    if AUDIO_PROXY_URL and key_prefix not in prefetched:
+        prefetched.add(key_prefix)
+        prefetch_audio([samples[sample_id]['URL'] for sample_id in samples if 'URL' in samples[sample_id]])
+    
+    size_col, page_col, info_col = st.columns([1, 1, 2])
+    with size_col:
+        page_size = st.selectbox("Samples per page", options=SAMPLE_PAGE_SIZES, key="sample_page_size")
+    page_count = math.ceil(len(samples) / page_size)
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1,
+                               key=f"sample_page_{key_prefix}_{page_size}")
+    start = (page - 1) * page_size
+    page_ids = list(islice(samples, start, start + page_size))
+    with info_col:
+        st.write(f"Showing samples {start + 1}-{start + len(page_ids)} of {len(samples)}")
+    
+    # Create columns for samples
+    left_col, right_col = st.columns(2)
+    mid_point = (len(page_ids) + 1) // 2
+    for column, column_ids in ((left_col, page_ids[:mid_point]), (right_col, page_ids[mid_point:])):
+        with column:
+            for sample_id in column_ids:
+                render_sample(sample_id, samples[sample_id], key_prefix)
+
+def render_search(data):
+    """Search box over every Reference and ModelOutput in the loaded results"""
+    st.markdown("### Search Transcripts")
+    districts = sorted(set().union(*(data[model].keys() for model in data)))
+    query_col, model_col, district_col = st.columns([3, 2, 2])
+    with query_col:
+        query = st.text_input('Words or "exact phrase"', key="search_query")
+    with model_col:
+        search_models = st.multiselect("Models", options=list(data.keys()), key="search_models")
+    with district_col:
+        search_district = st.selectbox("District", options=["All districts"] + districts, key="search_district")
+    
+    if not query.strip():
+        return
+    results = get_search_index(data, data_version(data)).search(
+        query,
+        models=search_models or None,
+        districts=None if search_district == "All districts" else [search_district],
+        limit=SEARCH_RESULT_LIMIT
+    )
+    st.caption(f"{results['total']:,} matching transcripts ({results['seconds'] * 1000:.1f} ms)"
+               + (f", showing the first {SEARCH_RESULT_LIMIT}" if results['total'] > SEARCH_RESULT_LIMIT else ""))
+    for result in results['results']:
+        st.markdown(
+            f"""**{result['model']}** · {result['district']} · {result['sample_id']} · {result['field']}
+            <div class="sample-box">{result['highlighted']}</div>""",
+            unsafe_allow_html=True
+        )
+
+def warm_caches(old, new, changed, base_geojsons):
+    """Build a reloaded dataset's derived caches before sessions see it"""
+    get_wer_matrix(new, new.version)
+    get_search_index(new, new.version)
+    get_wer_intervals(new, new.version)
+    join = load_district_join(new, base_geojsons)
+    update_error_tables(old, old.version, new, new.version, changed, join.district_states(),
+                        load_district_join(old, base_geojsons).district_states())
+    for model in new:
+        get_district_bins(new, model, new.version)
+    # The WER map of the default model and district, as a new session first shows it
+    if not TILE_SERVER_URL and new:
+        model = list(new)[-1]
+        view_key, view = load_wer_view(new, model)
+        india_layer = load_wer_layer(new, model, view_key, view, join, base_geojsons)
+        get_view_map(view_key, view, india_layer, join, next(iter(new[model]), None))
+
+def render_error_analysis(data, join):
+    """Most frequent word errors of every model, side by side"""
+    import pandas as pd
+
+    st.markdown("### Error Analysis")
+    district = st.session_state['clicked_district']
+    state = st.session_state['clicked_state']
+    scopes = ["All India"]
+    if state:
+        scopes.append(f"State: {state}")
+    if district:
+        scopes.append(f"District: {district}")
+    scope_col, top_col = st.columns([3, 1])
+    with scope_col:
+        scope = st.radio("Scope", options=scopes, horizontal=True, key="error_scope")
+    with top_col:
+        top = st.number_input("Top errors", min_value=5, max_value=MAX_TOP, value=10, step=5, key="error_top")
+    
+    # Aligning every sample takes a while on large results: build the tables
+    # in the background and show them from the first rerun after that
+    tables = get_error_tables_nowait(data, data_version(data), join.district_states())
+    if tables is None:
+        st.info("Aligning transcripts for the error tables; they appear on the next interaction.")
+        return
+    scope_args = {}
+    if scope.startswith("State: "):
+        scope_args['state'] = state
+    elif scope.startswith("District: "):
+        scope_args['district'] = district
+    
+    titles = {'substitutions': "Substitutions", 'deletions': "Deletions",
+              'insertions': "Insertions", 'ngrams': "Error n-grams"}
+    for tab, kind in zip(st.tabs([titles[kind] for kind in KINDS]), KINDS):
+        with tab:
+            columns = {}
+            for model in data.keys():
+                rows = tables.top(kind, model, n=top, **scope_args)
+                columns[model] = [f"{format_item(kind, item)} ({count})" for item, count in rows]
+            table = pd.DataFrame({model: pd.Series(rows, dtype=object) for model, rows in columns.items()})
+            table.index = range(1, len(table) + 1)
+            st.dataframe(table, use_container_width=True)
 
 def main():
     # Initialize session state
@@ -360,7 +663,9 @@ def main():
         st.session_state['last_click'] = None
     
     # Load available states
-    available_states = [f.stem for f in STATES_DIR.glob("*.json") if f.is_file()]
+    available_states = list(dict.fromkeys(
+        f.stem for pattern in ("*.json", "*.topojson") for f in STATES_DIR.glob(pattern) if f.is_file()
+    ))
     
     add_logo()
     
@@ -371,19 +676,39 @@ def main():
     st.markdown("<p style='color: #203454;'>Automatic speech recognition performance is computed using <a href='https://en.wikipedia.org/wiki/Word_error_rate' target='_blank' style='color: #00B4FF;'>Word Error Rate (WER)</a>.</p>", unsafe_allow_html=True)
     
     # Load data
-    data = load_data()
+    with stage('load_data'):
+        data = load_data()
     if data is None:
         st.error("Failed to load data")
         return
     
+    # Load all state GeoJSONs
+    base_geojsons = {}
+    with stage('load_state_geojsons'):
+        for state in available_states:
+            geojson = load_state_geojson(state)
+            if geojson:
+                base_geojsons[state] = geojson
+    
+    # Reloaded results arrive with their search index and error tables built
+    if isinstance(data, ResultsSnapshot):
+        get_live_results(DATA_FILE, RESULTS_DIR, RESULTS_POLL_SECONDS).set_warmer(
+            'app', partial(warm_caches, base_geojsons=base_geojsons))
+    
+    # Result districts resolved to map features, once per data version
+    with stage('district_join'):
+        join = load_district_join(data, base_geojsons)
+    
     # Create two columns for map and analysis
     map_col, analysis_col = st.columns([4, 2])
     
     with analysis_col:
         st.subheader("Data Summary")
-        st.write(f"Models: {len(data)}")
-        st.write(f"Districts: {len(data['AWS'])}")
-        st.write(f"States: 12 ")
+        with stage('data_summary'):
+            summary = data_summary(data, join)
+        st.write(f"Models: {summary['models']}")
+        st.write(f"Districts: {summary['districts']}")
+        st.write(f"States: {summary['states']}")
         
         model_options = list(data.keys())
         selected_model = st.selectbox(
@@ -392,6 +717,26 @@ def main():
             index=len(model_options) - 1
         )
         
+        # Map view: WER of the selected model, or a comparison across models
+        view_options = ["WER"] + (["Difference (A − B)", "Best model", "Rank"] if len(model_options) > 1 else [])
+        map_view = st.radio("Map view", options=view_options, horizontal=True, key='map_view')
+        compare_model = None
+        if map_view == "Difference (A − B)":
+            compare_model = st.selectbox(
+                "Compare with (B)",
+                options=[model for model in model_options if model != selected_model],
+                key='compare_model'
+            )
+        
+        with stage('map_view'):
+            if map_view == "WER":
+                view_key, view = load_wer_view(data, selected_model)
+            else:
+                kind = {"Difference (A − B)": 'delta', "Best model": 'best', "Rank": 'rank'}[map_view]
+                view_key = (kind, selected_model, compare_model, data_version(data))
+                view = get_comparison_view(data, data_version(data), kind, selected_model, compare_model)
+        view_name, view_labels = view['label_name'], view['labels']
+        
         # District selector dropdown (similar to previous version, no state dropdown)
         if st.session_state['clicked_district']:
             default_ix = list(data[selected_model].keys()).index(st.session_state['clicked_district'])
@@ -407,116 +752,62 @@ def main():
         
         if st.session_state.get('district_selector') != st.session_state['clicked_district']:
             st.session_state['clicked_district'] = selected_district_sidebar
+            st.session_state['clicked_state'] = join.state_of(selected_district_sidebar)
         
         # Display district analysis if selected
         if st.session_state['clicked_district'] and st.session_state['clicked_district'] in data[selected_model]:
             district_data = data[selected_model][st.session_state['clicked_district']]
+            interval_key = (selected_model, st.session_state['clicked_district'])
+            intervals = get_wer_intervals_nowait(data, data_version(data))
+            interval_html = ""
+            if intervals is not None and interval_key in intervals.districts:
+                interval_html = (f"<p>WER of its {intervals.samples[interval_key]} samples: "
+                                 f"{intervals.estimates[interval_key]:.1f}% ({CONFIDENCE:.0%} CI "
+                                 f"{format_interval(intervals.districts[interval_key])})</p>")
             
             st.markdown(
                 f"""
                 <div class="metric-container" style="text-align: center;">
                     <h4>{st.session_state['clicked_district']} Word Error Rate (WER)</h4>
                     <h2 style="color: {get_color(district_data['WER'])}">{district_data['WER']}%</h2>
+                    {interval_html}
                 </div>
                 """,
                 unsafe_allow_html=True
             )
             
+            if map_view != "WER" and st.session_state['clicked_district'] in view_labels:
+                st.write(f"{view_name}: {view_labels[st.session_state['clicked_district']]}")
+            
             # Show state if available
             if st.session_state['clicked_state']:
                 st.write(f"State: {st.session_state['clicked_state']}")
     
     with map_col:
-        # WER Thresholds legend
-        st.markdown("""
-            <div style="position: absolute; top: 20px; left: 35px; padding: 20px; background-color: var(--secondary-background-color); border-radius: 10px; display: flex; justify-content: space-around; z-index: 1000;">
-                <div style="display: flex; align-items: center; margin-right: 10px;">
-                    <div style="width: 20px; height: 20px; background-color: #00ff00; margin-right: 10px; opacity: 0.7; border: 1px solid var(--text-color);"></div>
-                    <span style="color: var(--text-color);">WER ≤ 20%</span>
-                </div>
-                <div style="display: flex; align-items: center; margin-right: 10px;">
-                    <div style="width: 20px; height: 20px; background-color: #ffa500; margin-right: 10px; opacity: 0.7; border: 1px solid var(--text-color);"></div>
-                    <span style="color: var(--text-color);">20% < WER ≤ 50%</span>
-                </div>
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 20px; height: 20px; background-color: #ff0000; margin-right: 10px; opacity: 0.7; border: 1px solid var(--text-color);"></div>
-                    <span style="color: var(--text-color);">WER > 50%</span>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        # Load all state GeoJSONs
-        all_geojsons = {}
-        for state in available_states:
-            geojson = load_state_geojson(state)
-            if geojson:
-                # Add WER data to GeoJSON
-                geojson = add_wer_to_geojson(geojson, data[selected_model])
-                all_geojsons[state] = geojson
+        # Legend of the current view
+        st.markdown(legend_html(view['legend']), unsafe_allow_html=True)
         
-        # India map bounds
-        INDIA_BOUNDS = [[8.0, 68.0], [37.0, 97.0]]
+        # Add the view's bins to (a copy of) the merged district layer, once
+        # per view and data version, unless districts come from the tile
+        # server. Full-resolution state layers are only used for clicks.
+        india_layer = None
+        layer_properties = {}
+        with stage('map_layer'):
+            if not TILE_SERVER_URL and map_view == "WER":
+                india_layer = load_wer_layer(data, selected_model, view_key, view, join, base_geojsons)
+            elif not TILE_SERVER_URL:
+                india_layer = get_view_layer(load_india_layer(base_geojsons), view_key, view, join.feature_districts)
+                layer_properties = {'bin_property': 'view_bin', 'label_property': 'view_label'}
         
-        # Create map
-        m = folium.Map(
-            location=[23.0, 82.0],  # Center of India (approx)
-            zoom_start=5,  # Increased zoom level by 1
-            tiles='OpenStreetMap',
-            min_zoom=5,
-            max_zoom=10,
-            scrollWheelZoom=True,  # Enable scrolling for the all-India view
-            dragging=True  # Enable dragging for the all-India view
-        )
-        
-        # Add all states to the map
-        for state_name, geojson_data in all_geojsons.items():
-            if not geojson_data:
-                continue
-                
-            # Define style function for this layer
-            def style_function(feature, state_name=state_name):
-                district_name = feature['properties']['district']
-                # Check if this is the clicked district
-                is_clicked = (district_name == st.session_state['clicked_district'] and 
-                             state_name == st.session_state['clicked_state'])
-                
-                if district_name in data[selected_model]:
-                    return {
-                        'fillColor': '#ff000066' if is_clicked else get_color(data[selected_model][district_name]['WER']),
-                        'color': 'black',
-                        'weight': 3 if is_clicked else 1,
-                        'fillOpacity': 0.9 if is_clicked else 0.7,
-                        'dashArray': '5, 5' if is_clicked else None
-                    }
-                return {
-                    'fillColor': '#CCCCCC',
-                    'color': 'black',
-                    'weight': 1,
-                    'fillOpacity': 0.4
-                }
-            
-            # Add this state's districts to the map
-            folium.GeoJson(
-                geojson_data,
-                name=state_name,
-                style_function=lambda x, state=state_name: style_function(x, state),
-                highlight_function=lambda x: {
-                    'fillColor': '#ff000066',
-                    'weight': 3,
-                    'fillOpacity': 0.9
-                },
-                tooltip=folium.GeoJsonTooltip(
-                    fields=['district', 'wer'],
-                    aliases=['District:', 'WER:'],
-                    style=("background-color: white; color: #333333; font-family: arial; font-size: 12px; padding: 10px;")
-                )
-            ).add_to(m)
-        
-        # Fit the map to India bounds
-        m.fit_bounds(INDIA_BOUNDS)
+        # Build and render the map once per (view, highlighted district, data
+        # version); reruns that only touch the sample panel reuse the result
+        with stage('render_map'):
+            rendered_map = get_view_map(view_key, view, india_layer, join, st.session_state['clicked_district'],
+                                        **layer_properties)
         
         # Show the map
-        map_data = st_folium(m, width=1120, height=700, key="map")
+        with stage('show_map'):
+            map_data = show_rendered_map(rendered_map, width=1120, height=700, key="map")
         
         # Handle clicking on the map
         if (map_data is not None and 'last_clicked' in map_data and 
@@ -525,12 +816,14 @@ def main():
             clicked_lat = map_data['last_clicked']['lat']
             clicked_lng = map_data['last_clicked']['lng']
             
-            clicked_state, clicked_district = find_clicked_district(
-                clicked_lat, 
-                clicked_lng, 
-                all_geojsons, 
-                data[selected_model]
-            )
+            with stage('find_clicked_district'):
+                clicked_state, clicked_district = find_clicked_district(
+                    clicked_lat, 
+                    clicked_lng, 
+                    base_geojsons, 
+                    data[selected_model],
+                    join
+                )
             
             if clicked_district:
                 st.session_state['clicked_state'] = clicked_state
@@ -538,6 +831,9 @@ def main():
                 st.session_state['last_click'] = map_data['last_clicked']
                 st.rerun()
     
+    with stage('search'):
+        render_search(data)
+    
     # Sample Analysis section
     st.markdown("### Sample Analysis")
     if st.session_state['clicked_district'] and st.session_state['clicked_district'] in data[selected_model]:
@@ -547,62 +843,47 @@ def main():
         if st.session_state['clicked_state']:
             st.markdown(f"**State:** {st.session_state['clicked_state']}")
         
-        # Create columns for samples
-        left_col, right_col = st.columns(2)
-        
-        samples = list(district_data['Samples'].items())
-        mid_point = (len(samples) + 1) // 2
-        
-        # Left column samples
-        with left_col:
-            for sample_id, sample_data in samples[:mid_point]:
-                with st.expander(f"{sample_id}", expanded=True):
-                    audio_col, download_col = st.columns([3, 1])
-                    with audio_col:
-                        st.audio(sample_data['URL'], format='audio/wav')
-                    with download_col:
-                        st.markdown(f"""
-                            <div style="height: 40px; display: flex; align-items: center; justify-content: center;">
-                                <a href="{sample_data['URL']}" 
-                                   style="text-decoration: none; padding: 8px 15px; background-color: var(--primary-color); 
-                                          color: white; border-radius: 5px; display: inline-flex; align-items: center; gap: 5px;"
-                                   download="sample_{sample_id}.wav" target="_blank">
-                                    <span>📥</span> Download
-                                </a>
-                            </div>
-                        """, unsafe_allow_html=True)
-                    
-                    st.markdown("**Model Output:**")
-                    st.markdown(f"""<div class="sample-box">{sample_data['ModelOutput']}</div>""", unsafe_allow_html=True)
-                    st.markdown("**Reference:**")
-                    st.markdown(f"""<div class="sample-box">{sample_data['Reference']}</div>""", unsafe_allow_html=True)
-        
-        # Right column samples
-        with right_col:
-            for sample_id, sample_data in samples[mid_point:]:
-                with st.expander(f"{sample_id}", expanded=True):
-                    audio_col, download_col = st.columns([3, 1])
-                    with audio_col:
-                        st.audio(sample_data['URL'], format='audio/wav')
-                    with download_col:
-                        st.markdown(f"""
-                            <div style="height: 40px; display: flex; align-items: center; justify-content: center;">
-                                <a href="{sample_data['URL']}" 
-                                   style="text-decoration: none; padding: 8px 15px; background-color: var(--primary-color); 
-                                          color: white; border-radius: 5px; display: inline-flex; align-items: center; gap: 5px;"
-                                   download="sample_{sample_id}.wav" target="_blank">
-                                    <span>📥</span> Download
-                                </a>
-                            </div>
-                        """, unsafe_allow_html=True)
-                    
-                    st.markdown("**Model Output:**")
-                    st.markdown(f"""<div class="sample-box">{sample_data['ModelOutput']}</div>""", unsafe_allow_html=True)
-                    st.markdown("**Reference:**")
-                    st.markdown(f"""<div class="sample-box">{sample_data['Reference']}</div>""", unsafe_allow_html=True)
+        with stage('samples'):
+            render_samples(district_data.get('Samples', {}),
+                           f"{st.session_state['clicked_state']}_{st.session_state['clicked_district']}")
+    
+    with stage('error_analysis'):
+        render_error_analysis(data, join)
     
     st.markdown("<hr style='margin: 20px 0;'>", unsafe_allow_html=True)
-    add_footer()
+    with stage('footer'):
+        add_footer()
+
+def debug_enabled():
+    return DEBUG_PANEL or st.experimental_get_query_params().get('debug', [''])[0] not in ('', '0')
+
+def render_debug_panel(run):
+    """Sidebar with this rerun's stage timings, all-session metrics and cache stats"""
+    import pandas as pd
+
+    with st.sidebar:
+        st.markdown("### Performance")
+        st.caption(f"Last rerun: {run['seconds'] * 1000:.1f} ms, {metrics.runs} reruns in this process")
+        stages = pd.DataFrame(run['stages']).set_index('stage')
+        stages['ms'] = stages.pop('seconds') * 1000
+        if 'peak_bytes' in stages:
+            stages['peak KiB'] = stages.pop('peak_bytes') / 1024
+        st.dataframe(stages.round(1), use_container_width=True)
+        
+        st.markdown("**All sessions**")
+        st.dataframe(pd.DataFrame.from_dict(metrics.summary(), orient='index').round(1), use_container_width=True)
+        
+        st.markdown("**Caches**")
+        caches = {'files': cache_stats(), 'rendered maps': render_cache_stats(), **memo_stats()}
+        st.dataframe(pd.DataFrame.from_dict(caches, orient='index').round(3), use_container_width=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if PERF_METRICS_PORT:
+        serve_metrics(int(PERF_METRICS_PORT))
+    start_run()
+    try:
+        main()
+    finally:
+        run = end_run(view=st.session_state.get('map_view'), district=st.session_state.get('clicked_district'))
+    if debug_enabled():
+        render_debug_panel(run)
\ No newline at end of file
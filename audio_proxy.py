@@ -0,0 +1,326 @@
+"""Caching proxy for sample audio.
+
+Serves GET/HEAD /audio?url=<sample URL> from an on-disk LRU cache, fetching
+from the backend on a miss, with HTTP Range support so players can seek
+without downloading the whole clip. POST /prefetch with a JSON list of URLs
+warms the cache in the background. The app routes audio through the proxy
+when AUDIO_PROXY_URL is set:
+
+    python audio_proxy.py --cache-dir .audio_cache --port 8766
+    AUDIO_PROXY_URL=http://localhost:8766 streamlit run app.py
+
+Use --local-dir to serve a directory standing in for the bucket, laid out
+as <dir>/<host>/<path>.
+"""
+import hashlib
+import json
+import argparse
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import requests
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class HttpBackend:
+    """Fetches sample audio from its original URL"""
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def fetch(self, url: str) -> bytes:
+        response = self._session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+
+class LocalDirBackend:
+    """Reads sample audio from <root>/<host>/<path> instead of the network"""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+
+    def fetch(self, url: str) -> bytes:
+        parsed = urlparse(url)
+        path = (self.root / parsed.netloc / unquote(parsed.path).lstrip('/')).resolve()
+        if self.root not in path.parents:
+            raise FileNotFoundError(url)
+        return path.read_bytes()
+
+
+class DiskCache:
+    """Byte-capped LRU of fetched files, kept across restarts
+
+    Recency is tracked in memory and mirrored to file mtimes, which is how
+    the order is restored when the cache directory is reopened.
+    """
+
+    def __init__(self, cache_dir, max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        for path in sorted(self.cache_dir.glob("*.bin"), key=lambda p: p.stat().st_mtime_ns):
+            self._entries[path.stem] = path.stat().st_size
+            self._bytes += path.stat().st_size
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.bin"
+
+    def get(self, url: str, count: bool = True) -> Optional[Path]:
+        key = self.key(url)
+        with self._lock:
+            if key not in self._entries:
+                self._stats["misses"] += count
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += count
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, url: str, data: bytes) -> Path:
+        key = self.key(url)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            # Always keep the newest file, even if it alone is over budget
+            while len(self._entries) > 1 and self._bytes > self.max_bytes:
+                old_key, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                self._stats["evictions"] += 1
+                self._path(old_key).unlink(missing_ok=True)
+        return path
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+
+class AudioProxy:
+    """Cache in front of a backend; each URL is fetched at most once at a time"""
+
+    def __init__(self, backend, cache: DiskCache, allowed_hosts: Iterable[str] = None, prefetch_workers: int = 4):
+        self.backend = backend
+        self.cache = cache
+        self.allowed_hosts = set(allowed_hosts) if allowed_hosts else None
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._prefetch = ThreadPoolExecutor(max_workers=prefetch_workers)
+
+    def allowed(self, url: str) -> bool:
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        return self.allowed_hosts is None or parsed.netloc in self.allowed_hosts
+
+    def path_for(self, url: str) -> Path:
+        """Local file holding the clip at `url`, fetching it on a miss"""
+        path = self.cache.get(url)
+        if path is not None:
+            return path
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        try:
+            with url_lock:
+                # Another request may have fetched it while we waited
+                path = self.cache.get(url, count=False)
+                if path is None:
+                    path = self.cache.put(url, self.backend.fetch(url))
+        finally:
+            with self._lock:
+                self._url_locks.pop(url, None)
+        return path
+
+    def open(self, url: str, attempts: int = 3):
+        """The clip at `url` as an open binary file, fetching it on a miss
+
+        The open file stays readable if the cache evicts (unlinks) it while
+        it is being served; an eviction between lookup and open refetches.
+        """
+        for attempt in range(attempts):
+            path = self.path_for(url)
+            try:
+                return open(path, 'rb')
+            except FileNotFoundError:
+                if attempt == attempts - 1:
+                    raise
+
+    def _prefetch_one(self, url: str):
+        try:
+            self.path_for(url)
+        except Exception:
+            pass
+
+    def prefetch(self, urls: Iterable[str]) -> int:
+        """Queue clips for background download; returns how many were queued"""
+        queued = 0
+        for url in urls:
+            if self.allowed(url):
+                self._prefetch.submit(self._prefetch_one, url)
+                queued += 1
+        return queued
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single-range header; None for the whole file
+
+    Raises ValueError if the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Multiple or malformed ranges: serve the whole file
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class AudioProxyHandler(BaseHTTPRequestHandler):
+    proxy: AudioProxy = None
+
+    def _send_headers(self, status, headers):
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _serve(self, with_body: bool):
+        parsed = urlparse(self.path)
+        if parsed.path != '/audio':
+            self.send_error(404)
+            return
+        url = parse_qs(parsed.query).get('url', [None])[0]
+        if not url or not self.proxy.allowed(url):
+            self.send_error(400, "Missing or disallowed url")
+            return
+        try:
+            f = self.proxy.open(url)
+        except FileNotFoundError:
+            self.send_error(404)
+            return
+        except Exception as e:
+            self.send_error(502, f"Upstream error: {e}")
+            return
+
+        with f:
+            self._send_file(f, url, with_body)
+
+    def _send_file(self, f, url: str, with_body: bool):
+        size = os.fstat(f.fileno()).st_size
+        content_type = mimetypes.guess_type(urlparse(url).path)[0] or 'application/octet-stream'
+        headers = {'Content-Type': content_type, 'Accept-Ranges': 'bytes', 'Cache-Control': 'public, max-age=86400'}
+        try:
+            byte_range = parse_range(self.headers.get('Range'), size)
+        except ValueError:
+            self._send_headers(416, {'Content-Range': f"bytes */{size}"})
+            return
+        if byte_range is None:
+            status, (start, end) = 200, (0, size - 1)
+        else:
+            status, (start, end) = 206, byte_range
+            headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+        headers['Content-Length'] = str(end - start + 1)
+        self._send_headers(status, headers)
+        if with_body:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(remaining, 1 << 16))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def do_GET(self):
+        self._serve(with_body=True)
+
+    def do_HEAD(self):
+        self._serve(with_body=False)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/prefetch':
+            self.send_error(404)
+            return
+        try:
+            urls = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            queued = self.proxy.prefetch(url for url in urls if isinstance(url, str))
+        except (ValueError, TypeError):
+            self.send_error(400, "Expected a JSON list of URLs")
+            return
+        body = json.dumps({'queued': queued}).encode('utf-8')
+        self._send_headers(202, {'Content-Type': 'application/json', 'Content-Length': str(len(body))})
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_audio_proxy(cache_dir, host='127.0.0.1', port=8766, max_bytes=2 * 1024 ** 3,
+                      local_dir=None, allowed_hosts=None):
+    try:
+        backend = LocalDirBackend(local_dir) if local_dir else HttpBackend()
+        AudioProxyHandler.proxy = AudioProxy(backend, DiskCache(cache_dir, max_bytes), allowed_hosts)
+        server = ThreadingHTTPServer((host, port), AudioProxyHandler)
+        print(f"Serving audio on http://{host}:{server.server_port}/audio?url=... (cache: {cache_dir})")
+        server.serve_forever()
+        return True
+    except KeyboardInterrupt:
+        return True
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Caching HTTP proxy for sample audio with Range support')
+    parser.add_argument('--cache-dir', default='.audio_cache', help='Directory for cached clips')
+    parser.add_argument('--max-mb', type=int, default=2048, help='Cache size limit in MiB')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8766, help='Port to listen on')
+    parser.add_argument('--local-dir', default=None, help='Serve clips from <dir>/<host>/<path> instead of fetching them')
+    parser.add_argument('--allow-host', action='append', default=None,
+                        help='Hosts the proxy may fetch from (repeatable; default storage.googleapis.com)')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided arguments
+    serve_audio_proxy(args.cache_dir, args.host, args.port, args.max_mb * 1024 * 1024,
+                      args.local_dir, args.allow_host or ['storage.googleapis.com'])
@@ -0,0 +1,115 @@
+"""Requests per second of api_server.py on one core.
+
+Starts the API server in a subprocess (pinned to one CPU where supported)
+and polls it from client processes over keep-alive connections, for:
+
+- models: GET /models, gzip
+- districts_304: GET /models/{m}/districts with a matching If-None-Match
+- samples: a random sample page, gzip
+- wer: GET /models/{m}/wer, gzip
+
+    python benchmarks/bench_api.py --clients 4 --seconds 5
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+from synthetic import ROOT, DATA_FILE, format_summary
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, data, cpu=None, timeout=60):
+    command = [sys.executable, str(ROOT / 'api_server.py'), '--port', str(port), '--data', data,
+               '--store-dir', str(ROOT / 'no_store')]
+    if cpu is not None and sys.platform.startswith('linux'):
+        command = ['taskset', '-c', str(cpu)] + command
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/models')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("api_server did not start")
+
+
+def request_paths(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('GET', '/models')
+    models = [model['name'] for model in json.loads(connection.getresponse().read())['models']]
+    model = models[0]
+    connection.request('GET', f"/models/{quote(model)}/districts")
+    response = connection.getresponse()
+    etag = response.getheader('ETag')
+    districts = json.loads(response.read())['districts']
+    sample_paths = [f"/models/{quote(model)}/districts/{quote(district)}/samples?page=1&per_page=20"
+                    for district, info in districts.items() if info['samples']]
+    return {
+        'models': (['/models'], {}),
+        'districts_304': ([f"/models/{quote(model)}/districts"], {'If-None-Match': etag}),
+        'samples': (sample_paths, {}),
+        'wer': ([f"/models/{quote(m)}/wer" for m in models], {}),
+    }
+
+
+def client(port, paths, headers, seconds, seed, results):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = dict(headers, **{'Accept-Encoding': 'gzip'})
+    timings = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        connection.request('GET', rng.choice(paths), headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status not in (200, 304):
+            raise RuntimeError(f"HTTP {response.status}")
+        timings.append(time.perf_counter() - start)
+    results.put(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark api_server.py throughput')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent client processes')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each endpoint run')
+    parser.add_argument('--cpu', type=int, default=0, help='CPU to pin the server to (-1: no pinning)')
+    parser.add_argument('--data', default=str(DATA_FILE))
+    args = parser.parse_args()
+
+    port = free_port()
+    process = start_server(port, args.data, None if args.cpu < 0 else args.cpu)
+    try:
+        for name, (paths, headers) in request_paths(port).items():
+            results = multiprocessing.Queue()
+            clients = [multiprocessing.Process(target=client, args=(port, paths, headers, args.seconds, i, results))
+                       for i in range(args.clients)]
+            for c in clients:
+                c.start()
+            timings = [t for _ in clients for t in results.get()]
+            for c in clients:
+                c.join()
+            print(f"{format_summary(name, timings)}  {len(timings) / args.seconds:9,.0f} req/s", flush=True)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
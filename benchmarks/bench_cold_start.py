@@ -0,0 +1,108 @@
+"""Cold-start time and bytes sent per rerun, measured against a real server.
+
+Starts `streamlit run` headless on a free port, opens a session over the
+websocket the browser uses and requests reruns. Reported per rerun:
+
+- first element: time from the rerun request to the first delta (first paint)
+- finished: time until the script-finished message
+- bytes: size of everything the server sent for that rerun; large messages
+  the session already has are sent as references by Streamlit
+
+The first rerun of the first session is the cold start (fresh process);
+later sessions show the warm path. To compare with an older revision:
+
+    git worktree add /tmp/before <commit>
+    python benchmarks/bench_cold_start.py --app /tmp/before/app.py
+    python benchmarks/bench_cold_start.py
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from tornado.ioloop import IOLoop
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port, timeout=120):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(app), '--server.headless', 'true',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false'],
+        cwd=Path(app).parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("streamlit did not start")
+
+
+async def rerun(connection):
+    """(seconds to first delta, seconds to finish, bytes received) of one rerun"""
+    msg = BackMsg()
+    msg.rerun_script.query_string = ''
+    start = time.perf_counter()
+    await connection.write_message(msg.SerializeToString(), binary=True)
+    first, received = None, 0
+    while True:
+        payload = await connection.read_message()
+        if payload is None:
+            raise RuntimeError("connection closed")
+        received += len(payload)
+        message = ForwardMsg()
+        message.ParseFromString(payload)
+        kind = message.WhichOneof('type')
+        if first is None and kind in ('delta', 'ref_hash'):
+            first = time.perf_counter() - start
+        if kind == 'script_finished':
+            return first, time.perf_counter() - start, received
+
+
+async def session(port, reruns):
+    connection = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream")
+    results = [await rerun(connection) for _ in range(reruns)]
+    connection.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start and per-rerun bytes of the app')
+    parser.add_argument('--app', default=str(ROOT / 'app.py'))
+    parser.add_argument('--sessions', type=int, default=2)
+    parser.add_argument('--reruns', type=int, default=3, help='Reruns per session')
+    args = parser.parse_args()
+
+    port = free_port()
+    start = time.perf_counter()
+    process = start_server(args.app, port)
+    print(f"server ready in {time.perf_counter() - start:.2f} s")
+    try:
+        for s in range(args.sessions):
+            for r, (first, finished, received) in enumerate(IOLoop.current().run_sync(
+                    lambda: session(port, args.reruns), timeout=600)):
+                label = 'cold start' if s == 0 and r == 0 else f"session {s + 1} rerun {r + 1}"
+                print(f"{label:>20}: first element {first * 1000:8.1f} ms  finished {finished * 1000:8.1f} ms  "
+                      f"{received:>10,} bytes")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Serial fraction of eval_pipeline.py: what the parent does that workers can't.
+
+Writes a synthetic transcript dump (the sample results' utterances,
+repeated), then times in one process:
+
+- index: parsing every line (index_block over all blocks), done by workers
+- plan: collecting the blocks' entries into shards, done by the parent
+- score: scoring every shard (score_shard), done by workers
+- merge: merging the checkpoints into the output layout, done by the parent
+
+and reports the parent's share and the speedup Amdahl's law allows with
+--workers processes.
+
+    python benchmarks/bench_eval_pipeline.py --utterances 200000 --workers 16
+"""
+import argparse
+import itertools
+import json
+import tempfile
+import sys
+import time
+from pathlib import Path
+
+from synthetic import ROOT, DATA_FILE, load_results
+
+sys.path.insert(0, str(ROOT))
+
+from eval_pipeline import INDEX_BLOCK_BYTES, index_block, index_dumps, merge_shards, score_shard  # noqa: E402
+
+
+def write_dump(data, path, utterances):
+    records = [
+        {'District': district, 'Reference': sample.get('Reference', ''),
+         'ModelOutput': sample.get('ModelOutput', ''), 'URL': sample.get('URL', '')}
+        for model in itertools.islice(data, 1)
+        for district, district_data in data[model].items()
+        for sample in district_data.get('Samples', {}).values()
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in itertools.islice(itertools.cycle(records), utterances):
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class Replay:
+    """Executor stand-in whose map returns results computed beforehand"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def map(self, fn, *iterables):
+        return iter(self.results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the serial fraction of the scoring pipeline')
+    parser.add_argument('--utterances', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=16, help='Worker count for the speedup bound')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--data', default=str(DATA_FILE))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dump = Path(tmp_dir) / 'Model.jsonl'
+        write_dump(load_results(args.data), dump, args.utterances)
+        print(f"dump: {args.utterances:,} utterances, {dump.stat().st_size / 2 ** 20:,.1f} MiB")
+
+        timings = {}
+        start = time.perf_counter()
+        blocks = [index_block(str(dump), block, block + INDEX_BLOCK_BYTES, dump.stem)
+                  for block in range(0, dump.stat().st_size, INDEX_BLOCK_BYTES)]
+        timings['index'] = time.perf_counter() - start
+
+        # The parent's part of index_dumps: collecting the workers' entries
+        start = time.perf_counter()
+        shards = index_dumps([dump], Replay(blocks))
+        timings['plan'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        shard_paths = []
+        for (model, district), locations in shards.items():
+            for first in range(0, len(locations), args.chunk_size):
+                shard_path = Path(tmp_dir) / f"shard_{len(shard_paths)}.json"
+                score_shard(model, district, locations[first:first + args.chunk_size], str(shard_path), first)
+                shard_paths.append(shard_path)
+        timings['score'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        merge_shards(shard_paths)
+        timings['merge'] = time.perf_counter() - start
+
+    total = sum(timings.values())
+    for name, seconds in timings.items():
+        print(f"{name:>6}: {seconds:8.2f} s  ({seconds / total:6.1%})")
+    serial = (timings['plan'] + timings['merge']) / total
+    print(f"serial fraction {serial:.1%}: at most {1 / (serial + (1 - serial) / args.workers):.1f}x "
+          f"with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Replay random map clicks against the linear scan and the spatial index.
+
+    python benchmarks/bench_find_district.py --clicks 5000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from shapely.geometry import Point, shape
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from data_cache import load_json  # noqa: E402
+from spatial_index import DistrictIndex  # noqa: E402
+
+INDIA_BOUNDS = [[8.0, 68.0], [37.0, 97.0]]
+
+
+def linear_find_clicked_district(clicked_lat, clicked_lng, all_geojsons, model_data):
+    """The original per-click scan, kept as the baseline"""
+    click_point = Point(clicked_lng, clicked_lat)
+    for state_name, geojson_data in all_geojsons.items():
+        if not geojson_data:
+            continue
+        for feature in geojson_data['features']:
+            district = feature['properties']['district']
+            if district in model_data:
+                try:
+                    if shape(feature['geometry']).contains(click_point):
+                        return state_name, district
+                except Exception:
+                    continue
+    return None, None
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(name, timings):
+    print(f"{name:>8}: mean {sum(timings) / len(timings) * 1e3:8.3f} ms  "
+          f"p50 {percentile(timings, 50) * 1e3:8.3f} ms  p99 {percentile(timings, 99) * 1e3:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark click-to-district resolution')
+    parser.add_argument('--clicks', type=int, default=3000, help='Number of random clicks to replay')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data', default=str(ROOT / 'data' / 'sample5renamed.json.json'))
+    args = parser.parse_args()
+
+    all_geojsons = {f.stem: load_json(f) for f in sorted((ROOT / 'states').glob('*.json'))}
+    model_data = next(iter(load_json(args.data).values()))
+
+    rng = random.Random(args.seed)
+    (lat_min, lng_min), (lat_max, lng_max) = INDIA_BOUNDS
+    clicks = [(rng.uniform(lat_min, lat_max), rng.uniform(lng_min, lng_max)) for _ in range(args.clicks)]
+
+    start = time.perf_counter()
+    index = DistrictIndex(all_geojsons)
+    print(f"index build: {(time.perf_counter() - start) * 1e3:.1f} ms for {len(index)} districts")
+
+    linear, indexed, mismatches, resolved = [], [], 0, 0
+    for lat, lng in clicks:
+        start = time.perf_counter()
+        expected = linear_find_clicked_district(lat, lng, all_geojsons, model_data)
+        linear.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        got = index.locate(lat, lng, districts=model_data)
+        indexed.append(time.perf_counter() - start)
+
+        mismatches += got != expected
+        resolved += got[1] is not None
+
+    # The linear scan raises (and skips) on the few invalid source polygons,
+    # which the prepared geometries still resolve
+    print(f"{args.clicks} clicks, {resolved} inside a scored district, {mismatches} differ from the linear scan")
+    report('linear', linear)
+    report('indexed', indexed)
+    print(f"speedup: {sum(linear) / sum(indexed):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Time every loader and transform on synthetic datasets scaled 1x/10x/100x.
+
+Each scale repeats the samples of every district with fresh sample IDs
+(--districts and --models also repeat the districts and models under new
+names) and writes the result to a temporary results file. Data loaders and transforms are
+timed at every scale; geometry transforms, which only depend on the state
+files, are timed once. Peak Python allocation per step comes from
+tracemalloc (its overhead is excluded from the timings, which are taken in
+separate untraced runs).
+
+    python benchmarks/bench_loaders.py --scales 1,10,100 --repeat 3
+    python benchmarks/bench_loaders.py --scales 10 --districts 10 --models 2
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from synthetic import ROOT, DATA_FILE, load_results, write_scaled
+
+sys.path.insert(0, str(ROOT))
+
+from bootstrap import WerIntervals  # noqa: E402
+from comparison import WerMatrix, best_model_view, delta_view, rank_view  # noqa: E402
+from data_cache import FileCache, load_json  # noqa: E402
+from district_join import build_join  # noqa: E402
+from error_analysis import ErrorTables  # noqa: E402
+from map_layers import add_wer_to_geojson, build_india_layer  # noqa: E402
+from map_styles import _compute_bins  # noqa: E402
+from results_store import ResultsStore, write_results_store  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+from spatial_index import DistrictIndex  # noqa: E402
+
+
+def measure(step, repeat):
+    """(best seconds, peak allocated bytes) of step()"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        step()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def report(scale, name, seconds, peak):
+    print(f"{scale:>6} {name:>22}: {seconds * 1000:10.1f} ms  peak {peak / 2 ** 20:9.1f} MiB", flush=True)
+
+
+def data_steps(path, store_dir, skip):
+    data = load_json(path)
+    model = next(iter(data))
+    models = list(data)
+    steps = {
+        'json_load': lambda: FileCache().get(path),
+        'results_store_write': lambda: write_results_store(data, store_dir),
+        'results_store_open': lambda: [ResultsStore(store_dir).wer_vector(m) for m in models],
+        'district_bins': lambda: _compute_bins(data, model),
+        'wer_matrix': lambda: WerMatrix(data),
+        'comparison_views': lambda: (lambda matrix: (delta_view(matrix, models[0], models[-1]),
+                                                     best_model_view(matrix),
+                                                     rank_view(matrix, model)))(WerMatrix(data)),
+        'search_index': lambda: SearchIndex(data),
+        'error_tables': lambda: ErrorTables(data),
+        'wer_intervals': lambda: WerIntervals(data),
+    }
+    return {name: step for name, step in steps.items() if name not in skip}
+
+
+def geo_steps(skip):
+    base_geojsons = {f.stem: load_json(f) for f in sorted((ROOT / 'states').glob('*.json'))}
+    data = load_json(DATA_FILE)
+    model = next(iter(data))
+    india_layer = build_india_layer(base_geojsons)
+    join = build_join(data, base_geojsons)
+    steps = {
+        'state_geojson_load': lambda: [FileCache().get(f) for f in sorted((ROOT / 'states').glob('*.json'))],
+        'india_layer': lambda: build_india_layer(base_geojsons),
+        'district_join': lambda: build_join(data, base_geojsons),
+        'add_wer_to_geojson': lambda: add_wer_to_geojson(india_layer, data[model], None, join.feature_districts),
+        'district_index': lambda: DistrictIndex(base_geojsons),
+    }
+    return {name: step for name, step in steps.items() if name not in skip}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark loaders and transforms on scaled synthetic data')
+    parser.add_argument('--scales', default='1,10,100', help='Comma-separated samples-per-district scales')
+    parser.add_argument('--districts', type=int, default=1, help='Copies of every district')
+    parser.add_argument('--models', type=int, default=1, help='Copies of every model')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip', default='', help='Comma-separated steps to skip, e.g. error_tables')
+    parser.add_argument('--data', default=str(DATA_FILE))
+    args = parser.parse_args()
+    skip = set(filter(None, args.skip.split(',')))
+
+    data = load_results(args.data)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, step in geo_steps(skip).items():
+            report('-', name, *measure(step, args.repeat))
+        for scale in (int(scale) for scale in args.scales.split(',')):
+            path = write_scaled(data, scale, tmp_dir, args.districts, args.models)
+            scaled = load_json(path)
+            districts = {district for model in scaled for district in scaled[model]}
+            samples = sum(len(d.get('Samples', {})) for model in scaled for d in scaled[model].values())
+            print(f"scale {scale}x: {len(scaled):,} models, {len(districts):,} districts, {samples:,} samples, "
+                  f"{path.stat().st_size / 2 ** 20:,.1f} MiB")
+            for name, step in data_steps(path, Path(tmp_dir) / f"store_x{scale}", skip).items():
+                report(f"{scale}x", name, *measure(step, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare the map payload and render time of per-state layers vs the merged layer.
+
+    python benchmarks/bench_map_payload.py --repeat 3
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import folium
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from data_cache import load_json  # noqa: E402
+from map_layers import build_india_layer, get_wer_layers  # noqa: E402
+
+
+def style_function(feature):
+    return {'fillColor': '#00ff00', 'color': 'black', 'weight': 1, 'fillOpacity': 0.7}
+
+
+def render(layers):
+    m = folium.Map(location=[23.0, 82.0], zoom_start=5, min_zoom=5, max_zoom=10)
+    for name, geojson_data in layers.items():
+        folium.GeoJson(
+            geojson_data,
+            name=name,
+            style_function=style_function,
+            tooltip=folium.GeoJsonTooltip(fields=['district', 'wer'], aliases=['District:', 'WER:']),
+        ).add_to(m)
+    return m.get_root().render()
+
+
+def measure(name, layers, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html = render(layers)
+        timings.append(time.perf_counter() - start)
+    print(f"{name:>10}: {len(html.encode()):>12,} bytes  best render {min(timings) * 1e3:8.1f} ms")
+    return len(html.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark map payload size and render time')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data', default=str(ROOT / 'data' / 'sample5renamed.json.json'))
+    args = parser.parse_args()
+
+    data = load_json(args.data)
+    model = next(iter(data))
+    base_geojsons = {f.stem: load_json(f) for f in sorted((ROOT / 'states').glob('*.json'))}
+
+    start = time.perf_counter()
+    india_layer = build_india_layer(base_geojsons)
+    print(f"merge + simplify: {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    before = measure('per-state', get_wer_layers(base_geojsons, model, data[model], None), args.repeat)
+    after = measure('merged', get_wer_layers({'india': india_layer}, model, data[model], None), args.repeat)
+    print(f"payload: {after / before:.1%} of per-state layers")
+
+
+if __name__ == "__main__":
+    main()
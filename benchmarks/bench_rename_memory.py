@@ -0,0 +1,66 @@
+"""Peak RSS of district_mappings.replace_district_names, in-memory vs streaming.
+
+Builds a synthetic input by repeating the samples of every district
+(benchmarks/synthetic.py), then runs each mode in a fresh interpreter and compares outputs.
+
+    python benchmarks/bench_rename_memory.py --scale 40
+"""
+import argparse
+import filecmp
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import ROOT, scale_results
+
+_RUN = """
+import resource, sys
+sys.path.insert(0, {root!r})
+from district_mappings import replace_district_names
+replace_district_names({src!r}, {dst!r}, streaming={streaming})
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run(src, dst, streaming):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', _RUN.format(root=str(ROOT), src=str(src), dst=str(dst), streaming=streaming)],
+        capture_output=True, text=True, check=True,
+    )
+    # ru_maxrss is in KiB on Linux
+    return int(result.stdout.strip().splitlines()[-1]) * 1024, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark peak memory of district renaming')
+    parser.add_argument('--scale', type=int, default=20, help='Copies of every sample in the synthetic input')
+    parser.add_argument('--districts', type=int, default=1, help='Copies of every district')
+    parser.add_argument('--models', type=int, default=1, help='Copies of every model')
+    parser.add_argument('--data', default=str(ROOT / 'data' / 'sample5.json'))
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / 'input.json'
+        with open(src, 'w', encoding='utf-8') as f:
+            json.dump(scale_results(data, args.scale, args.districts, args.models), f, ensure_ascii=False, indent=4)
+        del data
+        print(f"input: {src.stat().st_size / 2**20:,.1f} MiB")
+
+        for streaming in (False, True):
+            dst = Path(tmp) / f"output_{streaming}.json"
+            rss, elapsed = run(src, dst, streaming)
+            print(f"{'streaming' if streaming else 'in-memory':>10}: peak RSS {rss / 2**20:8.1f} MiB  {elapsed:6.2f} s")
+
+        same = filecmp.cmp(Path(tmp) / 'output_False.json', Path(tmp) / 'output_True.json', shallow=False)
+        print(f"outputs byte-identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
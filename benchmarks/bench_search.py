@@ -0,0 +1,71 @@
+"""Query latency of search_index.SearchIndex on a scaled-up corpus.
+
+Builds a synthetic dataset by repeating the samples of every district
+(benchmarks/synthetic.py), indexes it, and times word and phrase queries
+drawn from the data.
+
+    python benchmarks/bench_search.py --scale 100
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from search_index import SearchIndex, search_tokens  # noqa: E402
+from synthetic import scale_results  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full-text search over transcripts')
+    parser.add_argument('--scale', type=int, default=20, help='Copies of every sample in the synthetic corpus')
+    parser.add_argument('--districts', type=int, default=1, help='Copies of every district')
+    parser.add_argument('--models', type=int, default=1, help='Copies of every model')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--data', default=str(ROOT / 'data' / 'sample5renamed.json.json'))
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    corpus = scale_results(data, args.scale, args.districts, args.models)
+
+    start = time.perf_counter()
+    index = SearchIndex(corpus)
+    print(f"indexed {index.documents:,} transcripts in {time.perf_counter() - start:.1f} s")
+
+    # Queries: single words and 2-3 word phrases taken from real references
+    rng = random.Random(0)
+    references = [sample['Reference'] for districts in data.values() for district in districts.values()
+                  for sample in district.get('Samples', {}).values()]
+    queries = []
+    for _ in range(args.queries):
+        tokens = search_tokens(rng.choice(references))
+        if not tokens:
+            continue
+        length = rng.choice((1, 2, 3))
+        first = rng.randrange(max(1, len(tokens) - length + 1))
+        phrase = ' '.join(tokens[first:first + length])
+        queries.append(f'"{phrase}"' if length > 1 else phrase)
+
+    models = list(corpus)[:2]
+    for label, kwargs in (('all models', {}), ('2 models', {'models': models})):
+        latencies = []
+        totals = []
+        for query in queries:
+            start = time.perf_counter()
+            result = index.search(query, limit=20, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            totals.append(result['total'])
+        latencies.sort()
+        print(f"{label:>10}: p50 {statistics.median(latencies) * 1000:6.2f} ms  "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f} ms  "
+              f"max {latencies[-1] * 1000:6.2f} ms  (median {statistics.median(totals):,.0f} hits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Drive app.py headlessly through scripted sessions; report latency and memory.
+
+Every session opens the app with Streamlit's AppTest and then, in random
+order of models and districts:
+
+- switches model and selects a district from the dropdown
+- clicks the map: a point inside a district is resolved with the app's
+  find_clicked_district and applied the way the click handler does
+- searches the transcripts
+- loads a sample's audio and fetches it through audio_proxy.py
+
+Audio comes from a local proxy over generated silent clips, so nothing is
+fetched from the network. The app reads a synthetic dataset scaled with
+--scale (copies of every sample, with fresh IDs) and --models. Sessions share the process, as they do on
+a server, so the first one pays for the shared caches.
+
+    python benchmarks/load_test.py --scale 10 --sessions 5
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import ThreadingHTTPServer
+
+import requests
+from shapely.geometry import shape
+
+from synthetic import ROOT, DATA_FILE, format_summary, load_results, write_fake_audio, write_scaled
+
+sys.path.insert(0, str(ROOT))
+
+from audio_proxy import AudioProxy, AudioProxyHandler, DiskCache, LocalDirBackend  # noqa: E402
+from data_cache import load_json  # noqa: E402
+from district_join import build_join, feature_id  # noqa: E402
+
+SEARCH_QUERIES = ['"यहाँ पर"', 'बहुत', '"दिखाई दे रहे"']
+
+
+def start_audio_proxy(data, tmp_dir):
+    clips = write_fake_audio(data, f"{tmp_dir}/bucket")
+    AudioProxyHandler.proxy = AudioProxy(LocalDirBackend(f"{tmp_dir}/bucket"), DiskCache(f"{tmp_dir}/cache"))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), AudioProxyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"audio proxy on port {server.server_port} serving {clips:,} fake clips")
+    return server
+
+
+def click_points(base_geojsons, model_data, join, rng, count):
+    """(lat, lng) points inside random districts the model has results for"""
+    candidates = [
+        feature for geojson_data in base_geojsons.values() for feature in geojson_data['features']
+        if feature.get('geometry') and join.feature_districts.get(feature_id(feature['properties'])) in model_data
+    ]
+    points = []
+    for feature in rng.sample(candidates, min(count, len(candidates))):
+        point = shape(feature['geometry']).representative_point()
+        points.append((point.y, point.x))
+    return points
+
+
+def max_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Session:
+    def __init__(self, app_module, timings, rng, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = app_module
+        self.timings = timings
+        self.rng = rng
+        self.at = AppTest.from_file(str(ROOT / 'app.py'), default_timeout=timeout)
+
+    def timed(self, action, step):
+        start = time.perf_counter()
+        result = step()
+        self.timings[action].append(time.perf_counter() - start)
+        if len(self.at.exception):
+            raise RuntimeError(f"{action}: {self.at.exception[0].value}")
+        return result
+
+    def run(self, data, base_geojsons, join, clicks):
+        at = self.at
+        self.timed('open', at.run)
+
+        model = self.rng.choice(list(data))
+        self.timed('switch_model', lambda: at.selectbox[0].set_value(model).run())
+        district = self.rng.choice([d for d in data[model] if data[model][d].get('Samples')])
+        self.timed('select_district', lambda: at.selectbox(key='district_selector').set_value(district).run())
+
+        for lat, lng in click_points(base_geojsons, data[model], join, self.rng, clicks):
+            state, clicked = self.timed('find_clicked_district', lambda: self.app.find_clicked_district(
+                lat, lng, base_geojsons, data[model], join))
+            if clicked is None:
+                continue
+            # What the click handler does before st.rerun()
+            at.session_state['clicked_state'] = state
+            at.session_state['clicked_district'] = clicked
+            at.session_state['last_click'] = {'lat': lat, 'lng': lng}
+            self.timed('map_click', at.run)
+
+        query = self.rng.choice(SEARCH_QUERIES)
+        self.timed('search', lambda: at.text_input(key='search_query').set_value(query).run())
+
+        samples = data[model][at.session_state['clicked_district']].get('Samples', {})
+        if samples and len(at.toggle):
+            self.timed('load_audio', lambda: at.toggle[0].set_value(True).run())
+            url = self.app.audio_url(next(iter(samples.values()))['URL'])
+            response = self.timed('audio_fetch', lambda: requests.get(url, timeout=30))
+            response.raise_for_status()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless load test of app.py with local stand-ins for remote assets')
+    parser.add_argument('--scale', type=int, default=1, help='Copies of every sample in the synthetic dataset')
+    parser.add_argument('--models', type=int, default=1, help='Copies of every model')
+    parser.add_argument('--sessions', type=int, default=5)
+    parser.add_argument('--clicks', type=int, default=3, help='Map clicks per session')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds allowed per app rerun')
+    parser.add_argument('--data', default=str(DATA_FILE))
+    args = parser.parse_args()
+
+    data = load_results(args.data)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        server = start_audio_proxy(data, tmp_dir)
+        os.environ['ASR_DATA_FILE'] = str(write_scaled(data, args.scale, tmp_dir, models=args.models))
+        os.environ['ASR_RESULTS_STORE_DIR'] = f"{tmp_dir}/no_store"
+        os.environ['AUDIO_PROXY_URL'] = f"http://127.0.0.1:{server.server_port}"
+
+        import app  # noqa: E402  (reads the environment above)
+
+        scaled = load_json(os.environ['ASR_DATA_FILE'])
+        base_geojsons = {f.stem: load_json(f) for f in sorted((ROOT / 'states').glob('*.json'))}
+        join = build_join(scaled, base_geojsons)
+        samples = sum(len(d.get('Samples', {})) for model in scaled for d in scaled[model].values())
+        print(f"scale {args.scale}x: {len(scaled):,} models, {samples:,} samples; baseline max RSS {max_rss_mib():,.0f} MiB")
+
+        rng = random.Random(args.seed)
+        timings = defaultdict(list)
+        for i in range(args.sessions):
+            start = time.perf_counter()
+            Session(app, timings, rng, args.timeout).run(scaled, base_geojsons, join, args.clicks)
+            print(f"session {i + 1}: {time.perf_counter() - start:6.1f} s  max RSS {max_rss_mib():,.0f} MiB",
+                  flush=True)
+
+        print()
+        for action, action_timings in timings.items():
+            print(format_summary(action, action_timings))
+        print(f"audio proxy cache: {AudioProxyHandler.proxy.cache.stats()}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Shared helpers for the benchmarks: scaled datasets, fake audio and percentiles."""
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_FILE = ROOT / 'data' / 'sample5renamed.json.json'
+
+
+def load_results(path=DATA_FILE) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def scale_results(data: Dict[str, Any], scale: int, districts: int = 1, models: int = 1) -> Dict[str, Any]:
+    """A larger copy of `data`: `scale` times the samples of every district,
+    `districts` times the districts and `models` times the models
+
+    Repeated samples get fresh IDs (Sample_1, Sample_2, ... per district),
+    repeated districts and models a numbered name ("Pune 2", "Google_2").
+    Every district dict is a new one, so no two partitions share state.
+    """
+    if scale == districts == models == 1:
+        return data
+    scaled = {}
+    for copy in range(models):
+        for model, model_data in data.items():
+            name = model if copy == 0 else f"{model}_{copy + 1}"
+            scaled[name] = {}
+            for district_copy in range(districts):
+                for district, district_data in model_data.items():
+                    samples = list(district_data.get('Samples', {}).values())
+                    record = dict(district_data)
+                    if samples:
+                        record['Samples'] = {f"Sample_{i + 1}": dict(sample)
+                                             for i, sample in enumerate(samples * scale)}
+                    scaled[name][district if district_copy == 0 else f"{district} {district_copy + 1}"] = record
+    return scaled
+
+
+def write_scaled(data: Dict[str, Any], scale: int, out_dir, districts: int = 1, models: int = 1) -> Path:
+    """Write the scaled dataset as a results JSON file and return its path"""
+    path = Path(out_dir) / f"results_x{scale}_d{districts}_m{models}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(scale_results(data, scale, districts, models), f, ensure_ascii=False)
+    return path
+
+
+def sample_urls(data: Dict[str, Any]) -> Iterable[str]:
+    return {
+        sample['URL']
+        for districts in data.values()
+        for district_data in districts.values()
+        for sample in district_data.get('Samples', {}).values()
+        if sample.get('URL')
+    }
+
+
+def silent_wav(seconds: float = 0.25, rate: int = 16000) -> bytes:
+    """16-bit mono PCM WAV of silence"""
+    frames = int(seconds * rate)
+    header = struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + frames * 2, b'WAVE', b'fmt ', 16, 1, 1,
+                         rate, rate * 2, 2, 16, b'data', frames * 2)
+    return header + bytes(frames * 2)
+
+
+def write_fake_audio(data: Dict[str, Any], root) -> int:
+    """Write a silent clip for every sample URL as <root>/<host>/<path> (audio_proxy --local-dir layout)"""
+    clip = silent_wav()
+    count = 0
+    for url in sample_urls(data):
+        parsed = urlparse(url)
+        path = Path(root) / parsed.netloc / unquote(parsed.path).lstrip('/')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(clip)
+        count += 1
+    return count
+
+
+def summarize(timings) -> Dict[str, float]:
+    """Percentiles of durations in seconds, in milliseconds"""
+    ms = np.asarray(timings, dtype=float) * 1000
+    return {
+        'n': len(ms),
+        'p50': float(np.percentile(ms, 50)),
+        'p95': float(np.percentile(ms, 95)),
+        'p99': float(np.percentile(ms, 99)),
+        'max': float(ms.max()),
+    }
+
+
+def format_summary(name: str, timings) -> str:
+    stats = summarize(timings)
+    return (f"{name:>24}: n {stats['n']:>4}  p50 {stats['p50']:9.1f} ms  p95 {stats['p95']:9.1f} ms  "
+            f"p99 {stats['p99']:9.1f} ms  max {stats['max']:9.1f} ms")
@@ -0,0 +1,215 @@
+"""Bootstrap confidence intervals for district and model WER.
+
+A district's WER pools the word errors of a handful of samples, so it moves
+a lot with which samples were drawn. Every sample contributes its
+(errors, reference words): the counts written by wer.py's rescoring when
+present, otherwise scored here with wer.score_pairs. The interval of a
+(model, district) is the percentile interval of the pooled WER over
+`resamples` resamplings of its samples with replacement. A model's
+interval resamples within every district and pools them, so districts
+keep their weight.
+
+Intervals are built around the pooled WER of the samples themselves
+(`estimates`), which need not match the WER stored with the results (it
+may cover more audio than the samples, or be scored differently), so an
+interval is shown with its estimate rather than next to the stored WER.
+
+All groups are resampled in one batched NumPy pass: a [resamples, samples]
+block of random indices into the flattened counts, gathered and summed per
+group with np.add.reduceat. Blocks are capped at MAX_BLOCK_CELLS so memory
+stays bounded on large results.
+"""
+import json
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data_cache import Memo
+from wer import score_pairs
+
+DEFAULT_RESAMPLES = 2000
+CONFIDENCE = 0.95
+# Random indices per block (int64 + gathered counts: ~24 bytes a cell)
+MAX_BLOCK_CELLS = 1_000_000
+
+# One set of intervals per data version, shared across sessions
+_intervals = Memo(max_entries=2, name='wer_intervals')
+
+Interval = Tuple[float, float]
+
+
+def sample_counts(data) -> Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray, np.ndarray]:
+    """(partitions, group start offsets, errors, reference words) of every sample
+
+    Samples are laid out partition by partition; partitions without samples
+    are left out.
+    """
+    partitions, starts = [], []
+    errors: List[int] = []
+    words: List[int] = []
+    unscored, pairs = [], []
+    for model in data:
+        for district, district_data in data[model].items():
+            samples = district_data.get('Samples', {})
+            if not samples:
+                continue
+            partitions.append((model, district))
+            starts.append(len(errors))
+            for sample in samples.values():
+                if 'ReferenceWords' in sample:
+                    errors.append(sample['Substitutions'] + sample['Deletions'] + sample['Insertions'])
+                    words.append(sample['ReferenceWords'])
+                else:
+                    unscored.append(len(errors))
+                    pairs.append((sample.get('Reference', ''), sample.get('ModelOutput', '')))
+                    errors.append(0)
+                    words.append(0)
+    for ix, score in zip(unscored, score_pairs(pairs)):
+        errors[ix] = score['Errors']
+        words[ix] = score['ReferenceWords']
+    return (partitions, np.asarray(starts, dtype=np.int64),
+            np.asarray(errors, dtype=np.int64), np.asarray(words, dtype=np.int64))
+
+
+def _wer(errors: np.ndarray, words: np.ndarray) -> np.ndarray:
+    """wer.wer_percent over arrays"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(words > 0, 100.0 * errors / words, np.where(errors > 0, 100.0, 0.0))
+
+
+def _resampled_sums(starts: np.ndarray, sizes: np.ndarray, errors: np.ndarray, words: np.ndarray,
+                    resamples: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """[resamples, groups] error and word sums, resampling within each group"""
+    group_of = np.repeat(np.arange(len(sizes)), sizes)
+    ends = starts + sizes
+    block_samples = max(1, MAX_BLOCK_CELLS // resamples)
+    error_sums = np.empty((resamples, len(sizes)), dtype=np.int64)
+    word_sums = np.empty_like(error_sums)
+    first = 0
+    while first < len(sizes):
+        # Whole groups per block, at least one
+        last = max(first + 1, int(np.searchsorted(ends, starts[first] + block_samples, side='right')))
+        lo, hi = starts[first], ends[last - 1]
+        local_groups = group_of[lo:hi]
+        picks = starts[local_groups] + rng.integers(0, sizes[local_groups], size=(resamples, hi - lo))
+        offsets = starts[first:last] - lo
+        error_sums[:, first:last] = np.add.reduceat(errors[picks], offsets, axis=1)
+        word_sums[:, first:last] = np.add.reduceat(words[picks], offsets, axis=1)
+        first = last
+    return error_sums, word_sums
+
+
+class WerIntervals:
+    """Bootstrap WER intervals of every (model, district) and every model"""
+
+    def __init__(self, data, resamples: int = DEFAULT_RESAMPLES, confidence: float = CONFIDENCE, seed: int = 0):
+        self.resamples = resamples
+        self.confidence = confidence
+        partitions, starts, errors, words = sample_counts(data)
+        sizes = np.diff(np.append(starts, len(errors)))
+        self.samples = dict(zip(partitions, sizes.tolist()))
+        self.districts: Dict[Tuple[str, str], Interval] = {}
+        self.models: Dict[str, Interval] = {}
+        # Pooled WER of the samples the intervals are built around
+        self.estimates: Dict[Tuple[str, str], float] = {}
+        self.model_estimates: Dict[str, float] = {}
+        if not partitions:
+            return
+
+        error_totals, word_totals = np.add.reduceat(errors, starts), np.add.reduceat(words, starts)
+        self.estimates = dict(zip(partitions, _wer(error_totals, word_totals).tolist()))
+
+        error_sums, word_sums = _resampled_sums(starts, sizes, errors, words, resamples, np.random.default_rng(seed))
+        tail = (1 - confidence) / 2 * 100
+        quantiles = np.percentile(_wer(error_sums, word_sums), [tail, 100 - tail], axis=0)
+        for partition, low, high in zip(partitions, quantiles[0].tolist(), quantiles[1].tolist()):
+            self.districts[partition] = (low, high)
+
+        # Models: pool the districts' resampled sums
+        models = list(dict.fromkeys(model for model, _ in partitions))
+        membership = np.zeros((len(partitions), len(models)), dtype=np.int64)
+        membership[np.arange(len(partitions)), [models.index(model) for model, _ in partitions]] = 1
+        quantiles = np.percentile(_wer(error_sums @ membership, word_sums @ membership), [tail, 100 - tail], axis=0)
+        for model, low, high in zip(models, quantiles[0].tolist(), quantiles[1].tolist()):
+            self.models[model] = (low, high)
+        self.model_estimates = dict(zip(models, _wer(error_totals @ membership, word_totals @ membership).tolist()))
+
+    def district(self, model: str, district: str) -> Optional[Interval]:
+        return self.districts.get((model, district))
+
+    def model(self, model: str) -> Optional[Interval]:
+        return self.models.get(model)
+
+    def by_district(self, model: str) -> Dict[str, Tuple[float, Interval]]:
+        """{district: (sample WER, interval)} of one model"""
+        return {district: (self.estimates[(m, district)], interval)
+                for (m, district), interval in self.districts.items() if m == model}
+
+
+def format_interval(interval: Optional[Interval]) -> str:
+    """'30.1–44.2%', or '' without an interval"""
+    if interval is None:
+        return ''
+    return f"{interval[0]:.1f}–{interval[1]:.1f}%"
+
+
+def format_estimate(estimate: float, interval: Interval, confidence: float = CONFIDENCE) -> str:
+    """'samples: 37.0%, 95% CI 30.1–44.2%'"""
+    return f"samples: {estimate:.1f}%, {confidence:.0%} CI {format_interval(interval)}"
+
+
+def get_wer_intervals(data, data_version: Optional[str]) -> WerIntervals:
+    """WER intervals of the loaded results, resampled once per data version"""
+    return _intervals.get((data_version, id(data)), lambda: WerIntervals(data), refs=data)
+
+
+def get_wer_intervals_nowait(data, data_version: Optional[str]) -> Optional[WerIntervals]:
+    """WER intervals of the loaded results, or None while they are resampled in the background
+
+    Resampling scores every sample, which on the results store means
+    decoding all of them; a page shouldn't wait for that.
+    """
+    return _intervals.get_nowait((data_version, id(data)), lambda: WerIntervals(data), refs=data)
+
+
+def interval_report(json_file_path, resamples=DEFAULT_RESAMPLES, confidence=CONFIDENCE):
+    try:
+        # Read the JSON file
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        intervals = WerIntervals(data, resamples, confidence)
+        for model in data:
+            interval = intervals.model(model)
+            print(f"{model}: " + (format_estimate(intervals.model_estimates[model], interval, confidence)
+                                  if interval is not None else 'no samples'))
+            for district in data[model]:
+                interval = intervals.district(model, district)
+                if interval is not None:
+                    print(f"  {district}: WER {data[model][district]['WER']}%  "
+                          f"({format_estimate(intervals.estimates[(model, district)], interval, confidence)}; "
+                          f"{intervals.samples[(model, district)]} samples)")
+        return True
+
+    except FileNotFoundError:
+        print(f"Error: File '{json_file_path}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: '{json_file_path}' contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Bootstrap confidence intervals for district and model WER')
+    parser.add_argument('input_json', help='Path to the results JSON file')
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES, help='Bootstrap resamples')
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE, help='Interval coverage, e.g. 0.95')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided arguments
+    interval_report(args.input_json, args.resamples, args.confidence)
@@ -0,0 +1,170 @@
+"""Multi-model comparison views built from one models × districts WER matrix.
+
+The matrix is built once per data version (straight from the results
+store's WER column when available). Difference, best-model and rank views
+are whole-matrix NumPy operations that produce a {district: bin} table, a
+tooltip label per district and a legend, ready for BinnedGeoJson or
+TiledDistrictLayer.
+"""
+import colorsys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from data_cache import Memo
+
+# Model A − model B, in WER percentage points
+DELTA_THRESHOLDS = np.array([-10.0, -2.0, 2.0, 10.0])
+DELTA_COLORS = ['#1a9641', '#a6d96a', '#ffffbf', '#fdae61', '#d7191c']
+MODEL_COLORS = ['#1b9e77', '#d95f02', '#7570b3', '#e7298a', '#66a61e', '#e6ab02', '#a6761d', '#666666']
+TIE_COLOR = '#80cdc1'
+RANK_COLORS = ['#1a9850', '#91cf60', '#d9ef8b', '#fee08b', '#fc8d59', '#d73027']
+
+# One entry per data version, shared across sessions
+_matrices = Memo(max_entries=2, name='wer_matrices')
+_views = Memo(max_entries=32, name='comparison_views')
+
+
+def _hex(rgb) -> str:
+    return '#' + ''.join(f"{round(channel * 255):02x}" for channel in rgb)
+
+
+def model_colors(count: int) -> List[str]:
+    """One distinct colour per model: MODEL_COLORS, then golden-angle hues"""
+    colors = MODEL_COLORS[:count]
+    taken = set(colors) | {TIE_COLOR, '#cccccc'}
+    i = 0
+    while len(colors) < count:
+        color = _hex(colorsys.hls_to_rgb((i * 0.381966) % 1.0, 0.45 if i % 2 else 0.6, 0.65))
+        i += 1
+        if color not in taken:
+            taken.add(color)
+            colors.append(color)
+    return colors
+
+
+def rank_colors(count: int) -> List[str]:
+    """A colour per rank, best to worst; RANK_COLORS stretched past its length
+
+    Stretched over hundreds of ranks, neighbours can round to one colour;
+    rank_view's legend then lists them as one entry.
+    """
+    if count <= len(RANK_COLORS):
+        return RANK_COLORS[:count]
+    stops = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)] for color in RANK_COLORS], dtype=float)
+    at = np.linspace(0, len(RANK_COLORS) - 1, count)
+    rgb = np.column_stack([np.interp(at, np.arange(len(RANK_COLORS)), stops[:, c]) for c in range(3)])
+    return [_hex(row / 255) for row in rgb]
+
+
+class WerMatrix:
+    """WER of every model in every district; NaN where a model has no result"""
+
+    def __init__(self, data):
+        if hasattr(data, 'wer_vector'):
+            self.models: List[str] = list(data.models)
+            self.districts: List[str] = list(data.districts)
+            self.values = np.vstack([data.wer_vector(model) for model in self.models]).astype(float)
+        else:
+            self.models = list(data)
+            self.districts = list(dict.fromkeys(d for model in self.models for d in data[model]))
+            columns = {district: i for i, district in enumerate(self.districts)}
+            self.values = np.full((len(self.models), len(self.districts)), np.nan)
+            for m, model in enumerate(self.models):
+                for district, district_data in data[model].items():
+                    self.values[m, columns[district]] = float(district_data['WER'])
+
+    def row(self, model: str) -> np.ndarray:
+        return self.values[self.models.index(model)]
+
+    def delta(self, model_a: str, model_b: str) -> np.ndarray:
+        """WER of A minus WER of B per district (negative: A is better)"""
+        return self.row(model_a) - self.row(model_b)
+
+    def ranks(self) -> np.ndarray:
+        """[models, districts] rank by WER, 1 = best, ties share a rank, 0 = no result"""
+        values = self.values
+        better = (values[None, :, :] < values[:, None, :]).sum(axis=1)
+        return np.where(np.isnan(values), 0, better + 1)
+
+    def best(self):
+        """(index of the best model or -1, number of models tied for best) per district"""
+        filled = np.where(np.isnan(self.values), np.inf, self.values)
+        best = filled.argmin(axis=0)
+        lowest = filled.min(axis=0)
+        tied = (filled == lowest).sum(axis=0)
+        return np.where(np.isinf(lowest), -1, best), tied
+
+
+def _view(districts, bins: np.ndarray, labels: List[str], colors: List[str],
+          legend: List[str], label_name: str) -> Dict[str, Any]:
+    present = bins >= 0
+    return {
+        'bins': {d: b for d, b, ok in zip(districts, bins.tolist(), present) if ok},
+        'labels': {d: label for d, label, ok in zip(districts, labels, present) if ok},
+        'colors': colors,
+        'legend': list(zip(colors, legend)),
+        'label_name': label_name,
+    }
+
+
+def delta_view(matrix: WerMatrix, model_a: str, model_b: str) -> Dict[str, Any]:
+    delta = matrix.delta(model_a, model_b)
+    bins = np.where(np.isnan(delta), -1, np.digitize(np.nan_to_num(delta), DELTA_THRESHOLDS, right=True))
+    a, b = matrix.row(model_a), matrix.row(model_b)
+    labels = [f"{d:+.2f} pts ({wa:.2f}% vs {wb:.2f}%)" for d, wa, wb in zip(delta.tolist(), a.tolist(), b.tolist())]
+    legend = [f"{model_a} better by > 10 pts", f"{model_a} better by 2-10 pts", "Within 2 pts",
+              f"{model_b} better by 2-10 pts", f"{model_b} better by > 10 pts"]
+    return _view(matrix.districts, bins, labels, DELTA_COLORS, legend, f"{model_a} − {model_b}")
+
+
+def best_model_view(matrix: WerMatrix) -> Dict[str, Any]:
+    best, tied = matrix.best()
+    colors = model_colors(len(matrix.models)) + [TIE_COLOR]
+    tie_bin = len(matrix.models)
+    bins = np.where(best < 0, -1, np.where(tied > 1, tie_bin, best))
+    lowest = np.nanmin(np.where(np.isnan(matrix.values), np.inf, matrix.values), axis=0)
+    labels = [
+        f"{tie_count} models tied ({wer:.2f}%)" if tie_count > 1 else f"{matrix.models[ix]} ({wer:.2f}%)"
+        for ix, tie_count, wer in zip(best.tolist(), tied.tolist(), lowest.tolist())
+    ]
+    return _view(matrix.districts, bins, labels, colors, matrix.models + ["Tie"], "Best model")
+
+
+def rank_view(matrix: WerMatrix, model: str) -> Dict[str, Any]:
+    ranks = matrix.ranks()[matrix.models.index(model)]
+    count = len(matrix.models)
+    colors = rank_colors(count)
+    bins = ranks - 1  # no result (rank 0) becomes -1
+    labels = [f"{rank} of {count}" for rank in ranks.tolist()]
+    legend = [f"Rank {rank}" for rank in range(1, count + 1)]
+    view = _view(matrix.districts, bins, labels, colors, legend, f"{model} rank")
+    # Ranks sharing a colour get one legend entry
+    groups: List[List[Any]] = []
+    for rank, color in enumerate(colors, 1):
+        if groups and groups[-1][0] == color:
+            groups[-1][2] = rank
+        else:
+            groups.append([color, rank, rank])
+    view['legend'] = [(color, f"Rank {first}" if first == last else f"Ranks {first}–{last}")
+                      for color, first, last in groups]
+    return view
+
+
+def get_wer_matrix(data, data_version: Optional[str]) -> WerMatrix:
+    """Models × districts WER matrix of the loaded results, built once per data version"""
+    return _matrices.get((data_version, id(data)), lambda: WerMatrix(data), refs=data)
+
+
+def get_comparison_view(data, data_version: Optional[str], view: str, model_a: str,
+                        model_b: str = None) -> Dict[str, Any]:
+    """'delta', 'best' or 'rank' view of the shared WER matrix"""
+    matrix = get_wer_matrix(data, data_version)
+    builders = {
+        'delta': lambda: delta_view(matrix, model_a, model_b),
+        'best': lambda: best_model_view(matrix),
+        'rank': lambda: rank_view(matrix, model_a),
+    }
+    key = (data_version, id(data), view) + ((model_a, model_b) if view == 'delta' else
+                                             (model_a,) if view == 'rank' else ())
+    return _views.get(key, builders[view], refs=data)
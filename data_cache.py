@@ -0,0 +1,211 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("signature", "digest", "size", "value")
+
+    def __init__(self, signature, digest, size, value):
+        self.signature = signature
+        self.digest = digest
+        self.size = size
+        self.value = value
+
+
+class FileCache:
+    """Bounded, process-wide cache of parsed files.
+
+    Entries are keyed by (path, parser). A lookup stats the file; when the
+    mtime/size signature changed, the file is re-read and re-parsed only if
+    its content hash changed too. Values are shared between all callers and
+    must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Callable], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, Callable], threading.Lock] = {}
+        self._stats = {"hits": 0, "misses": 0, "revalidations": 0, "evictions": 0}
+
+    def get(self, path, parse: Callable[[bytes], Any] = json.loads) -> Any:
+        """Return the parsed contents of `path`, loading it on first use"""
+        key = (str(Path(path).resolve()), parse)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One loader per file; other files stay available meanwhile
+        with key_lock:
+            stat = os.stat(key[0])
+            signature = (stat.st_mtime_ns, stat.st_size)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.signature == signature:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry.value
+
+            with open(key[0], "rb") as f:
+                raw = f.read()
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+            # Touched but unchanged (e.g. re-deployed): keep the parsed copy
+            if entry is not None and entry.digest == digest:
+                with self._lock:
+                    entry.signature = signature
+                    self._entries.move_to_end(key)
+                    self._stats["revalidations"] += 1
+                return entry.value
+
+            value = parse(raw)
+            with self._lock:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old.size
+                self._entries[key] = _Entry(signature, digest, len(raw), value)
+                self._bytes += len(raw)
+                self._stats["misses"] += 1
+                self._evict()
+            return value
+
+    def version(self, path, parse: Callable[[bytes], Any] = json.loads) -> Optional[str]:
+        """Content hash of the cached copy of `path`, or None if not cached"""
+        key = (str(Path(path).resolve()), parse)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.digest if entry is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        # Always keep the most recently loaded entry, even if it alone is over budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats["evictions"] += 1
+
+
+# Shared by every session served by this process
+_file_cache = FileCache()
+
+
+def load_json(path) -> Any:
+    """Load a JSON file through the process-wide cache"""
+    return _file_cache.get(path)
+
+
+def load_file(path, parse: Callable[[bytes], Any]) -> Any:
+    """Load a file through the process-wide cache with a custom parser"""
+    return _file_cache.get(path, parse)
+
+
+def file_version(path, parse: Callable[[bytes], Any] = json.loads) -> Optional[str]:
+    """Content hash of a cached file"""
+    return _file_cache.version(path, parse)
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and current size of the process-wide cache"""
+    return _file_cache.stats()
+
+
+class Memo:
+    """Bounded LRU of values derived from cached data, shared across sessions
+
+    `refs` are kept alive alongside each value so keys built from object ids
+    stay unique for as long as the entry is cached. Named memos are listed
+    by memo_stats().
+    """
+
+    def __init__(self, max_entries: int = 8, name: Optional[str] = None):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+        # Keys being built by get_nowait
+        self._pending = set()
+        self.name = name
+        if name is not None:
+            _memos[name] = self
+
+    def get(self, key, build: Callable[[], Any], refs: Any = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key][0]
+
+        value = build()
+        with self._lock:
+            self._entries[key] = (value, refs)
+            self._stats["misses"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_nowait(self, key, build: Callable[[], Any], refs: Any = None) -> Any:
+        """Cached value for key, or None while it is built on a background thread"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key][0]
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+
+        def run():
+            try:
+                self.get(key, build, refs)
+            except Exception:
+                logger.exception("Building a %s entry failed", self.name or 'memo')
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        threading.Thread(target=run, name=f"build-{self.name or 'memo'}", daemon=True).start()
+        return None
+
+    def peek(self, key) -> Any:
+        """Cached value for key, or None; does not build or count as a lookup"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def retain(self, keep: Callable[[Any], bool]):
+        """Drop every entry whose key `keep` rejects, releasing its refs"""
+        with self._lock:
+            for key in [key for key in self._entries if not keep(key)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+# Process-wide memos by name, for monitoring
+_memos: Dict[str, Memo] = {}
+
+
+def memo_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters and size of every named memo"""
+    return {name: memo.stats() for name, memo in _memos.items()}
@@ -0,0 +1,242 @@
+"""Join index between result districts and district features.
+
+Results name districts loosely ("Bellary", "DakshinKannada", "Sahebganj");
+the state GeoJSON files use official names and give every feature census
+codes. `build_join` resolves each result district to one feature ID
+("<st_code>-<dt_code>") once:
+
+1. the DISTRICT_MAPPINGS rename table
+2. the exact feature name
+3. the normalized name (case, spaces and punctuation ignored)
+4. the closest normalized name (difflib), above FUZZY_CUTOFF
+
+A name several features share (Aurangabad is in Bihar and Maharashtra) is
+narrowed down by the state in the district's sample audio URLs
+(".../IISc_VaaniProject_S_<State>_<District>_..."). When several result
+districts resolve to one feature, the one matched at the earliest step
+keeps it; if that is a tie, none does. Names left unresolved are listed in
+the join's `unmatched` report.
+
+The app then maps features to result districts and back with dict lookups
+on the ID instead of normalizing names per feature on every rerun.
+"""
+import argparse
+import difflib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from data_cache import Memo
+from district_mappings import DISTRICT_MAPPINGS
+
+FUZZY_CUTOFF = 0.8
+
+# State spellings in audio URLs that don't normalize to a state file name
+STATE_ALIASES = {
+    'ap': 'andhrapradesh',
+    'telengana': 'telangana',
+}
+
+_URL_STATE = re.compile(r'_S_([^_/]+)_')
+
+_joins = Memo(max_entries=4, name='district_joins')
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case letters and digits only: 'North 24 Parganas' -> 'north24parganas'"""
+    return ''.join(ch for ch in name.lower() if ch.isalnum())
+
+
+def feature_id(properties: Dict[str, Any]) -> Optional[str]:
+    """Stable ID of a district feature from its census state and district codes"""
+    st_code, dt_code = properties.get('st_code'), properties.get('dt_code')
+    if st_code is None or dt_code is None:
+        return None
+    return f"{st_code}-{dt_code}"
+
+
+def url_state(url: str) -> Optional[str]:
+    """Normalized state named in a sample audio URL, if any"""
+    match = _URL_STATE.search(url or '')
+    if not match:
+        return None
+    state = normalize_name(match.group(1))
+    return STATE_ALIASES.get(state, state)
+
+
+class DistrictJoin:
+    """Result district <-> feature ID lookups, built by build_join or loaded from its JSON"""
+
+    def __init__(self, join: Dict[str, Any]):
+        self.features: Dict[str, Dict[str, str]] = join['features']
+        self.district_ids: Dict[str, str] = join['districts']
+        self.unmatched: List[Dict[str, Any]] = join.get('unmatched', [])
+        self.feature_districts: Dict[str, str] = {}
+        for district, fid in self.district_ids.items():
+            self.feature_districts.setdefault(fid, district)
+
+    def state_of(self, district: str) -> Optional[str]:
+        """State file name of a result district"""
+        fid = self.district_ids.get(district)
+        return self.features[fid]['state'] if fid is not None else None
+
+    def district_states(self) -> Dict[str, str]:
+        """{result district: state file name}"""
+        return {district: self.features[fid]['state'] for district, fid in self.district_ids.items()}
+
+    def covers(self, districts: Iterable[str]) -> bool:
+        """Whether every one of `districts` was resolved or reported"""
+        known = set(self.district_ids).union(entry['district'] for entry in self.unmatched)
+        return all(district in known for district in districts)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'features': self.features, 'districts': self.district_ids, 'unmatched': self.unmatched}
+
+
+def read_district_join(raw: bytes) -> DistrictJoin:
+    """Parse a join file written by write_district_join (a data_cache.load_file parser)"""
+    return DistrictJoin(json.loads(raw))
+
+
+def _district_url_states(data, district: str) -> set:
+    """States named in the sample URLs of a district, across models"""
+    states = set()
+    for model in data:
+        district_data = data[model].get(district)
+        if not district_data:
+            continue
+        for sample in district_data.get('Samples', {}).values():
+            state = url_state(sample.get('URL'))
+            if state:
+                states.add(state)
+                break
+    return states
+
+
+def _state_matches(url_state_name: str, state_name: str, st_nm: str) -> bool:
+    candidates = {normalize_name(state_name), normalize_name(st_nm)}
+    return url_state_name in candidates or bool(difflib.get_close_matches(url_state_name, candidates, 1, FUZZY_CUTOFF))
+
+
+def build_join(data, base_geojsons: Dict[str, Dict[str, Any]]) -> DistrictJoin:
+    """Resolve every district in `data` ({model: {district: ...}}) to a feature of `base_geojsons`"""
+    features: Dict[str, Dict[str, str]] = {}
+    by_name: Dict[str, List[str]] = {}
+    by_normalized: Dict[str, List[str]] = {}
+    st_names: Dict[str, str] = {}
+    for state_name, geojson_data in base_geojsons.items():
+        for feature in geojson_data['features']:
+            properties = feature['properties']
+            fid = feature_id(properties)
+            if fid is None or fid in features:
+                continue
+            features[fid] = {'state': state_name, 'district': properties['district']}
+            st_names[fid] = properties.get('st_nm', '')
+            by_name.setdefault(properties['district'], []).append(fid)
+            by_normalized.setdefault(normalize_name(properties['district']), []).append(fid)
+
+    districts: Dict[str, str] = {}
+    # Lookup step that resolved each district: 0 exact, 1 normalized, 2 fuzzy
+    steps: Dict[str, int] = {}
+    unmatched: List[Dict[str, Any]] = []
+    names = sorted(set().union(*(data[model].keys() for model in data)))
+    for name in names:
+        renamed = DISTRICT_MAPPINGS.get(name, name)
+        step = 0
+        candidates = by_name.get(renamed)
+        if not candidates:
+            step = 1
+            candidates = by_normalized.get(normalize_name(renamed))
+        if not candidates:
+            step = 2
+            close = difflib.get_close_matches(normalize_name(renamed), by_normalized, 1, FUZZY_CUTOFF)
+            candidates = by_normalized[close[0]] if close else []
+        if len(candidates) > 1:
+            url_states = _district_url_states(data, name)
+            narrowed = [fid for fid in candidates
+                        if any(_state_matches(s, features[fid]['state'], st_names[fid]) for s in url_states)]
+            if len(narrowed) == 1:
+                candidates = narrowed
+        if len(candidates) == 1:
+            districts[name] = candidates[0]
+            steps[name] = step
+        else:
+            unmatched.append({
+                'district': name,
+                'reason': 'ambiguous' if candidates else 'not found',
+                'candidates': [dict(features[fid], id=fid) for fid in candidates],
+            })
+
+    # One result district per feature
+    sharing: Dict[str, List[str]] = {}
+    for name, fid in districts.items():
+        sharing.setdefault(fid, []).append(name)
+    for fid, shared in sharing.items():
+        if len(shared) < 2:
+            continue
+        best = min(steps[name] for name in shared)
+        keep = [name for name in shared if steps[name] == best]
+        for name in shared:
+            if len(keep) == 1 and name == keep[0]:
+                continue
+            del districts[name]
+            others = ', '.join(other for other in shared if other != name)
+            unmatched.append({
+                'district': name,
+                'reason': f"same feature as {others}",
+                'candidates': [dict(features[fid], id=fid)],
+            })
+    return DistrictJoin({'features': features, 'districts': districts, 'unmatched': unmatched})
+
+
+def get_district_join(data, data_version: Optional[str], base_geojsons: Dict[str, Dict[str, Any]]) -> DistrictJoin:
+    """The join of these results and (cached) state layers, built once per data version"""
+    key = (data_version, id(data),
+           tuple((state_name, id(geojson_data)) for state_name, geojson_data in base_geojsons.items()))
+    return _joins.get(key, lambda: build_join(data, base_geojsons), refs=(data, dict(base_geojsons)))
+
+
+def write_district_join(json_file_path, states_dir, output_file_path):
+    try:
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        base_geojsons = {}
+        for state_file in sorted(Path(states_dir).glob("*.json")):
+            with open(state_file, 'r', encoding='utf-8') as f:
+                base_geojsons[state_file.stem] = json.load(f)
+
+        join = build_join(data, base_geojsons)
+        with open(output_file_path, 'w', encoding='utf-8') as f:
+            json.dump(join.to_json(), f, ensure_ascii=False, indent=1)
+
+        print(f"Joined {len(join.district_ids)} districts to features in {len(base_geojsons)} states; "
+              f"written to {output_file_path}")
+        if join.unmatched:
+            print(f"{len(join.unmatched)} unmatched:")
+            for entry in join.unmatched:
+                candidates = ', '.join(f"{c['district']} ({c['state']}, {c['id']})" for c in entry['candidates'])
+                print(f"  {entry['district']}: {entry['reason']}" + (f" - {candidates}" if candidates else ''))
+        return True
+
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: '{json_file_path}' or a state file contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Resolve result districts to GeoJSON feature IDs')
+    parser.add_argument('input_json', help='Path to the results JSON file')
+    parser.add_argument('states_dir', help='Directory containing the state GeoJSON files')
+    parser.add_argument('output_json', help='Path to the join JSON output file')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided paths
+    write_district_join(args.input_json, args.states_dir, args.output_json)
@@ -1,92 +1,105 @@
 import json
 import argparse
 
-def replace_district_names(json_file_path, output_file_path):
+from json_stream import JsonStream
 
-    district_mappings = {
-        "Anantpur": "Anantapur",
-        "Araria": "Araria",
-        "Aurangabad": "Aurangabad",
-        "Balrampur": "Balrampur",
-        "Bastar": "Bastar",
-        "Begusarai": "Begusarai",
-        "Belgaum": "Belagavi",
-        "Bellary": "Ballari",
-        "Bhagalpur": "Bhagalpur",
-        "Bijapur": "Vijayapura",
-        "Bilaspur": "Bilaspur",
-        "Budaun": "Budaun",
-        "Chamrajnagar": "Chamarajanagara",
-        "Chandrapur": "Chandrapur",
-        "Chittoor": "Chittoor",
-        "Churu": "Churu",
-        "DakshinDinajpur": "Dakshin Dinajpur",
-        "DakshinKannada": "Dakshina Kannada",
-        "Darbhanga": "Darbhanga",
-        "Deoria": "Deoria",
-        "Dharwad": "Dharwad",
-        "Dhule": "Dhule",
-        "EastChamparan": "East Champaran",
-        "Etah": "Etah",
-        "Gaya": "Gaya",
-        "Ghazipur": "Ghazipur",
-        "Gopalganj": "Gopalganj",
-        "Gorakhpur": "Gorakhpur",
-        "Gulbarga": "Kalaburagi",
-        "Guntur": "Guntur",
-        "Hamirpur": "Hamirpur",
-        "Jahanabad": "Jehanabad",
-        "Jalaun": "Jalaun",
-        "Jalpaiguri": "Jalpaiguri",
-        "Jamtara": "Jamtara",
-        "Jamui": "Jamui",
-        "Jashpur": "Jashpur",
-        "Jhargram": "Jhargram",
-        "JyotibaPhuleNagar": "Amroha",
-        "Kabirdham": "Kabeerdham",
-        "Karimnagar": "Karimnagar",
-        "Kishanganj": "Kishanganj",
-        "Kolkata": "Kolkata",
-        "Korba": "Korba",
-        "Krishna": "Krishna",
-        "Lakhisarai": "Lakhisarai",
-        "Madhepura": "Madhepura",
-        "Malda": "Malda",
-        "Muzaffarpur": "Muzaffarpur",
-        "Muzzaffarnagar": "Muzaffarnagar",
-        "Mysore": "Mysuru",
-        "Nagaur": "Nagaur",
-        "Nagpur": "Nagpur",
-        "Nalgonda": "Nalgonda",
-        "North24Parganas": "North 24 Parganas",
-        "NorthSouthGoa": "North Goa",
-        "PaschimMedinipur": "Paschim Medinipur",
-        "Pune": "Pune",
-        "Purnia": "Purnia",
-        "Purulia": "Purulia",
-        "Raichur": "Raichur",
-        "Raigarh": "Raigarh",
-        "Rajnandgaon": "Rajnandgaon",
-        "Saharsa": "Saharsa",
-        "Sahebganj": "Sahebganj",
-        "Samastipur": "Samastipur",
-        "Saran": "Saran",
-        "Sarguja": "Surguja",
-        "Shimoga": "Shivamogga",
-        "Sindhudurga": "Sindhudurg",
-        "Sitamarhi": "Sitamarhi",
-        "Solapur": "Solapur",
-        "Srikakulam": "Srikakulam",
-        "Sukma": "Sukma",
-        "Supaul": "Supaul",
-        "TehriGarhwal": "Tehri Garhwal",
-        "Uttarkashi": "Uttarkashi",
-        "Vaishali": "Vaishali",
-        "Varanasi": "Varanasi",
-        "Vishakapattanam": "Visakhapatnam"
-    }
+DISTRICT_MAPPINGS = {
+    "Anantpur": "Anantapur",
+    "Araria": "Araria",
+    "Aurangabad": "Aurangabad",
+    "Balrampur": "Balrampur",
+    "Bastar": "Bastar",
+    "Begusarai": "Begusarai",
+    "Belgaum": "Belagavi",
+    "Bellary": "Ballari",
+    "Bhagalpur": "Bhagalpur",
+    "Bijapur": "Vijayapura",
+    "Bilaspur": "Bilaspur",
+    "Budaun": "Budaun",
+    "Chamrajnagar": "Chamarajanagara",
+    "Chandrapur": "Chandrapur",
+    "Chittoor": "Chittoor",
+    "Churu": "Churu",
+    "DakshinDinajpur": "Dakshin Dinajpur",
+    "DakshinKannada": "Dakshina Kannada",
+    "Darbhanga": "Darbhanga",
+    "Deoria": "Deoria",
+    "Dharwad": "Dharwad",
+    "Dhule": "Dhule",
+    "EastChamparan": "East Champaran",
+    "Etah": "Etah",
+    "Gaya": "Gaya",
+    "Ghazipur": "Ghazipur",
+    "Gopalganj": "Gopalganj",
+    "Gorakhpur": "Gorakhpur",
+    "Gulbarga": "Kalaburagi",
+    "Guntur": "Guntur",
+    "Hamirpur": "Hamirpur",
+    "Jahanabad": "Jehanabad",
+    "Jalaun": "Jalaun",
+    "Jalpaiguri": "Jalpaiguri",
+    "Jamtara": "Jamtara",
+    "Jamui": "Jamui",
+    "Jashpur": "Jashpur",
+    "Jhargram": "Jhargram",
+    "JyotibaPhuleNagar": "Amroha",
+    "Kabirdham": "Kabeerdham",
+    "Karimnagar": "Karimnagar",
+    "Kishanganj": "Kishanganj",
+    "Kolkata": "Kolkata",
+    "Korba": "Korba",
+    "Krishna": "Krishna",
+    "Lakhisarai": "Lakhisarai",
+    "Madhepura": "Madhepura",
+    "Malda": "Malda",
+    "Muzaffarpur": "Muzaffarpur",
+    "Muzzaffarnagar": "Muzaffarnagar",
+    "Mysore": "Mysuru",
+    "Nagaur": "Nagaur",
+    "Nagpur": "Nagpur",
+    "Nalgonda": "Nalgonda",
+    "North24Parganas": "North 24 Parganas",
+    "NorthSouthGoa": "North Goa",
+    "PaschimMedinipur": "Paschim Medinipur",
+    "Pune": "Pune",
+    "Purnia": "Purnia",
+    "Purulia": "Purulia",
+    "Raichur": "Raichur",
+    "Raigarh": "Raigarh",
+    "Rajnandgaon": "Rajnandgaon",
+    "Saharsa": "Saharsa",
+    "Sahebganj": "Sahebganj",
+    "Samastipur": "Samastipur",
+    "Saran": "Saran",
+    "Sarguja": "Surguja",
+    "Shimoga": "Shivamogga",
+    "Sindhudurga": "Sindhudurg",
+    "Sitamarhi": "Sitamarhi",
+    "Solapur": "Solapur",
+    "Srikakulam": "Srikakulam",
+    "Sukma": "Sukma",
+    "Supaul": "Supaul",
+    "TehriGarhwal": "Tehri Garhwal",
+    "Uttarkashi": "Uttarkashi",
+    "Vaishali": "Vaishali",
+    "Varanasi": "Varanasi",
+    "Vishakapattanam": "Visakhapatnam"
+}
+
+def replace_district_names(json_file_path, output_file_path, streaming=False):
+    district_mappings = DISTRICT_MAPPINGS
     
     try:
+        if streaming:
+            try:
+                _replace_district_names_streaming(json_file_path, output_file_path)
+                print(f"District names updated successfully. Output written to {output_file_path}")
+                return True
+            except _RenameCollision as e:
+                # Two districts renamed onto one key: json.load/dump semantics
+                # (first position, last value) need the whole model in memory
+                print(f"Warning: {e}; falling back to in-memory processing")
+        
         # Read the JSON file
         with open(json_file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
@@ -121,13 +134,63 @@ def replace_district_names(json_file_path, output_file_path):
         print(f"Error: {str(e)}")
         return False
 
+class _RenameCollision(Exception):
+    pass
+
+def _dumps_nested(value, level):
+    """json.dump(indent=4) output of `value` as it appears `level` levels deep"""
+    return json.dumps(value, ensure_ascii=False, indent=4).replace('\n', '\n' + ' ' * 4 * level)
+
+def _replace_district_names_streaming(json_file_path, output_file_path):
+    """Rename districts while copying, holding one district record at a time
+
+    Writes exactly what json.dump(..., ensure_ascii=False, indent=4) of the
+    renamed data would.
+    """
+    with open(json_file_path, 'rb') as f_in, open(output_file_path, 'w', encoding='utf-8') as f_out:
+        stream = JsonStream(f_in)
+        stream.begin_object()
+        seen_models = set()
+        model = stream.next_key()
+        if model is None:
+            f_out.write('{}')
+        while model is not None:
+            if model in seen_models:
+                raise _RenameCollision(f"duplicate model '{model}'")
+            seen_models.add(model)
+            f_out.write(('{\n' if len(seen_models) == 1 else ',\n') + ' ' * 4 + _dumps_nested(model, 1) + ': ')
+            
+            # For each district in the model
+            stream.begin_object()
+            seen_districts = set()
+            old_district = stream.next_key()
+            if old_district is None:
+                f_out.write('{}')
+            while old_district is not None:
+                new_district = DISTRICT_MAPPINGS.get(old_district, old_district)
+                if new_district in seen_districts:
+                    raise _RenameCollision(f"'{old_district}' renamed onto existing district '{new_district}' in {model}")
+                seen_districts.add(new_district)
+                district_data = stream.read_value()
+                f_out.write(('{\n' if len(seen_districts) == 1 else ',\n') + ' ' * 8
+                            + _dumps_nested(new_district, 2) + ': ' + _dumps_nested(district_data, 2))
+                old_district = stream.next_key()
+            if seen_districts:
+                f_out.write('\n' + ' ' * 4 + '}')
+            model = stream.next_key()
+        if seen_models:
+            f_out.write('\n}')
+        stream.end()
+
 # Command line argument parsing
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Replace district names in a JSON file using a mapping')
     parser.add_argument('input_json', help='Path to the input JSON file')
     parser.add_argument('output_json', help='Path to the output JSON file')
+    parser.add_argument('--stream', action='store_true',
+                        help='Process one district at a time (same output, bounded memory)')
     
     args = parser.parse_args()
     
     # Call the function with the provided file paths
-    replace_district_names(args.input_json, args.output_json)
\ No newline at end of file
+    replace_district_names(args.input_json, args.output_json, streaming=args.stream)
\ No newline at end of file
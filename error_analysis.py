@@ -0,0 +1,212 @@
+"""Error tables aggregated from word alignments.
+
+Every Reference/ModelOutput pair is aligned once (wer.score_pairs with
+alignments) and its errors are counted per model and district:
+
+- substitutions: (reference word, hypothesis word) confusion pairs
+- deletions: reference words the model dropped
+- insertions: words the model added
+- ngrams: reference bigrams and trigrams inside runs of consecutive
+  substituted or deleted words, i.e. phrases the model got wholly wrong
+
+District tables are summed into state and model totals up front, and the
+top MAX_TOP entries of every table are ranked once, so a lookup is a
+dictionary access and a slice. When results change, only the changed
+(model, district) partitions are re-aligned (ErrorTables.updated).
+"""
+import json
+import argparse
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from data_cache import Memo
+from wer import DELETION, HIT, INSERTION, SUBSTITUTION, score_pairs
+
+KINDS = ('substitutions', 'deletions', 'insertions', 'ngrams')
+NGRAM_SIZES = (2, 3)
+# Entries ranked per table when the tables are built
+MAX_TOP = 50
+
+# One set of tables per data version, shared across sessions
+_tables = Memo(max_entries=2, name='error_tables')
+
+
+def _empty() -> Dict[str, Counter]:
+    return {kind: Counter() for kind in KINDS}
+
+
+def count_errors(alignment: List[Tuple[str, Optional[str], Optional[str]]], counts: Dict[str, Counter]):
+    """Add the errors of one alignment to `counts`"""
+    run: List[str] = []
+    for op, ref_word, hyp_word in alignment + [(HIT, None, None)]:
+        if op == SUBSTITUTION:
+            counts['substitutions'][(ref_word, hyp_word)] += 1
+        elif op == DELETION:
+            counts['deletions'][ref_word] += 1
+        elif op == INSERTION:
+            counts['insertions'][hyp_word] += 1
+            continue  # Insertions don't break a run of reference errors
+        if op in (SUBSTITUTION, DELETION):
+            run.append(ref_word)
+            continue
+        for n in NGRAM_SIZES:
+            for i in range(len(run) - n + 1):
+                counts['ngrams'][' '.join(run[i:i + n])] += 1
+        run = []
+
+
+def _add(total: Dict[str, Counter], counts: Dict[str, Counter]):
+    for kind in KINDS:
+        total[kind].update(counts[kind])
+
+
+def _ranked(counts: Dict[str, Counter]) -> Dict[str, List[Tuple[Any, int]]]:
+    return {kind: counts[kind].most_common(MAX_TOP) for kind in KINDS}
+
+
+def _district_counts(data, partitions: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Counter]]:
+    """Error counters of every (model, district) partition that has samples"""
+    keys, pairs = [], []
+    for model, district in partitions:
+        samples = data[model][district].get('Samples', {})
+        for sample_id in samples:
+            sample = samples[sample_id]
+            keys.append((model, district))
+            pairs.append((sample.get('Reference', ''), sample.get('ModelOutput', '')))
+
+    district_counts: Dict[Tuple[str, str], Dict[str, Counter]] = {}
+    for key, score in zip(keys, score_pairs(pairs, with_alignment=True)):
+        counts = district_counts.get(key)
+        if counts is None:
+            counts = district_counts[key] = _empty()
+        count_errors(score['Alignment'], counts)
+    return district_counts
+
+
+class ErrorTables:
+    """Error counts per model at district, state and all-India level"""
+
+    def __init__(self, data, district_states: Dict[str, str] = None,
+                 district_counts: Dict[Tuple[str, str], Dict[str, Counter]] = None):
+        district_states = district_states or {}
+        if district_counts is None:
+            district_counts = _district_counts(data, ((model, district) for model in data for district in data[model]))
+        self._districts = district_counts
+
+        self._states: Dict[Tuple[str, str], Dict[str, Counter]] = {}
+        self._models: Dict[str, Dict[str, Counter]] = {}
+        for (model, district), counts in self._districts.items():
+            _add(self._models.setdefault(model, _empty()), counts)
+            state = district_states.get(district)
+            if state is not None:
+                _add(self._states.setdefault((model, state), _empty()), counts)
+
+        self._ranks = {
+            'district': {key: _ranked(counts) for key, counts in self._districts.items()},
+            'state': {key: _ranked(counts) for key, counts in self._states.items()},
+            'model': {key: _ranked(counts) for key, counts in self._models.items()},
+        }
+
+    def updated(self, data, changed: Iterable[Tuple[str, str]], district_states: Dict[str, str] = None) -> "ErrorTables":
+        """Tables for `data`, which differs from this one's data only in the `changed` partitions"""
+        changed = set(changed)
+        district_counts = {key: counts for key, counts in self._districts.items() if key not in changed}
+        present = [(model, district) for model, district in changed if district in data.get(model, {})]
+        district_counts.update(_district_counts(data, present))
+        return ErrorTables(data, district_states, district_counts)
+
+    def counts(self, model: str, district: str = None, state: str = None) -> Dict[str, Counter]:
+        """Counters for a model, optionally narrowed to a district or state"""
+        if district is not None:
+            return self._districts.get((model, district)) or _empty()
+        if state is not None:
+            return self._states.get((model, state)) or _empty()
+        return self._models.get(model) or _empty()
+
+    def top(self, kind: str, model: str, district: str = None, state: str = None,
+            n: int = 10) -> List[Tuple[Any, int]]:
+        """The n most frequent entries of a table, most frequent first"""
+        if n > MAX_TOP:
+            return self.counts(model, district, state)[kind].most_common(n)
+        if district is not None:
+            ranks = self._ranks['district'].get((model, district))
+        elif state is not None:
+            ranks = self._ranks['state'].get((model, state))
+        else:
+            ranks = self._ranks['model'].get(model)
+        return ranks[kind][:n] if ranks is not None else []
+
+
+def format_item(kind: str, item) -> str:
+    if kind == 'substitutions':
+        return f"{item[0]} → {item[1]}"
+    return item
+
+
+def get_error_tables(data, data_version: Optional[str], district_states: Dict[str, str] = None) -> ErrorTables:
+    """Error tables of the loaded results, aligned once per data version"""
+    key = (data_version, id(data), tuple(sorted((district_states or {}).items())))
+    return _tables.get(key, lambda: ErrorTables(data, district_states), refs=data)
+
+
+def get_error_tables_nowait(data, data_version: Optional[str],
+                            district_states: Dict[str, str] = None) -> Optional[ErrorTables]:
+    """Error tables of the loaded results, or None while they are aligned in the background"""
+    key = (data_version, id(data), tuple(sorted((district_states or {}).items())))
+    return _tables.get_nowait(key, lambda: ErrorTables(data, district_states), refs=data)
+
+
+def update_error_tables(old_data, old_version: Optional[str], data, data_version: Optional[str],
+                        changed: Iterable[Tuple[str, str]], district_states: Dict[str, str] = None,
+                        old_district_states: Dict[str, str] = None) -> ErrorTables:
+    """Error tables of a new data version, re-aligning only the changed partitions
+
+    The old version's tables are looked up under `old_district_states` (its
+    own join; defaults to `district_states`). Falls back to a full build when
+    they are not cached.
+    """
+    if old_district_states is None:
+        old_district_states = district_states
+    states_key = tuple(sorted((district_states or {}).items()))
+    old_states_key = tuple(sorted((old_district_states or {}).items()))
+    old_tables = _tables.peek((old_version, id(old_data), old_states_key))
+    if old_tables is None:
+        return get_error_tables(data, data_version, district_states)
+    return _tables.get((data_version, id(data), states_key),
+                       lambda: old_tables.updated(data, changed, district_states), refs=data)
+
+
+def error_report(json_file_path, top=10):
+    try:
+        # Read the JSON file
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        tables = ErrorTables(data)
+        for model in data:
+            print(f"== {model}")
+            for kind in KINDS:
+                items = ', '.join(f"{format_item(kind, item)} ({count})" for item, count in tables.top(kind, model, n=top))
+                print(f"  {kind}: {items}")
+        return True
+
+    except FileNotFoundError:
+        print(f"Error: File '{json_file_path}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: '{json_file_path}' contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Print the most frequent word errors of every model in a results JSON file')
+    parser.add_argument('input_json', help='Path to the input JSON file')
+    parser.add_argument('--top', type=int, default=10, help='Entries shown per table')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided arguments
+    error_report(args.input_json, args.top)
@@ -0,0 +1,221 @@
+"""Parallel, resumable WER scoring of per-model transcript dumps.
+
+Each input is a JSON Lines file holding one utterance per line:
+
+    {"District": "Pune", "SampleId": "...", "Reference": "...",
+     "ModelOutput": "...", "URL": "..."}
+
+The model name is the file name without extension unless a line carries a
+"Model" field. The dumps are indexed in byte-range blocks, each parsed by a
+worker process. Utterances are sharded by (model, district) and chunked, each
+shard is scored in a worker process and checkpointed to the work directory,
+and the checkpoints are merged into the {model: {district: {WER, Samples}}}
+structure that the app loads. Re-running with the same work directory skips
+shards that are already done.
+"""
+import hashlib
+import json
+import argparse
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from wer import combine_scores, score_pairs
+
+SCORE_FIELDS = ('Substitutions', 'Deletions', 'Insertions', 'ReferenceWords')
+# Part of every shard id; bumped when checkpoints written earlier must not be reused
+# (2: fallback sample ids are unique across chunks)
+SHARD_FORMAT = 2
+# Bytes of a dump parsed by one indexing task
+INDEX_BLOCK_BYTES = 8 * 1024 ** 2
+
+
+def index_block(path: str, start: int, end: int, default_model: str) -> List[Tuple[str, str, int]]:
+    """(model, district, byte offset) of every line starting in [start, end) of a dump"""
+    entries = []
+    with open(path, 'rb') as f:
+        if start:
+            # Skip to the first line starting at or after `start`
+            f.seek(start - 1)
+            f.readline()
+        offset = f.tell()
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                record = json.loads(line)
+                entries.append((record.get('Model', default_model), record['District'], offset))
+            offset += len(line)
+    return entries
+
+
+def index_dumps(dump_paths: List[Path], pool=None,
+                block_bytes: int = INDEX_BLOCK_BYTES) -> Dict[Tuple[str, str], List[Tuple[str, int]]]:
+    """Map (model, district) to the (file, byte offset) of each of its lines
+
+    Blocks are parsed on `pool` (an executor) when given; either way the
+    lines keep their input order.
+    """
+    blocks = [(str(path), start, start + block_bytes, path.stem)
+              for path in dump_paths for start in range(0, max(path.stat().st_size, 1), block_bytes)]
+    indexed = pool.map(index_block, *zip(*blocks)) if pool is not None and len(blocks) > 1 else \
+        (index_block(*block) for block in blocks)
+    shards: Dict[Tuple[str, str], List[Tuple[str, int]]] = defaultdict(list)
+    for (path, *_), entries in zip(blocks, indexed):
+        for model, district, offset in entries:
+            shards[(model, district)].append((path, offset))
+    return shards
+
+
+def _shard_id(model: str, district: str, chunk: int, locations: List[Tuple[str, int]], signatures) -> str:
+    # Changes to an input file produce new shard ids, so stale checkpoints are ignored
+    key = json.dumps([SHARD_FORMAT, model, district, chunk, locations[0], len(locations),
+                      [signatures[path] for path in sorted({p for p, _ in locations})]])
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def score_shard(model: str, district: str, locations: List[Tuple[str, int]], output_path: str,
+                first: int = 0) -> Dict[str, Any]:
+    """Score one shard in a worker process and checkpoint it atomically
+
+    `first` is the position of the shard's first utterance among all of its
+    (model, district)'s, so utterances without a SampleId get ids that are
+    unique across chunks.
+    """
+    records = []
+    handles = {}
+    try:
+        for path, offset in locations:
+            f = handles.get(path)
+            if f is None:
+                f = handles[path] = open(path, 'rb')
+            f.seek(offset)
+            records.append(json.loads(f.readline()))
+    finally:
+        for f in handles.values():
+            f.close()
+
+    scores = score_pairs((r.get('Reference', ''), r.get('ModelOutput', '')) for r in records)
+    samples = {}
+    for i, (record, score) in enumerate(zip(records, scores)):
+        sample_id = record.get('SampleId') or f"Sample_{first + i + 1}"
+        if sample_id in samples:
+            raise ValueError(f"duplicate SampleId '{sample_id}' in {model} / {district}")
+        sample = {key: record[key] for key in ('Reference', 'URL', 'ModelOutput') if key in record}
+        sample.update(WER=round(score['WER'], 2), **{k: score[k] for k in SCORE_FIELDS})
+        samples[sample_id] = sample
+
+    shard = {'model': model, 'district': district, 'total': combine_scores(scores), 'samples': samples}
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(shard, f, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+    return {'model': model, 'district': district, 'utterances': len(records), 'total': shard['total']}
+
+
+def merge_shards(shard_paths: List[Path], max_samples: int = None) -> Dict[str, Any]:
+    """Merge checkpointed shards into {model: {district: {WER, ..., Samples}}}
+
+    Models and districts keep the order of `shard_paths`. A sample id seen in
+    two shards of one district is an error rather than an overwrite.
+    """
+    totals = defaultdict(list)
+    samples = defaultdict(dict)
+    seen = defaultdict(set)
+    for shard_path in shard_paths:
+        with open(shard_path, 'r', encoding='utf-8') as f:
+            shard = json.load(f)
+        key = (shard['model'], shard['district'])
+        totals[key].append(shard['total'])
+        for sample_id, sample in shard['samples'].items():
+            if sample_id in seen[key]:
+                raise ValueError(f"duplicate SampleId '{sample_id}' in {key[0]} / {key[1]}")
+            seen[key].add(sample_id)
+            if max_samples is None or len(samples[key]) < max_samples:
+                samples[key][sample_id] = sample
+
+    data: Dict[str, Any] = {}
+    for (model, district) in totals:
+        total = combine_scores(totals[(model, district)])
+        data.setdefault(model, {})[district] = dict(
+            WER=f"{total['WER']:.2f}",
+            **{k: total[k] for k in SCORE_FIELDS},
+            Samples=samples[(model, district)],
+        )
+    return data
+
+
+def run_pipeline(dump_paths, output_file_path, work_dir, workers=None, chunk_size=5000, max_samples=None):
+    try:
+        dump_paths = [Path(p) for p in dump_paths]
+        shard_dir = Path(work_dir) / 'shards'
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        signatures = {str(p): [p.stat().st_size, p.stat().st_mtime_ns] for p in dump_paths}
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Plan: (model, district) shards, split into chunks so large districts still spread out.
+            # Shards stay in input order, which is the order of models and districts in the output
+            start = time.perf_counter()
+            planned = []
+            for (model, district), locations in index_dumps(dump_paths, pool).items():
+                for chunk, first in enumerate(range(0, len(locations), chunk_size)):
+                    chunk_locations = locations[first:first + chunk_size]
+                    shard_path = shard_dir / f"{_shard_id(model, district, chunk, chunk_locations, signatures)}.json"
+                    planned.append((model, district, chunk_locations, shard_path, first))
+            pending = [p for p in planned if not p[3].exists()]
+            print(f"Indexed {len(dump_paths)} dumps in {time.perf_counter() - start:.1f}s: "
+                  f"{len(planned)} shards, {len(planned) - len(pending)} already done")
+
+            # Score pending shards in parallel; each finished shard is already on disk
+            done = 0
+            utterances = 0
+            start = time.perf_counter()
+            futures = [pool.submit(score_shard, model, district, locations, str(shard_path), first)
+                       for model, district, locations, shard_path, first in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                done += 1
+                utterances += result['utterances']
+                elapsed = time.perf_counter() - start
+                print(f"[{done}/{len(pending)}] {result['model']} / {result['district']}: "
+                      f"WER {result['total']['WER']:.2f}% ({result['utterances']} utterances, "
+                      f"{utterances / max(elapsed, 1e-9):,.0f} utt/s)", flush=True)
+
+        # Merge every checkpoint of this run into the app's data layout
+        data = merge_shards([shard_path for _, _, _, shard_path, _ in planned], max_samples)
+        tmp_path = f"{output_file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, output_file_path)
+
+        print(f"Results for {len(data)} models written to {output_file_path}")
+        return True
+
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"Error: invalid JSON in transcript dump ({e})")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Score per-model transcript dumps in parallel into a results JSON file')
+    parser.add_argument('dumps', nargs='+', help='JSON Lines transcript dumps, one per model')
+    parser.add_argument('output_json', help='Path to the output JSON file')
+    parser.add_argument('--work-dir', default='.eval_work', help='Checkpoint directory; reuse it to resume a run')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Maximum utterances per shard')
+    parser.add_argument('--max-samples', type=int, default=None, help='Samples kept per district in the output')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided arguments
+    run_pipeline(args.dumps, args.output_json, args.work_dir, args.workers, args.chunk_size, args.max_samples)
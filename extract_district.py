@@ -1,31 +1,33 @@
 import json
 import argparse
 
+from results_index import load_index
+
 def extract_district_names_by_model(json_file_path):
     try:
-        # Read the JSON file
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Read the sidecar index (built on first use) instead of the transcripts
+        index = load_index(json_file_path)
         
         # Dictionary to store models and their districts
         model_districts = {}
         
         # Extract model names (top-level keys in the JSON)
-        models = data.keys()
+        models = index['models'].keys()
         
         # For each model, extract the district names
         for model in models:
-            district_names = list(data.get(model, {}).keys())
+            district_names = list(index['models'].get(model, {}).keys())
             # Sort districts alphabetically
             district_names.sort()
             model_districts[model] = district_names
         
-        # Print the models and their district names
+        # Print the models and their district names in one write
+        lines = []
         for model, districts in model_districts.items():
-            print(f"\nModel: {model}")
-            print("District Names:")
-            for district in districts:
-                print(f"{district}")
+            lines.append(f"\nModel: {model}")
+            lines.append("District Names:")
+            lines.extend(districts)
+        print("\n".join(lines))
         
         return model_districts
     except FileNotFoundError:
@@ -0,0 +1,205 @@
+"""Per-rerun stage timing and allocation tracking for the app.
+
+Wrap hot-path steps in `stage()` between `start_run()` and `end_run()`:
+
+    start_run()
+    with stage('load_data'):
+        data = load_data()
+    end_run()
+
+Each finished rerun is logged as one JSON line on the 'asr_dashboard.perf'
+logger (written to the PERF_LOG file, or stderr for '-', when set) and
+added to process-wide per-stage metrics: counts, totals and latency
+percentiles over a bounded window. These are available as a dict for the
+debug panel and in Prometheus text format for scraping (serve_metrics, or
+PERF_METRICS_PORT in the app).
+
+Peak allocation per stage is tracked with tracemalloc when PERF_TRACE_MEMORY
+is set, as tracing slows Python down. tracemalloc is process-wide, so peaks
+are exact only while one session is rerunning at a time.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+TRACE_MEMORY = bool(os.environ.get("PERF_TRACE_MEMORY"))
+WINDOW = 1024  # Latest durations kept per stage for percentiles
+
+logger = logging.getLogger("asr_dashboard.perf")
+if os.environ.get("PERF_LOG") and not logger.handlers:
+    _handler = logging.StreamHandler() if os.environ["PERF_LOG"] == "-" else logging.FileHandler(os.environ["PERF_LOG"])
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Streamlit runs each session's reruns on its own script thread
+_local = threading.local()
+
+
+class StageMetrics:
+    """Aggregated stage durations and peaks, shared by every session"""
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._runs = 0
+
+    def record(self, stages: List[Dict[str, Any]]):
+        with self._lock:
+            self._runs += 1
+            for entry in stages:
+                stats = self._stages.get(entry['stage'])
+                if stats is None:
+                    stats = self._stages[entry['stage']] = {
+                        'count': 0, 'seconds': 0.0, 'peak_bytes': 0, 'recent': deque(maxlen=self.window)
+                    }
+                stats['count'] += 1
+                stats['seconds'] += entry['seconds']
+                stats['peak_bytes'] = max(stats['peak_bytes'], entry.get('peak_bytes', 0))
+                stats['recent'].append(entry['seconds'])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{stage: count, total/mean/p50/p95/max milliseconds, peak_kib}"""
+        with self._lock:
+            stages = {name: dict(stats, recent=np.array(stats['recent'])) for name, stats in self._stages.items()}
+        summary = {}
+        for name, stats in stages.items():
+            recent = stats['recent'] * 1000
+            summary[name] = {
+                'count': stats['count'],
+                'total_ms': stats['seconds'] * 1000,
+                'mean_ms': stats['seconds'] * 1000 / stats['count'],
+                'p50_ms': float(np.percentile(recent, 50)),
+                'p95_ms': float(np.percentile(recent, 95)),
+                'max_ms': float(recent.max()),
+                'peak_kib': stats['peak_bytes'] / 1024,
+            }
+        return summary
+
+    @property
+    def runs(self) -> int:
+        return self._runs
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP asr_dashboard_reruns_total Completed app reruns",
+            "# TYPE asr_dashboard_reruns_total counter",
+            f"asr_dashboard_reruns_total {self.runs}",
+            "# HELP asr_dashboard_stage_seconds Time spent in each rerun stage",
+            "# TYPE asr_dashboard_stage_seconds summary",
+        ]
+        summary = self.summary()
+        for name, stats in summary.items():
+            label = json.dumps(name)
+            lines.append(f'asr_dashboard_stage_seconds{{stage={label},quantile="0.5"}} {stats["p50_ms"] / 1000:.6f}')
+            lines.append(f'asr_dashboard_stage_seconds{{stage={label},quantile="0.95"}} {stats["p95_ms"] / 1000:.6f}')
+            lines.append(f'asr_dashboard_stage_seconds_sum{{stage={label}}} {stats["total_ms"] / 1000:.6f}')
+            lines.append(f'asr_dashboard_stage_seconds_count{{stage={label}}} {stats["count"]}')
+        if TRACE_MEMORY:
+            lines.append("# HELP asr_dashboard_stage_peak_bytes Largest allocation peak seen in each stage")
+            lines.append("# TYPE asr_dashboard_stage_peak_bytes gauge")
+            for name, stats in summary.items():
+                lines.append(f'asr_dashboard_stage_peak_bytes{{stage={json.dumps(name)}}} {int(stats["peak_kib"] * 1024)}')
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every session served by this process
+metrics = StageMetrics()
+
+
+def start_run():
+    """Begin collecting stages for the current rerun"""
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _local.stages = []
+    _local.peaks = []
+    _local.started = time.perf_counter()
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block (and its allocation peak) as one stage of the current rerun
+
+    Outside a run, the block just executes.
+    """
+    stages = getattr(_local, 'stages', None)
+    if stages is None:
+        yield
+        return
+
+    tracing = TRACE_MEMORY and tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        # Fold the enclosing stage's peak so far in before resetting it
+        if _local.peaks:
+            _local.peaks[-1] = max(_local.peaks[-1], peak)
+        tracemalloc.reset_peak()
+        _local.peaks.append(current)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = {'stage': name, 'seconds': time.perf_counter() - start}
+        if tracing:
+            peak = max(_local.peaks.pop(), tracemalloc.get_traced_memory()[1])
+            entry['peak_bytes'] = max(peak - current, 0)
+            if _local.peaks:
+                _local.peaks[-1] = max(_local.peaks[-1], peak)
+        stages.append(entry)
+
+
+def end_run(**fields) -> Optional[Dict[str, Any]]:
+    """Finish the current rerun: log it, add it to the metrics and return its record
+
+    `fields` are added to the logged record.
+    """
+    stages = getattr(_local, 'stages', None)
+    if stages is None:
+        return None
+    record = dict(fields, event='rerun', seconds=time.perf_counter() - _local.started, stages=stages)
+    _local.stages = None
+    metrics.record(stages + [{'stage': 'total', 'seconds': record['seconds']}])
+    logger.info(json.dumps(record, ensure_ascii=False, default=str))
+    return record
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server_lock = threading.Lock()
+_server = None
+
+
+def serve_metrics(port: int, host: str = '127.0.0.1'):
+    """Serve /metrics from a background thread, once per process"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
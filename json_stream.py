@@ -0,0 +1,130 @@
+"""Incremental reader for large JSON objects.
+
+Walks a document one object member at a time so callers can hold a single
+record in memory instead of the whole file:
+
+    stream = JsonStream(f)
+    stream.begin_object()
+    while (key := stream.next_key()) is not None:
+        value = stream.read_value()   # or stream.begin_object() to descend
+
+Byte offsets into the file are available for every value read, which is
+what the sidecar indexes use to seek straight to a record.
+"""
+import codecs
+import json
+from json.decoder import scanstring
+from typing import Any, BinaryIO, Optional, Tuple
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = ',]}' + _WHITESPACE
+
+
+class JsonStream:
+    def __init__(self, f: BinaryIO, chunk_size: int = 1 << 16):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decode = json.JSONDecoder().raw_decode
+        self._buf = ''
+        self._pos = 0
+        self._base = 0  # byte offset of self._buf[0]
+        self._eof = False
+
+    def _fill(self, size: int = None) -> bool:
+        """Append more text to the buffer; False at end of file"""
+        if self._eof:
+            return False
+        # Drop consumed text before growing the buffer
+        if self._pos:
+            self._base += len(self._buf[:self._pos].encode('utf-8'))
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        data = self._f.read(size or self._chunk_size)
+        if not data:
+            self._eof = True
+            self._buf += self._decoder.decode(b'', final=True)
+            return False
+        self._buf += self._decoder.decode(data)
+        return True
+
+    def tell(self) -> int:
+        """Byte offset of the current position"""
+        return self._base + len(self._buf[:self._pos].encode('utf-8'))
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError(f"Unexpected end of JSON at byte {self.tell()}")
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f"Expected '{char}' at byte {self.tell()}, found '{self._buf[self._pos]}'")
+        self._pos += 1
+
+    def begin_object(self):
+        """Enter the object at the current position"""
+        self._expect('{')
+
+    def next_key(self) -> Optional[str]:
+        """Key of the next member of the current object, or None at its end"""
+        char = self._peek()
+        if char == '}':
+            self._pos += 1
+            return None
+        if char == ',':
+            self._pos += 1
+            char = self._peek()
+        if char != '"':
+            raise ValueError(f"Expected object key at byte {self.tell()}")
+        while True:
+            try:
+                key, end = scanstring(self._buf, self._pos + 1)
+                break
+            except json.JSONDecodeError:
+                # Key straddles the buffer end
+                if not self._fill():
+                    raise
+        self._pos = end
+        self._expect(':')
+        return key
+
+    def read_value(self) -> Any:
+        """Parse the complete value at the current position"""
+        value, _ = self.read_value_span()
+        return value
+
+    def read_value_span(self) -> Tuple[Any, Tuple[int, int]]:
+        """Parse the value at the current position with its (start, end) byte offsets"""
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Value straddles the buffer end: read more (doubling) and retry
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # A number cut by the buffer end (e.g. "-1." of "-1.5") parses
+            # short, so only accept values followed by a delimiter
+            if (end < len(self._buf) and self._buf[end] in _DELIMITERS) or self._eof:
+                break
+            self._fill(size)
+        start = self.tell()
+        end_offset = start + len(self._buf[self._pos:end].encode('utf-8'))
+        self._pos = end
+        return value, (start, end_offset)
+
+    def end(self):
+        """Check that nothing but whitespace follows the document"""
+        try:
+            char = self._peek()
+        except ValueError:
+            return
+        raise ValueError(f"Extra data at byte {self.tell()}: '{char}'")
@@ -0,0 +1,201 @@
+"""Results that follow the files on disk, without an app restart.
+
+`LiveResults` merges results JSON files ({model: {district: record}}, later
+files winning) into one snapshot. A background thread polls the files' size
+and mtime; a changed or added file is decoded and diffed against the
+current snapshot per (model, district) partition. The next snapshot shares
+every unchanged model dict and record with the current one, and is
+published by replacing a single reference, so readers see either the old
+or the new dataset, never a mix.
+
+Before a snapshot is published, warmers get (old snapshot, new snapshot,
+changed partitions) and bring derived caches up to date in the polling
+thread, so the first rerun after a reload doesn't pay for them.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from results_store import open_results_store
+
+logger = logging.getLogger(__name__)
+
+Partition = Tuple[str, str]
+Warmer = Callable[["ResultsSnapshot", "ResultsSnapshot", Set[Partition]], Any]
+
+# One watcher per set of sources, shared across sessions
+_watchers: Dict[Any, "LiveResults"] = {}
+_watchers_lock = threading.Lock()
+
+
+class ResultsSnapshot(dict):
+    """Read-only {model: {district: record}} with a content version"""
+
+    def __init__(self, data: Dict[str, Any], version: Optional[str]):
+        super().__init__(data)
+        self.version = version
+
+
+class _SourceFile:
+    __slots__ = ("signature", "digest", "data")
+
+    def __init__(self, signature, digest, data):
+        self.signature = signature
+        self.digest = digest
+        self.data = data
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def merge_snapshot(old: Dict[str, Any], layers: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, Any], Set[Partition]]:
+    """Merge result layers (later wins) and diff against `old` per partition
+
+    Returns the merged data, reusing `old`'s objects wherever a partition is
+    unchanged, and the set of added, changed and removed partitions.
+    """
+    layered: Dict[str, Dict[str, Any]] = {}
+    for layer in layers:
+        for model, districts in layer.items():
+            layered.setdefault(model, {}).update(districts)
+
+    merged: Dict[str, Any] = {}
+    changed: Set[Partition] = set()
+    for model, districts in layered.items():
+        old_districts = old.get(model, {})
+        model_data = {}
+        model_changed = set()
+        for district, record in districts.items():
+            old_record = old_districts.get(district)
+            if old_record is not None and (old_record is record or old_record == record):
+                model_data[district] = old_record
+            else:
+                model_data[district] = record
+                model_changed.add((model, district))
+        model_changed.update((model, district) for district in old_districts if district not in districts)
+        merged[model] = model_data if model_changed or model not in old else old_districts
+        changed |= model_changed
+    for model, old_districts in old.items():
+        if model not in layered:
+            changed.update((model, district) for district in old_districts)
+    return merged, changed
+
+
+class LiveResults:
+    """Merged results of `sources()` (paths, in priority order), kept current by polling"""
+
+    def __init__(self, sources: Callable[[], List[Path]], interval: float = 5.0):
+        self._sources = sources
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, _SourceFile] = {}
+        self._warmers: Dict[str, Warmer] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.snapshot = ResultsSnapshot({}, None)
+        self.reloads = 0
+        self.refresh()
+
+    def set_warmer(self, name: str, warmer: Warmer):
+        """Register (or replace) a cache warmer run before each new snapshot is published"""
+        self._warmers[name] = warmer
+
+    def refresh(self) -> Set[Partition]:
+        """Re-read changed or added files and publish the result; returns the changed partitions"""
+        with self._lock:
+            paths = [str(path) for path in self._sources()]
+            files: Dict[str, _SourceFile] = {}
+            modified = False
+            for path in paths:
+                try:
+                    signature = _signature(path)
+                except FileNotFoundError:
+                    continue
+                current = self._files.get(path)
+                if current is not None and current.signature == signature:
+                    files[path] = current
+                    continue
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    # Still being written: keep the previous copy, retry on the next poll
+                    if current is not None:
+                        files[path] = current
+                    continue
+                files[path] = _SourceFile(signature, hashlib.blake2b(raw, digest_size=16).hexdigest(), data)
+                modified = True
+            if not modified and files.keys() == self._files.keys():
+                return set()
+
+            merged, changed = merge_snapshot(self.snapshot, (source.data for source in files.values()))
+            self._files = files
+            if not changed and self.snapshot.version is not None:
+                return set()
+            version = hashlib.blake2b(
+                json.dumps([[path, source.digest] for path, source in files.items()]).encode('utf-8'),
+                digest_size=16
+            ).hexdigest()
+            snapshot = ResultsSnapshot(merged, version)
+            old = self.snapshot
+            for name, warmer in list(self._warmers.items()):
+                try:
+                    warmer(old, snapshot, changed)
+                except Exception:
+                    logger.exception("Cache warmer %s failed", name)
+            self.snapshot = snapshot
+            self.reloads += 1
+            logger.info("Published results %s: %d partitions changed", version, len(changed))
+            return changed
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Reloading results failed")
+
+    def start(self):
+        """Poll for changes in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name="results-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def results_files(data_file, results_dir) -> Callable[[], List[Path]]:
+    """The main results file, then every results file dropped into `results_dir`"""
+    def sources():
+        extra = sorted(path for path in Path(results_dir).glob("*.json") if not path.name.endswith(".index.json"))
+        return [Path(data_file)] + extra
+    return sources
+
+
+def get_live_results(data_file, results_dir, interval: float = 5.0) -> LiveResults:
+    """The process-wide watcher for these sources, started on first use"""
+    key = (str(Path(data_file).resolve()), str(Path(results_dir).resolve()))
+    with _watchers_lock:
+        live = _watchers.get(key)
+        if live is None:
+            live = _watchers[key] = LiveResults(results_files(data_file, results_dir), interval).start()
+    return live
+
+
+def results_source(data_file, results_dir, store_dir, interval: float = 5.0) -> Callable[[], Any]:
+    """Callable returning the current results: the store written by
+    results_store.py when there is one, else the live merged snapshot"""
+    store_dir = Path(store_dir)
+    if (store_dir / "meta.json").exists():
+        return lambda: open_results_store(store_dir)
+    live = get_live_results(data_file, results_dir, interval)
+    return lambda: live.snapshot
@@ -0,0 +1,198 @@
+"""Cache of rendered maps for st_folium.
+
+`st_folium` renders the whole folium.Map on every call: it runs the style
+function over every feature and serializes all geometry into the Leaflet
+script sent to the browser. `RenderedMap` captures that output once, and
+`show_rendered_map` hands it to the same frontend component, so a repeat
+view of the same (model, highlighted district, data version) does no
+rendering at all.
+
+This mirrors the argument preparation in streamlit_folium 0.23's st_folium
+(the version pinned in requirements.txt) and uses its private helpers.
+folium and streamlit_folium are imported on first use, so importing this
+module does not delay the first paint of the app.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+_RETURNED_DEFAULTS = ("last_clicked", "last_object_clicked", "last_object_clicked_tooltip",
+                      "last_object_clicked_popup", "all_drawings", "last_active_drawing",
+                      "last_circle_radius", "last_circle_polygon", "selected_layers")
+
+
+class RenderedMap:
+    """Everything st_folium sends to the frontend for one map"""
+
+    __slots__ = ("script", "html", "map_id", "bounds", "zoom", "css_links", "js_links",
+                 "size", "build_seconds", "_hashes")
+
+    def __init__(self, script, html, map_id, bounds, zoom, css_links, js_links, build_seconds):
+        self.script = script
+        self.html = html
+        self.map_id = map_id
+        self.bounds = bounds
+        self.zoom = zoom
+        self.css_links = css_links
+        self.js_links = js_links
+        self.size = len(script) + len(html)
+        self.build_seconds = build_seconds
+        self._hashes: Dict[Any, str] = {}
+
+    def component_key(self, key: Optional[str]) -> str:
+        # Hashing the script is a regex pass over megabytes of JS; do it once per key
+        if key not in self._hashes:
+            from streamlit_folium import generate_js_hash
+
+            self._hashes[key] = generate_js_hash(self.script, key, False)
+        return self._hashes[key]
+
+
+def _asset_links(folium_map):
+    import branca.colormap
+    import folium
+
+    css_links: List[str] = []
+    js_links: List[str] = []
+
+    def walk(element):
+        if isinstance(element, (branca.colormap.ColorMap, folium.elements.JSCSSMixin)):
+            yield element
+        for child in getattr(element, "_children", {}).values():
+            yield from walk(child)
+
+    for element in walk(folium_map):
+        if isinstance(element, branca.colormap.ColorMap):
+            js_links.insert(0, "https://cdnjs.cloudflare.com/ajax/libs/d3/3.5.5/d3.min.js")
+            js_links.insert(0, "https://d3js.org/d3.v4.min.js")
+        css_links.extend(href for _, href in getattr(element, "default_css", []))
+        js_links.extend(src for _, src in getattr(element, "default_js", []))
+    return css_links, js_links
+
+
+def render_map(folium_map) -> RenderedMap:
+    """Render a folium.Map the way st_folium does and keep the result"""
+    from streamlit_folium import _get_map_string, _get_siblings, get_full_id
+
+    start = time.perf_counter()
+    folium_map.render()
+    script = _get_map_string(folium_map)
+    html = _get_siblings(folium_map)
+    css_links, js_links = _asset_links(folium_map)
+    return RenderedMap(
+        script=script,
+        html=html,
+        map_id=get_full_id(folium_map),
+        bounds=folium_map.get_bounds(),
+        zoom=folium_map.options.get("zoom"),
+        css_links=css_links,
+        js_links=js_links,
+        build_seconds=time.perf_counter() - start,
+    )
+
+
+def show_rendered_map(rendered: RenderedMap, key: Optional[str] = None,
+                      height: int = 700, width: Optional[int] = 500) -> Dict[str, Any]:
+    """Display a rendered map; returns the same interaction data as st_folium"""
+    from streamlit_folium import _component_func
+
+    (south, west), (north, east) = rendered.bounds
+    defaults = dict.fromkeys(_RETURNED_DEFAULTS)
+    defaults.update(
+        bounds={"_southWest": {"lat": south, "lng": west}, "_northEast": {"lat": north, "lng": east}},
+        zoom=rendered.zoom,
+    )
+    return _component_func(
+        script=rendered.script,
+        html=rendered.html,
+        id=rendered.map_id,
+        key=rendered.component_key(key),
+        height=height,
+        width=width,
+        returned_objects=None,
+        default=defaults,
+        zoom=None,
+        center=None,
+        feature_group=None,
+        return_on_hover=False,
+        layer_control=None,
+        pixelated=False,
+        css_links=rendered.css_links,
+        js_links=rendered.js_links,
+    )
+
+
+class RenderCache:
+    """Bounded LRU of rendered maps, capped by entry count and total script size
+
+    `refs` are kept alive alongside each entry so keys built from object ids
+    stay unique while the entry is cached.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 128 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0,
+                       "render_seconds": 0.0, "saved_seconds": 0.0}
+
+    def get(self, key, build: Callable[[], "folium.Map"], refs: Any = None) -> RenderedMap:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["saved_seconds"] += entry[0].build_seconds
+                return entry[0]
+
+        start = time.perf_counter()
+        rendered = render_map(build())
+        # Count building the folium.Map too, not just rendering it
+        rendered.build_seconds = time.perf_counter() - start
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[0].size
+            self._entries[key] = (rendered, refs)
+            self._bytes += rendered.size
+            self._stats["misses"] += 1
+            self._stats["render_seconds"] += rendered.build_seconds
+            self._evict()
+        return rendered
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes,
+                        hit_rate=self._stats["hits"] / lookups if lookups else 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone is over budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (rendered, _) = self._entries.popitem(last=False)
+            self._bytes -= rendered.size
+            self._stats["evictions"] += 1
+
+
+# Shared by every session served by this process
+_render_cache = RenderCache()
+
+
+def get_rendered_map(key, build: Callable[[], "folium.Map"], refs: Any = None) -> RenderedMap:
+    """Rendered map for `key`, building and rendering it on first use"""
+    return _render_cache.get(key, build, refs)
+
+
+def render_cache_stats() -> Dict[str, Any]:
+    """Hit rate, size and render time spent/saved of the process-wide map cache"""
+    return _render_cache.stats()
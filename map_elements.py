@@ -0,0 +1,181 @@
+"""Folium elements for the district layer, styled from map_styles' style tables.
+
+Kept apart from map_styles so the WER bins can be computed without
+importing folium; the app imports this module when it builds a map.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+import folium
+from branca.element import MacroElement
+from folium.features import GeoJsonStyleMapper
+from folium.utilities import get_obj_in_upper_tree
+from jinja2 import Template
+
+from map_styles import HOVER_STYLE, STYLES
+
+
+class BinnedGeoJson(folium.GeoJson):
+    """District layer styled from a style table (see make_styles)
+
+    The browser-side styler switches on each feature's bin property, so it
+    holds one case per style rather than one per feature. `highlight` is the
+    ID (district_join.feature_id) of a feature drawn with the highlight style
+    instead of its bin.
+    """
+
+    def __init__(self, data, highlight: Optional[str] = None,
+                 styles: List[Dict[str, Any]] = STYLES, bin_property: str = 'wer_bin', **kwargs):
+        super().__init__(
+            data,
+            style_function=lambda feature: styles[-1],
+            highlight_function=lambda feature: HOVER_STYLE,
+            **kwargs
+        )
+        self.styles = styles
+        self.feature_identifier = f'feature.properties.{bin_property}'
+        if highlight is not None:
+            st_code, dt_code = (json.dumps(value) for value in highlight.split('-', 1))
+            self.feature_identifier = (
+                f"(feature.properties.st_code === {st_code} && feature.properties.dt_code === {dt_code}"
+                f" ? {len(styles) - 2} : feature.properties.{bin_property})"
+            )
+
+    def render(self, **kwargs):
+        # Replaces GeoJson.render, which calls style_function once per feature
+        self.parent_map = get_obj_in_upper_tree(self, folium.Map)
+        # {style: [bins]}: bins that share a style share its case
+        self.style_map = {}
+        for ix, style in enumerate(self.styles[:-1]):
+            self.style_map.setdefault(GeoJsonStyleMapper._to_key(style), []).append(ix)
+        self.style_map['default'] = GeoJsonStyleMapper._to_key(self.styles[-1])
+        self.highlight_map = {'default': GeoJsonStyleMapper._to_key(HOVER_STYLE)}
+        super(folium.GeoJson, self).render(**kwargs)
+
+
+class TiledDistrictLayer(MacroElement):
+    """District layer fetched as z/x/y GeoJSON tiles from a tile server
+
+    Only tiles in view are requested, at the current zoom's simplification.
+    Each zoom level keeps its own layer, and a district is added the first
+    time a tile delivers it. Bins and tooltip labels travel with the map as
+    small {feature ID: value} tables, so tiles are model-independent and
+    cacheable.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var url = {{ this.url|tojson }};
+            var styles = {{ this.styles|tojson }};
+            var bins = {{ this.bins|tojson }};
+            var labels = {{ this.labels|tojson }};
+            var highlight = {{ this.highlight|tojson }};
+            var hoverStyle = {{ this.hover_style|tojson }};
+            var tooltipStyle = {{ this.tooltip_style|tojson }};
+            var levels = {};
+
+            function featureId(p) {
+                return p.st_code + '-' + p.dt_code;
+            }
+
+            function style(feature) {
+                var id = featureId(feature.properties);
+                var bin = bins.hasOwnProperty(id) ? bins[id] : {{ this.no_data_bin }};
+                if (id === highlight) {
+                    bin = {{ this.highlight_bin }};
+                }
+                return styles[bin];
+            }
+
+            function level(z) {
+                if (!levels[z]) {
+                    var layer = L.geoJSON(null, {
+                        style: style,
+                        onEachFeature: function(feature, featureLayer) {
+                            var p = feature.properties;
+                            var id = featureId(p);
+                            var label = labels.hasOwnProperty(id) ? labels[id] : 'N/A';
+                            var tooltip = document.createElement('div');
+                            tooltip.style.cssText = tooltipStyle;
+                            tooltip.appendChild(document.createTextNode('District: ' + p.district));
+                            tooltip.appendChild(document.createElement('br'));
+                            tooltip.appendChild(document.createTextNode({{ this.label_name|tojson }} + ': ' + label));
+                            featureLayer.bindTooltip(tooltip, {sticky: true});
+                            featureLayer.on({
+                                mouseover: function(e) { e.target.setStyle(hoverStyle); },
+                                mouseout: function(e) { layer.resetStyle(e.target); }
+                            });
+                        }
+                    });
+                    levels[z] = {layer: layer, seen: {}, requested: {}};
+                }
+                return levels[z];
+            }
+
+            function tileX(lng, n) { return Math.floor((lng + 180) / 360 * n); }
+            function tileY(lat, n) {
+                lat = Math.max(Math.min(lat, 85.0511), -85.0511) * Math.PI / 180;
+                return Math.floor((1 - Math.asinh(Math.tan(lat)) / Math.PI) / 2 * n);
+            }
+
+            function update() {
+                var z = Math.max({{ this.min_zoom }}, Math.min({{ this.max_zoom }}, Math.round(map.getZoom())));
+                var current = level(z);
+                Object.keys(levels).forEach(function(key) {
+                    if (levels[key] !== current && map.hasLayer(levels[key].layer)) {
+                        map.removeLayer(levels[key].layer);
+                    }
+                });
+                if (!map.hasLayer(current.layer)) {
+                    current.layer.addTo(map);
+                }
+                var n = Math.pow(2, z);
+                var bounds = map.getBounds();
+                var x0 = Math.max(0, tileX(bounds.getWest(), n)), x1 = Math.min(n - 1, tileX(bounds.getEast(), n));
+                var y0 = Math.max(0, tileY(bounds.getNorth(), n)), y1 = Math.min(n - 1, tileY(bounds.getSouth(), n));
+                for (var x = x0; x <= x1; x++) {
+                    for (var y = y0; y <= y1; y++) {
+                        var key = x + '/' + y;
+                        if (current.requested[key]) continue;
+                        current.requested[key] = true;
+                        fetch(url.replace('{z}', z).replace('{x}', x).replace('{y}', y))
+                            .then(function(response) { return response.ok ? response.json() : null; })
+                            .then(function(tile) {
+                                if (!tile) return;
+                                var fresh = tile.features.filter(function(feature) {
+                                    if (current.seen[feature.id]) return false;
+                                    current.seen[feature.id] = true;
+                                    return true;
+                                });
+                                current.layer.addData(fresh);
+                            })
+                            .catch(function() {});
+                    }
+                }
+            }
+
+            map.on('moveend', update);
+            update();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, url: str, bins: Dict[str, int], labels: Dict[str, str], label_name: str = 'WER',
+                 highlight: Optional[str] = None, styles: List[Dict[str, Any]] = STYLES,
+                 min_zoom: int = 5, max_zoom: int = 10, tooltip_style: str = ''):
+        super().__init__()
+        self._name = 'TiledDistrictLayer'
+        self.url = url.rstrip('/') + '/tiles/{z}/{x}/{y}.geojson'
+        self.styles = styles
+        self.bins = bins
+        self.labels = labels
+        self.label_name = label_name
+        self.highlight = highlight
+        self.hover_style = HOVER_STYLE
+        self.tooltip_style = tooltip_style
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.highlight_bin = len(styles) - 2
+        self.no_data_bin = len(styles) - 1
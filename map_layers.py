@@ -0,0 +1,120 @@
+from typing import Any, Dict, List, Optional
+
+from data_cache import Memo
+from district_join import feature_id
+from map_styles import NO_DATA_BIN
+from topology import build_topology, simplify_topology, to_features
+
+# Roughly half a screen pixel at the map's max_zoom=10 (~0.0014 deg/px)
+DEFAULT_TOLERANCE = 0.0007
+
+# One entry per (model, data version) pair, shared across sessions
+_wer_layers = Memo(max_entries=16, name='wer_layers')
+_view_layers = Memo(max_entries=16, name='view_layers')
+_india_layers = Memo(max_entries=2, name='india_layers')
+
+
+def _feature_district(properties, feature_districts):
+    """Result district of a feature: by ID through the join, else by normalized name"""
+    if feature_districts is not None:
+        return feature_districts.get(feature_id(properties))
+    return properties['district'].strip().title()
+
+
+def add_wer_to_geojson(geojson_data, model_data, bins=None, feature_districts=None, labels=None):
+    """Return a copy of the GeoJSON with WER data from model in its properties
+
+    With `bins` ({district: WER bin}), features also get a `wer_bin` property
+    for BinnedGeoJson. `feature_districts` ({feature ID: result district},
+    see district_join) resolves features to result districts; without it,
+    feature names are matched as they are. `labels` ({district: text})
+    replace the plain WER in the `wer` property. Only the feature and
+    properties dicts are copied; geometry is shared with the input, which is
+    left untouched.
+    """
+    features = []
+    for feature in geojson_data['features']:
+        district = _feature_district(feature['properties'], feature_districts)
+        if labels is not None:
+            wer = labels.get(district, 'N/A')
+        elif district in model_data:
+            wer = f"{model_data[district]['WER']}%"
+        else:
+            wer = 'N/A'
+        properties = dict(feature['properties'], wer=wer)
+        if bins is not None:
+            properties['wer_bin'] = bins.get(district, NO_DATA_BIN)
+        features.append(dict(feature, properties=properties))
+    return dict(geojson_data, features=features)
+
+
+def get_wer_layers(base_geojsons: Dict[str, Dict[str, Any]], model: str,
+                   model_data: Dict[str, Any], data_version: Optional[str],
+                   bins: Optional[Dict[str, int]] = None,
+                   feature_districts: Optional[Dict[str, str]] = None,
+                   labels: Optional[Dict[str, str]] = None,
+                   labels_key: Any = None) -> Dict[str, Dict[str, Any]]:
+    """WER-annotated copies of every state layer, computed once per model and data version
+
+    `labels_key` tells apart label sets of one model and data version.
+    """
+    key = (model, data_version, bins is not None, labels is not None, labels_key, id(feature_districts),
+           tuple((state_name, id(geojson_data)) for state_name, geojson_data in base_geojsons.items()))
+
+    def build():
+        return {
+            state_name: add_wer_to_geojson(geojson_data, model_data, bins, feature_districts, labels)
+            for state_name, geojson_data in base_geojsons.items()
+        }
+
+    return _wer_layers.get(key, build, refs=(dict(base_geojsons), feature_districts))
+
+
+def add_view_to_geojson(geojson_data, view: Dict[str, Any], feature_districts=None):
+    """Return a copy of the GeoJSON with a comparison view's `view_bin` and `view_label`"""
+    no_data_bin = len(view['colors']) + 1
+    features = []
+    for feature in geojson_data['features']:
+        district = _feature_district(feature['properties'], feature_districts)
+        properties = dict(feature['properties'],
+                          view_bin=view['bins'].get(district, no_data_bin),
+                          view_label=view['labels'].get(district, 'N/A'))
+        features.append(dict(feature, properties=properties))
+    return dict(geojson_data, features=features)
+
+
+def get_view_layer(base_layer: Dict[str, Any], view_key, view: Dict[str, Any],
+                   feature_districts: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """View-annotated copy of a (merged) district layer, computed once per view"""
+    key = (view_key, id(base_layer), id(feature_districts))
+    return _view_layers.get(key, lambda: add_view_to_geojson(base_layer, view, feature_districts),
+                            refs=(base_layer, feature_districts))
+
+
+def state_features(base_geojsons: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Features of every state layer, with the state file name as `state` property"""
+    features = []
+    for state_name, geojson_data in base_geojsons.items():
+        for feature in geojson_data['features']:
+            if not feature.get('geometry'):
+                continue
+            features.append(dict(feature, properties=dict(feature['properties'], state=state_name)))
+    return features
+
+
+def build_india_layer(base_geojsons: Dict[str, Dict[str, Any]],
+                      tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, Any]:
+    """Merge state layers into one simplified, topology-preserving district layer
+
+    Each feature gets a `state` property holding the state file name, which
+    is what the app uses as the state identifier.
+    """
+    topology = build_topology(state_features(base_geojsons))
+    simplified = simplify_topology(topology, tolerance) if tolerance else topology
+    return {'type': 'FeatureCollection', 'features': to_features(simplified, fallback=topology)}
+
+
+def get_india_layer(base_geojsons: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Merged India layer for these (cached) state layers, built once per process"""
+    key = tuple((state_name, id(geojson_data)) for state_name, geojson_data in base_geojsons.items())
+    return _india_layers.get(key, lambda: build_india_layer(base_geojsons), refs=dict(base_geojsons))
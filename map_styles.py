@@ -0,0 +1,70 @@
+"""WER colour bins and the style table of the district layer.
+
+Every district is classified into a WER bin once per model and data version
+(one vectorized pass over all districts). Features carry their bin index in
+a `wer_bin` property, and the map elements in map_elements.py emit one
+shared style per bin instead of a style entry per feature, so neither the
+payload nor the Python time of styling grows with the number of districts.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from data_cache import Memo
+
+# Upper (inclusive) WER limits of every bin but the last
+WER_THRESHOLDS = np.array([20.0, 50.0])
+BIN_COLORS = ['#00ff00', '#ffa500', '#ff0000']  # bright green, orange, red
+BIN_LABELS = ['WER ≤ 20%', '20% < WER ≤ 50%', 'WER > 50%']
+
+
+def make_styles(colors: List[str]) -> List[Dict[str, Any]]:
+    """Style table for colour bins: one style per colour, then highlight, then no data"""
+    return [
+        {'fillColor': color, 'color': 'black', 'weight': 1, 'fillOpacity': 0.7, 'dashArray': None}
+        for color in colors
+    ] + [
+        {'fillColor': '#ff000066', 'color': 'black', 'weight': 3, 'fillOpacity': 0.9, 'dashArray': '5, 5'},
+        {'fillColor': '#CCCCCC', 'color': 'black', 'weight': 1, 'fillOpacity': 0.4},
+    ]
+
+
+STYLES = make_styles(BIN_COLORS)
+
+# Style indices beyond the WER bins
+HIGHLIGHT_BIN = len(BIN_COLORS)
+NO_DATA_BIN = len(BIN_COLORS) + 1
+
+HOVER_STYLE = {'fillColor': '#ff000066', 'weight': 3, 'fillOpacity': 0.9}
+
+# One entry per (model, data version), shared across sessions
+_district_bins = Memo(max_entries=16, name='district_bins')
+
+
+def classify_wer(wer) -> np.ndarray:
+    """WER bin index of each value (scalars give a 0-d array)"""
+    return np.digitize(np.asarray(wer, dtype=float), WER_THRESHOLDS, right=True)
+
+
+def wer_color(wer) -> str:
+    return BIN_COLORS[int(classify_wer(wer))]
+
+
+def _compute_bins(data, model: str) -> Dict[str, int]:
+    if hasattr(data, 'wer_vector'):
+        # Results store: the WER column is already a float array
+        wer = data.wer_vector(model)
+        present = ~np.isnan(wer)
+        districts = [d for d, ok in zip(data.districts, present) if ok]
+        bins = classify_wer(wer[present])
+    else:
+        model_data = data[model]
+        districts = list(model_data)
+        bins = classify_wer(np.fromiter((float(model_data[d]['WER']) for d in districts),
+                                        dtype=float, count=len(districts)))
+    return dict(zip(districts, bins.tolist()))
+
+
+def get_district_bins(data, model: str, data_version: Optional[str]) -> Dict[str, int]:
+    """{district: WER bin} for a model, computed once per data version"""
+    return _district_bins.get((model, data_version, id(data)), lambda: _compute_bins(data, model), refs=data)
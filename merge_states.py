@@ -0,0 +1,51 @@
+import json
+import argparse
+from pathlib import Path
+
+from map_layers import DEFAULT_TOLERANCE, build_india_layer
+
+def merge_states(states_dir, output_file_path, tolerance=DEFAULT_TOLERANCE):
+    try:
+        # Read every state GeoJSON
+        state_files = sorted(Path(states_dir).glob("*.json"))
+        base_geojsons = {}
+        input_bytes = 0
+        for state_file in state_files:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                base_geojsons[state_file.stem] = json.load(f)
+            input_bytes += state_file.stat().st_size
+        
+        # Merge and simplify into a single district layer
+        india_layer = build_india_layer(base_geojsons, tolerance)
+        
+        # Compact separators: this file is sent to the browser as-is
+        with open(output_file_path, 'w', encoding='utf-8') as f:
+            json.dump(india_layer, f, ensure_ascii=False, separators=(',', ':'))
+        
+        output_bytes = Path(output_file_path).stat().st_size
+        print(f"Merged {len(state_files)} states ({len(india_layer['features'])} districts) into {output_file_path}")
+        print(f"Payload: {input_bytes:,} bytes -> {output_bytes:,} bytes ({output_bytes / input_bytes:.1%})")
+        return True
+        
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: a state file in '{states_dir}' contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Merge state GeoJSON files into one simplified all-India district layer')
+    parser.add_argument('states_dir', help='Directory containing the state GeoJSON files')
+    parser.add_argument('output_json', help='Path to the merged GeoJSON output file')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Simplification tolerance in degrees (0 disables simplification)')
+    
+    args = parser.parse_args()
+    
+    # Call the function with the provided paths
+    merge_states(args.states_dir, args.output_json, args.tolerance)
@@ -0,0 +1,83 @@
+"""Sidecar metadata index for results JSON files.
+
+`<results>.index.json` lists every model and district with its WER, sample
+count and the byte span of its record in the results file. It is built in
+one streaming pass and rebuilt whenever the results file's size or mtime no
+longer match the ones recorded in the index.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+from data_cache import Memo, load_json
+from json_stream import JsonStream
+
+INDEX_VERSION = 1
+
+# Indexes that could not be written next to their results file
+_unsaved_indexes = Memo(max_entries=4, name='results_indexes')
+
+
+def index_path(json_file_path) -> Path:
+    return Path(f"{json_file_path}.index.json")
+
+
+def _signature(json_file_path) -> Dict[str, int]:
+    stat = os.stat(json_file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_index(json_file_path) -> Dict[str, Any]:
+    """Index a results file holding one district record in memory at a time"""
+    models: Dict[str, Dict[str, Any]] = {}
+    with open(json_file_path, 'rb') as f:
+        stream = JsonStream(f)
+        stream.begin_object()
+        while (model := stream.next_key()) is not None:
+            districts = models.setdefault(model, {})
+            stream.begin_object()
+            while (district := stream.next_key()) is not None:
+                record, (start, end) = stream.read_value_span()
+                districts[district] = {
+                    'WER': record.get('WER'),
+                    'samples': len(record.get('Samples', {})),
+                    'offset': [start, end],
+                }
+        stream.end()
+    return {'version': INDEX_VERSION, 'source': _signature(json_file_path), 'models': models}
+
+
+def write_index(json_file_path) -> Dict[str, Any]:
+    """Build the index and save it next to the results file"""
+    index = build_index(json_file_path)
+    path = index_path(json_file_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return index
+
+
+def load_index(json_file_path) -> Dict[str, Any]:
+    """Return a current index for the results file, (re)building it if needed"""
+    signature = _signature(json_file_path)
+    path = index_path(json_file_path)
+    if path.exists():
+        index = load_json(path)
+        if index.get('version') == INDEX_VERSION and index.get('source') == signature:
+            return index
+    try:
+        return write_index(json_file_path)
+    except OSError:
+        # Read-only data directory: keep the index in memory instead
+        key = (str(Path(json_file_path).resolve()), signature['size'], signature['mtime_ns'])
+        return _unsaved_indexes.get(key, lambda: build_index(json_file_path))
+
+
+def read_record(json_file_path, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Read a single district record using its index entry"""
+    start, end = entry['offset']
+    with open(json_file_path, 'rb') as f:
+        f.seek(start)
+        return json.loads(f.read(end - start))
@@ -0,0 +1,274 @@
+"""Columnar, memory-mapped store for the {model: {district: {WER, Samples}}} results.
+
+Layout of a store directory:
+
+    meta.json           models, districts, per-model district order, version
+                        and the data directory holding the files below
+    data-*/wer.npy             float64 [models, districts], NaN where a model has no district
+    cells.npy           int64 [models, districts, 3]: record string id, first and
+                        end sample row (record id -1 if the model has no district)
+    samples.npy         int64 [rows, 2]: sample id and sample JSON string ids
+    strings.bin         UTF-8 string table
+    string_offsets.npy  int64 [strings + 1] byte offsets into strings.bin
+
+District records (everything but `Samples`) and samples are stored as JSON
+strings and decoded only when accessed, so opening a store reads just
+meta.json and maps the arrays.
+
+A conversion writes a new data directory and then replaces meta.json
+atomically, so files a running app has mapped are never truncated or
+rewritten: readers see the old store or the new one. Data directories older
+than the previous one are removed (mappings of removed files stay valid).
+"""
+import hashlib
+import json
+import mmap
+import argparse
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+import numpy as np
+
+from data_cache import Memo
+
+FORMAT_VERSION = 2
+# Format 1 stores keep their files next to meta.json
+READABLE_FORMATS = (1, 2)
+
+
+class _StringTableWriter:
+    def __init__(self, f):
+        self._f = f
+        self.offsets = [0]
+
+    def add(self, value: str) -> int:
+        encoded = value.encode('utf-8')
+        self._f.write(encoded)
+        self.offsets.append(self.offsets[-1] + len(encoded))
+        return len(self.offsets) - 2
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_results_store(data: Dict[str, Any], out_dir, version: str = None):
+    """Write nested results data as a columnar store in `out_dir`"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    data_dir = Path(tempfile.mkdtemp(prefix='data-', dir=out_dir))
+    os.chmod(data_dir, 0o755)  # mkdtemp creates it private
+
+    models = list(data)
+    districts = list(dict.fromkeys(district for model in models for district in data[model]))
+    district_ix = {district: i for i, district in enumerate(districts)}
+
+    wer = np.full((len(models), len(districts)), np.nan)
+    cells = np.full((len(models), len(districts), 3), -1, dtype=np.int64)
+    sample_rows = []
+    with open(data_dir / 'strings.bin', 'wb') as f:
+        strings = _StringTableWriter(f)
+        for m, model in enumerate(models):
+            for district, record in data[model].items():
+                d = district_ix[district]
+                try:
+                    wer[m, d] = float(record['WER'])
+                except (KeyError, TypeError, ValueError):
+                    pass
+                start = len(sample_rows)
+                for sample_id, sample in record.get('Samples', {}).items():
+                    sample_rows.append((strings.add(sample_id), strings.add(_dumps(sample))))
+                summary = {key: value for key, value in record.items() if key != 'Samples'}
+                if 'Samples' in record:
+                    # Remember that the record had a (possibly empty) Samples dict
+                    summary['Samples'] = None
+                cells[m, d] = (strings.add(_dumps(summary)), start, len(sample_rows))
+
+    np.save(data_dir / 'wer.npy', wer)
+    np.save(data_dir / 'cells.npy', cells)
+    np.save(data_dir / 'samples.npy', np.array(sample_rows, dtype=np.int64).reshape(-1, 2))
+    np.save(data_dir / 'string_offsets.npy', np.array(strings.offsets, dtype=np.int64))
+
+    meta = {
+        'format': FORMAT_VERSION,
+        'version': version,
+        'models': models,
+        'districts': districts,
+        'model_districts': {model: [district_ix[d] for d in data[model]] for model in models},
+        'data_dir': data_dir.name,
+    }
+    previous = _data_dir_name(out_dir)
+    # meta.json last, swapped in atomically: the store switches to the new
+    # data directory in one step
+    tmp_path = out_dir / 'meta.json.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, out_dir / 'meta.json')
+
+    # Keep the previous data directory for readers that loaded its meta.json
+    # but haven't mapped its files yet
+    for old in out_dir.glob('data-*'):
+        if old.name not in (data_dir.name, previous):
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _data_dir_name(out_dir: Path):
+    """Data directory of the current store in `out_dir`, if any"""
+    try:
+        with open(out_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            return json.load(f).get('data_dir')
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class _Samples(Mapping):
+    """Lazy {sample_id: sample} view over a slice of the sample table"""
+
+    def __init__(self, store: "ResultsStore", start: int, end: int):
+        self._store = store
+        self._start = start
+        self._end = end
+        self._ids = None
+
+    def _index(self) -> Dict[str, int]:
+        if self._ids is None:
+            rows = self._store._samples[self._start:self._end, 0]
+            self._ids = {self._store._string(int(s)): self._start + i for i, s in enumerate(rows)}
+        return self._ids
+
+    def __getitem__(self, sample_id):
+        row = self._index()[sample_id]
+        return json.loads(self._store._string(int(self._store._samples[row, 1])))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index())
+
+    def __len__(self):
+        return self._end - self._start
+
+
+class _ModelResults(Mapping):
+    """{district: record} view of one model; records are decoded on first access"""
+
+    def __init__(self, store: "ResultsStore", m: int, district_ixs):
+        self._store = store
+        self._m = m
+        self._districts = {store.districts[d]: d for d in district_ixs}
+        self._records: Dict[str, Dict[str, Any]] = {}
+
+    def __getitem__(self, district):
+        record = self._records.get(district)
+        if record is None:
+            d = self._districts[district]
+            record_id, start, end = (int(x) for x in self._store._cells[self._m, d])
+            record = json.loads(self._store._string(record_id))
+            if 'Samples' in record:
+                record['Samples'] = _Samples(self._store, start, end)
+            self._records[district] = record
+        return record
+
+    def __contains__(self, district):
+        return district in self._districts
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._districts)
+
+    def __len__(self):
+        return len(self._districts)
+
+
+class ResultsStore(Mapping):
+    """Read-only {model: {district: {WER, Samples}}} mapping backed by a store directory"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') not in READABLE_FORMATS:
+            raise ValueError(f"Unsupported results store format: {meta.get('format')}")
+        self.version = meta.get('version')
+        self.models = meta['models']
+        self.districts = meta['districts']
+        self._model_districts = meta['model_districts']
+        data_dir = self.path / meta.get('data_dir', '.')
+        self._wer = np.load(data_dir / 'wer.npy', mmap_mode='r')
+        self._cells = np.load(data_dir / 'cells.npy', mmap_mode='r')
+        self._samples = np.load(data_dir / 'samples.npy', mmap_mode='r')
+        self._offsets = np.load(data_dir / 'string_offsets.npy', mmap_mode='r')
+        with open(data_dir / 'strings.bin', 'rb') as f:
+            # mmap rejects empty files
+            self._strings = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+        self._model_views: Dict[str, _ModelResults] = {}
+
+    def _string(self, ix: int) -> str:
+        return self._strings[int(self._offsets[ix]):int(self._offsets[ix + 1])].decode('utf-8')
+
+    def wer_vector(self, model: str) -> np.ndarray:
+        """WER for every district in `districts` order (NaN where missing)"""
+        return np.asarray(self._wer[self.models.index(model)])
+
+    def __getitem__(self, model):
+        view = self._model_views.get(model)
+        if view is None:
+            m = self.models.index(model) if model in self.models else None
+            if m is None:
+                raise KeyError(model)
+            view = _ModelResults(self, m, self._model_districts[model])
+            self._model_views[model] = view
+        return view
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.models)
+
+    def __len__(self):
+        return len(self.models)
+
+
+_stores = Memo(max_entries=4, name='results_stores')
+
+
+def open_results_store(path) -> ResultsStore:
+    """Open a store once per process; re-opened when meta.json changes"""
+    path = Path(path).resolve()
+    stat = os.stat(path / 'meta.json')
+    return _stores.get((str(path), stat.st_mtime_ns, stat.st_size), lambda: ResultsStore(path))
+
+
+def convert_results(json_file_path, output_dir):
+    try:
+        # Read the JSON file
+        with open(json_file_path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+
+        # Same digest as data_cache, so versions match the JSON source
+        version = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        write_results_store(data, output_dir, version=version)
+
+        print(f"Results store written to {output_dir} ({len(data)} models)")
+        return True
+
+    except FileNotFoundError:
+        print(f"Error: File '{json_file_path}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: '{json_file_path}' contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert a results JSON file to a columnar, memory-mapped store')
+    parser.add_argument('input_json', help='Path to the input JSON file')
+    parser.add_argument('output_dir', help='Directory for the results store')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided paths
+    convert_results(args.input_json, args.output_dir)
@@ -0,0 +1,192 @@
+"""Full-text search over every Reference and ModelOutput transcript.
+
+Transcripts are tokenized the way WER is scored (wer.tokenize: markup and
+Latin/Indic punctuation removed, Unicode NFC), then case-folded. The index
+is positional and stored as flat NumPy arrays: one (document, position)
+posting per token, grouped by term. Word queries intersect document lists;
+phrase queries intersect (document, position - offset) keys, so a query
+costs a few array operations per term regardless of corpus size.
+"""
+import html
+import re
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from data_cache import Memo
+from wer import tokenize
+
+FIELDS = ('Reference', 'ModelOutput')
+
+# Words and "quoted phrases"
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+# One index per data version, shared across sessions
+_indexes = Memo(max_entries=2, name='search_indexes')
+
+
+def search_tokens(text: str) -> List[str]:
+    return [token.casefold() for token in tokenize(text)]
+
+
+class SearchIndex:
+    """Positional inverted index over {model: {district: {Samples}}} results"""
+
+    def __init__(self, data):
+        self._data = data
+        self.models: List[str] = list(data)
+        self.districts: List[str] = []
+        district_ixs: Dict[str, int] = {}
+        self._samples: List[str] = []
+        self._terms: Dict[str, int] = {}
+
+        # Compact typed buffers: millions of postings as Python ints would not fit
+        doc_model, doc_district, doc_sample, doc_field = array('i'), array('i'), array('q'), array('b')
+        post_terms, post_docs, post_positions = array('q'), array('q'), array('q')
+        for m, model in enumerate(self.models):
+            for district, district_data in data[model].items():
+                d = district_ixs.setdefault(district, len(district_ixs))
+                samples = district_data.get('Samples', {})
+                for sample_id in samples:
+                    sample = samples[sample_id]
+                    self._samples.append(sample_id)
+                    for f, field in enumerate(FIELDS):
+                        doc = len(doc_model)
+                        doc_model.append(m)
+                        doc_district.append(d)
+                        doc_sample.append(len(self._samples) - 1)
+                        doc_field.append(f)
+                        for position, token in enumerate(search_tokens(sample.get(field, ''))):
+                            post_terms.append(self._terms.setdefault(token, len(self._terms)))
+                            post_docs.append(doc)
+                            post_positions.append(position)
+        self.districts = list(district_ixs)
+
+        self._doc_model = np.frombuffer(doc_model, dtype=np.int32)
+        self._doc_district = np.frombuffer(doc_district, dtype=np.int32)
+        self._doc_sample = np.frombuffer(doc_sample, dtype=np.int64)
+        self._doc_field = np.frombuffer(doc_field, dtype=np.int8)
+
+        # Postings grouped by term, each group sorted by (doc, position)
+        terms = np.frombuffer(post_terms, dtype=np.int64)
+        order = np.argsort(terms, kind='stable')
+        self._post_docs = np.frombuffer(post_docs, dtype=np.int64)[order]
+        self._post_positions = np.frombuffer(post_positions, dtype=np.int64)[order]
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(terms, minlength=len(self._terms)))))
+        self._max_position = int(self._post_positions.max()) + 1 if len(self._post_positions) else 1
+
+    @property
+    def documents(self) -> int:
+        return len(self._doc_model)
+
+    def _postings(self, token: str):
+        term = self._terms.get(token)
+        if term is None:
+            return None
+        start, end = self._offsets[term], self._offsets[term + 1]
+        return self._post_docs[start:end], self._post_positions[start:end]
+
+    def _phrase(self, tokens: List[str]) -> np.ndarray:
+        """doc * max_position + start position of every occurrence of the phrase"""
+        keys = None
+        for offset, token in enumerate(tokens):
+            postings = self._postings(token)
+            if postings is None:
+                return np.empty(0, dtype=np.int64)
+            docs, positions = postings
+            # Align every term on the phrase's first position; a term too
+            # early in its document to follow the first can't be part of it
+            if offset:
+                keep = positions >= offset
+                docs, positions = docs[keep], positions[keep]
+            term_keys = docs * self._max_position + (positions - offset)
+            keys = term_keys if keys is None else _intersect_sorted(keys, term_keys)
+            if not len(keys):
+                break
+        return keys
+
+    def search(self, query: str, models: Iterable[str] = None, districts: Iterable[str] = None,
+               limit: int = 50) -> Dict[str, Any]:
+        """Documents matching every word and "quoted phrase" of the query
+
+        Returns {'total', 'seconds', 'results'}; each result has model,
+        district, sample_id, field, text and highlighted HTML.
+        """
+        start_time = time.perf_counter()
+        phrases = [search_tokens(phrase or word) for phrase, word in _QUERY.findall(query)]
+        phrases = [tokens for tokens in phrases if tokens]
+        if not phrases:
+            return {'total': 0, 'seconds': 0.0, 'results': []}
+
+        phrase_keys = [self._phrase(tokens) for tokens in phrases]
+        docs = None
+        for keys in phrase_keys:
+            matched = _unique_sorted(keys // self._max_position)
+            docs = matched if docs is None else _intersect_sorted(docs, matched)
+
+        if models is not None:
+            model_ixs = [i for i, model in enumerate(self.models) if model in set(models)]
+            docs = docs[np.isin(self._doc_model[docs], model_ixs)]
+        if districts is not None:
+            district_ixs = [i for i, district in enumerate(self.districts) if district in set(districts)]
+            docs = docs[np.isin(self._doc_district[docs], district_ixs)]
+
+        # Highlight positions, only for the documents returned
+        shown = docs[:limit]
+        highlights: Dict[int, set] = {int(doc): set() for doc in shown}
+        for tokens, keys in zip(phrases, phrase_keys):
+            first = np.searchsorted(keys, shown * self._max_position)
+            last = np.searchsorted(keys, (shown + 1) * self._max_position)
+            for doc, lo, hi in zip(shown.tolist(), first.tolist(), last.tolist()):
+                for start in (keys[lo:hi] % self._max_position).tolist():
+                    highlights[doc].update(range(start, start + len(tokens)))
+
+        results = []
+        for doc in shown.tolist():
+            model = self.models[self._doc_model[doc]]
+            district = self.districts[self._doc_district[doc]]
+            sample_id = self._samples[self._doc_sample[doc]]
+            field = FIELDS[self._doc_field[doc]]
+            text = self._data[model][district]['Samples'][sample_id].get(field, '')
+            results.append({
+                'model': model,
+                'district': district,
+                'sample_id': sample_id,
+                'field': field,
+                'text': text,
+                'highlighted': highlight(text, highlights[doc]),
+            })
+        return {'total': len(docs), 'seconds': time.perf_counter() - start_time, 'results': results}
+
+
+def _intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Values present in both sorted, duplicate-free arrays"""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return a
+    ix = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return a[b[ix] == a]
+
+
+def _unique_sorted(values: np.ndarray) -> np.ndarray:
+    """np.unique for an already sorted array, without re-sorting it"""
+    if not len(values):
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def highlight(text: str, positions: Iterable[int]) -> str:
+    """Normalized text as HTML with the tokens at `positions` in <mark>"""
+    positions = set(positions)
+    return ' '.join(
+        f"<mark>{html.escape(token)}</mark>" if i in positions else html.escape(token)
+        for i, token in enumerate(tokenize(text))
+    )
+
+
+def get_search_index(data, data_version: Optional[str]) -> SearchIndex:
+    """Search index of the loaded results, built once per data version"""
+    return _indexes.get((data_version, id(data)), lambda: SearchIndex(data), refs=data)
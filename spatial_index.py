@@ -0,0 +1,74 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import shapely
+from shapely.geometry import Point, shape
+
+from data_cache import Memo
+from district_join import feature_id
+
+
+class DistrictIndex:
+    """STRtree over prepared district polygons for point-in-district lookups"""
+
+    def __init__(self, all_geojsons: Dict[str, Dict[str, Any]]):
+        geometries = []
+        self._keys = []
+        self._ids = []
+        for state_name, geojson_data in all_geojsons.items():
+            if not geojson_data:
+                continue
+            for feature in geojson_data['features']:
+                try:
+                    geometry = shape(feature['geometry'])
+                except Exception:
+                    continue
+                if geometry.is_empty:
+                    continue
+                shapely.prepare(geometry)
+                geometries.append(geometry)
+                self._keys.append((state_name, feature['properties']['district']))
+                self._ids.append(feature_id(feature['properties']))
+        self._geometries = geometries
+        self._tree = shapely.STRtree(geometries)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def locate(self, lat: float, lng: float,
+               districts: Optional[Iterable[str]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Return (state, district) containing the point, optionally limited to `districts`"""
+        ix = self._locate(lat, lng, self._keys, districts, key=lambda state_district: state_district[1])
+        return self._keys[ix] if ix is not None else (None, None)
+
+    def locate_feature(self, lat: float, lng: float, ids: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Return the ID (district_join.feature_id) of the feature containing the point,
+        optionally limited to `ids`"""
+        ix = self._locate(lat, lng, self._ids, ids)
+        return self._ids[ix] if ix is not None else None
+
+    def _locate(self, lat, lng, keys, allowed, key=lambda value: value) -> Optional[int]:
+        # Bounding-box candidates, lowest index first to keep the state/feature
+        # order of a linear scan
+        for ix in sorted(self._tree.query(Point(lng, lat))):
+            if allowed is not None and key(keys[ix]) not in allowed:
+                continue
+            try:
+                if shapely.contains_xy(self._geometries[ix], lng, lat):
+                    return ix
+            except Exception:
+                # Some source polygons are invalid; skip them like shape().contains did
+                continue
+        return None
+
+
+_indexes = Memo(max_entries=4, name='spatial_indexes')
+
+
+def get_district_index(all_geojsons: Dict[str, Dict[str, Any]]) -> DistrictIndex:
+    """Return the index for these GeoJSON objects, building it on first use
+
+    Indexes are memoized on the identity of the (cached, shared) GeoJSON
+    objects, so a reloaded state file gets a fresh index.
+    """
+    key = tuple((state_name, id(geojson_data)) for state_name, geojson_data in all_geojsons.items())
+    return _indexes.get(key, lambda: DistrictIndex(all_geojsons), refs=dict(all_geojsons))
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio_proxy import AudioProxy, DiskCache  # noqa: E402
+
+
+class Backend:
+    def __init__(self, clips):
+        self.clips = clips
+
+    def fetch(self, url):
+        if url not in self.clips:
+            raise ConnectionError(url)
+        return self.clips[url]
+
+
+def test_open_clip_survives_eviction(tmp_path):
+    clips = {'https://a/1.wav': b'1' * 100, 'https://a/2.wav': b'2' * 100}
+    proxy = AudioProxy(Backend(clips), DiskCache(tmp_path, max_bytes=150))
+
+    with proxy.open('https://a/1.wav') as f:
+        proxy.open('https://a/2.wav').close()  # evicts and unlinks 1.wav
+        assert proxy.cache.get('https://a/1.wav', count=False) is None
+        assert f.read() == clips['https://a/1.wav']
+
+
+def test_failed_fetch_releases_its_url_lock(tmp_path):
+    proxy = AudioProxy(Backend({}), DiskCache(tmp_path))
+
+    with pytest.raises(ConnectionError):
+        proxy.open('https://a/missing.wav')
+    assert proxy._url_locks == {}
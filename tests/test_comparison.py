@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from comparison import WerMatrix, best_model_view, rank_view  # noqa: E402
+
+
+def results(models, districts=('Pune', 'Nagpur')):
+    return {f"Model{m}": {district: {'WER': 10.0 + m + d} for d, district in enumerate(districts)}
+            for m in range(models)}
+
+
+def test_best_model_colours_are_distinct_past_the_palette():
+    view = best_model_view(WerMatrix(results(12)))
+
+    assert len(set(view['colors'])) == len(view['colors']) == 13
+
+
+def test_rank_colours_are_distinct_past_the_palette():
+    view = rank_view(WerMatrix(results(10)), 'Model0')
+
+    assert len(set(view['colors'])) == 10
+    assert [label for _, label in view['legend']] == [f"Rank {rank}" for rank in range(1, 11)]
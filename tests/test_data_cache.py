@@ -0,0 +1,30 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_cache import Memo  # noqa: E402
+
+
+def test_get_nowait_builds_once_in_the_background():
+    memo = Memo()
+    release, built = threading.Event(), threading.Event()
+    calls = []
+
+    def build():
+        calls.append(1)
+        release.wait(5)
+        built.set()
+        return 'value'
+
+    assert memo.get_nowait('key', build) is None
+    assert memo.get_nowait('key', build) is None
+    release.set()
+    assert built.wait(5)
+    for _ in range(100):
+        if memo.peek('key') is not None:
+            break
+        threading.Event().wait(0.01)
+    assert memo.get_nowait('key', build) == 'value'
+    assert calls == [1]
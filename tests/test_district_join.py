@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from district_join import build_join  # noqa: E402
+
+
+def state_layer(*districts):
+    return {'features': [{'properties': {'district': name, 'st_nm': 'Maharashtra', 'st_code': 27, 'dt_code': code}}
+                         for code, name in enumerate(districts, 1)]}
+
+
+def results(*districts):
+    return {'Google': {district: {'WER': 30.0} for district in districts}}
+
+
+def test_district_sharing_a_feature_is_reported():
+    join = build_join(results('Pune', 'pune'), {'maharashtra': state_layer('Pune')})
+
+    assert join.district_ids == {'Pune': '27-1'}
+    assert join.feature_districts == {'27-1': 'Pune'}
+    assert [(entry['district'], entry['reason']) for entry in join.unmatched] == [('pune', 'same feature as Pune')]
+
+
+def test_tied_districts_sharing_a_feature_are_all_reported():
+    join = build_join(results('Pune.', 'pune'), {'maharashtra': state_layer('Pune')})
+
+    assert join.district_ids == {}
+    assert sorted(entry['district'] for entry in join.unmatched) == ['Pune.', 'pune']
+
+
+def test_distinct_features_are_kept():
+    join = build_join(results('Pune', 'Nagpur'), {'maharashtra': state_layer('Pune', 'Nagpur')})
+
+    assert join.district_ids == {'Nagpur': '27-2', 'Pune': '27-1'}
+    assert join.unmatched == []
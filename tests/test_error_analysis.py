@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from error_analysis import KINDS, MAX_TOP, ErrorTables  # noqa: E402
+
+
+def results():
+    samples = {f"Sample_{i}": {'Reference': f"एक दो तीन चार {i % 3}", 'ModelOutput': f"एक पांच तीन {i % 2}"}
+               for i in range(1, 13)}
+    return {'Google': {'Pune': {'WER': 40.0, 'Samples': samples},
+                       'Nagpur': {'WER': 40.0, 'Samples': dict(list(samples.items())[:4])}}}
+
+
+def test_ranked_tables_match_the_counters():
+    tables = ErrorTables(results(), {'Pune': 'maharashtra', 'Nagpur': 'maharashtra'})
+
+    for kind in KINDS:
+        for scope in ({}, {'state': 'maharashtra'}, {'district': 'Pune'}, {'district': 'Nagpur'}):
+            counts = tables.counts('Google', **scope)[kind]
+            assert tables.top(kind, 'Google', n=3, **scope) == counts.most_common(3)
+            assert tables.top(kind, 'Google', n=MAX_TOP + 1, **scope) == counts.most_common(MAX_TOP + 1)
+    assert tables.top('deletions', 'Google', district='Unknown') == []
+    assert tables.top('deletions', 'Unknown') == []
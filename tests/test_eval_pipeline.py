@@ -0,0 +1,69 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+
+from eval_pipeline import index_dumps, merge_shards, run_pipeline  # noqa: E402
+
+
+def write_dump(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def utterances(district, count, **extra):
+    return [dict(District=district, Reference=f"एक दो तीन {i}", ModelOutput=f"एक दो {i}", **extra)
+            for i in range(count)]
+
+
+def test_chunks_without_sample_ids_keep_every_sample(tmp_path):
+    write_dump(tmp_path / 'Zeta.jsonl', utterances('Pune', 5))
+    output = tmp_path / 'results.json'
+    assert run_pipeline([tmp_path / 'Zeta.jsonl'], output, tmp_path / 'work', workers=1, chunk_size=2)
+
+    district = json.loads(output.read_text(encoding='utf-8'))['Zeta']['Pune']
+    assert sorted(district['Samples']) == [f"Sample_{i}" for i in range(1, 6)]
+    assert district['ReferenceWords'] == sum(s['ReferenceWords'] for s in district['Samples'].values())
+
+
+def test_models_and_districts_keep_input_order(tmp_path):
+    write_dump(tmp_path / 'Zeta.jsonl', utterances('Pune', 3) + utterances('Agra', 3))
+    write_dump(tmp_path / 'Alpha.jsonl', utterances('Pune', 3))
+    output = tmp_path / 'results.json'
+    assert run_pipeline([tmp_path / 'Zeta.jsonl', tmp_path / 'Alpha.jsonl'], output, tmp_path / 'work',
+                        workers=1, chunk_size=2)
+
+    data = json.loads(output.read_text(encoding='utf-8'))
+    assert list(data) == ['Zeta', 'Alpha']
+    assert list(data['Zeta']) == ['Pune', 'Agra']
+
+
+def test_merge_rejects_duplicate_sample_ids(tmp_path):
+    total = {'Substitutions': 0, 'Deletions': 0, 'Insertions': 0, 'ReferenceWords': 1, 'Errors': 0, 'WER': 0.0}
+    for name in ('a', 'b'):
+        shard = {'model': 'M', 'district': 'Pune', 'total': total, 'samples': {'Sample_1': {'Reference': name}}}
+        (tmp_path / f"{name}.json").write_text(json.dumps(shard), encoding='utf-8')
+
+    with pytest.raises(ValueError, match='Sample_1'):
+        merge_shards([tmp_path / 'a.json', tmp_path / 'b.json'])
+
+
+def test_block_indexing_matches_one_pass(tmp_path):
+    write_dump(tmp_path / 'Zeta.jsonl', utterances('Pune', 7) + utterances('Agra', 5, Model='Other'))
+    with open(tmp_path / 'Zeta.jsonl', 'a', encoding='utf-8') as f:
+        f.write('\n')
+    dumps = [tmp_path / 'Zeta.jsonl']
+    whole = index_dumps(dumps, block_bytes=1 << 30)
+
+    # Blocks smaller than a line: most start mid-line
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        blocks = index_dumps(dumps, pool, block_bytes=37)
+    assert list(whole) == [('Zeta', 'Pune'), ('Other', 'Agra')]
+    assert blocks == whole
+    assert list(blocks) == list(whole)
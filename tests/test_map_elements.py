@@ -0,0 +1,26 @@
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import folium  # noqa: E402
+
+from map_elements import BinnedGeoJson  # noqa: E402
+
+
+def district(code, wer_bin):
+    return {'type': 'Feature', 'properties': {'st_code': 27, 'dt_code': code, 'wer_bin': wer_bin},
+            'geometry': {'type': 'Point', 'coordinates': [73.8, 18.5]}}
+
+
+def test_bins_sharing_a_style_are_all_styled():
+    red, grey = {'fillColor': '#ff0000'}, {'fillColor': '#808080'}
+    layer = BinnedGeoJson({'type': 'FeatureCollection', 'features': [district(1, 0), district(2, 1)]},
+                          styles=[red, red, {'fillColor': '#0000ff'}, grey])
+    folium_map = folium.Map()
+    layer.add_to(folium_map)
+    html = folium_map.get_root().render()
+
+    assert list(layer.style_map.values())[0] == [0, 1]
+    assert re.search(r'case 0:\s*case 1:', html)
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_index import SearchIndex  # noqa: E402
+
+
+def results(*samples):
+    return {'Google': {'Pune': {'WER': 30.0, 'Samples': {
+        f"Sample_{i}": {'Reference': reference, 'ModelOutput': output}
+        for i, (reference, output) in enumerate(samples, 1)
+    }}}}
+
+
+def test_phrase_does_not_span_documents():
+    index = SearchIndex(results(('x y alpha', 'beta z')))
+
+    assert index.search('"alpha beta"')['total'] == 0
+    assert index.search('alpha beta')['total'] == 0
+
+
+def test_phrase_matches_within_a_document():
+    index = SearchIndex(results(('x y alpha', 'beta z'), ('alpha beta gamma', 'alpha gamma')))
+
+    found = index.search('"alpha beta"')
+    assert found['total'] == 1
+    assert [(hit['sample_id'], hit['field']) for hit in found['results']] == [('Sample_2', 'Reference')]
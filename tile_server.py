@@ -0,0 +1,122 @@
+"""Local HTTP server for district tiles.
+
+Serves /tiles/{z}/{x}/{y}.geojson, either generated on demand from the
+state layers or read from a pyramid written with --generate. Point the app
+at it with TILE_SERVER_URL, e.g.
+
+    python tile_server.py states --port 8765
+    TILE_SERVER_URL=http://localhost:8765 streamlit run app.py
+"""
+import gzip
+import json
+import argparse
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+from data_cache import Memo, load_file, load_json
+from tiles import TileSource
+from topology import read_topojson
+
+_TILE_PATH = re.compile(r"^/tiles/(\d+)/(\d+)/(\d+)\.geojson$")
+
+
+def load_state_layers(states_dir):
+    """{state: GeoJSON} for every state file, preferring converted TopoJSON"""
+    layers = {}
+    for path in sorted(Path(states_dir).glob("*.json")):
+        topojson_path = path.with_suffix(".topojson")
+        layers[path.stem] = load_file(topojson_path, read_topojson) if topojson_path.exists() else load_json(path)
+    return layers
+
+
+class TileRequestHandler(BaseHTTPRequestHandler):
+    source: TileSource = None
+    tiles_dir: Path = None
+    _gzipped = Memo(max_entries=4096)
+
+    def _tile(self, z, x, y):
+        if self.tiles_dir is not None:
+            path = self.tiles_dir / str(z) / str(x) / f"{y}.geojson"
+            # Empty tiles are not written to pyramids
+            return path.read_bytes() if path.exists() else b'{"type":"FeatureCollection","features":[]}'
+        return self.source.tile_bytes(z, x, y)
+
+    def do_GET(self):
+        match = _TILE_PATH.match(urlparse(self.path).path)
+        if not match:
+            self.send_error(404)
+            return
+        z, x, y = (int(group) for group in match.groups())
+        body = self._tile(z, x, y)
+        headers = {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': 'public, max-age=86400',
+        }
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = self._gzipped.get((z, x, y), lambda: gzip.compress(body, 6))
+            headers['Content-Encoding'] = 'gzip'
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def generate_tiles(states_dir, output_dir):
+    try:
+        source = TileSource(load_state_layers(states_dir))
+        counts = source.write_pyramid(output_dir)
+        print(f"Wrote {counts['tiles']:,} tiles ({counts['bytes']:,} bytes) for zoom "
+              f"{source.min_zoom}-{source.max_zoom} to {output_dir}")
+        return True
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: a state file in '{states_dir}' contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+
+def serve_tiles(states_dir, host='127.0.0.1', port=8765, tiles_dir=None):
+    try:
+        if tiles_dir is not None:
+            TileRequestHandler.tiles_dir = Path(tiles_dir)
+        else:
+            TileRequestHandler.source = TileSource(load_state_layers(states_dir))
+        server = ThreadingHTTPServer((host, port), TileRequestHandler)
+        print(f"Serving district tiles on http://{host}:{server.server_port}/tiles/{{z}}/{{x}}/{{y}}.geojson")
+        server.serve_forever()
+        return True
+    except KeyboardInterrupt:
+        return True
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve or pre-generate zoom-simplified district tiles')
+    parser.add_argument('states_dir', help='Directory containing the state GeoJSON files')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--tiles-dir', default=None, help='Serve a pyramid written with --generate instead')
+    parser.add_argument('--generate', metavar='OUTPUT_DIR', default=None,
+                        help='Write the tile pyramid to OUTPUT_DIR and exit')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided arguments
+    if args.generate:
+        generate_tiles(args.states_dir, args.generate)
+    else:
+        serve_tiles(args.states_dir, args.host, args.port, args.tiles_dir)
@@ -0,0 +1,142 @@
+"""GeoJSON tiles of the district layer, simplified per zoom level.
+
+Tiles use the usual web-map z/x/y scheme. A tile holds every district whose
+bounding box touches it, simplified to about half a screen pixel at that
+zoom. Districts are not clipped at tile edges: each one carries a stable
+`id`, and the browser adds a district only the first time any tile delivers
+it, so there are no seams along tile borders. Simplification runs on the
+shared-border topology, so neighbouring districts stay gap-free at every
+zoom.
+"""
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from data_cache import Memo
+from map_layers import state_features
+from topology import build_topology, simplify_topology, to_features
+
+MIN_ZOOM = 5
+MAX_ZOOM = 10
+TILE_SIZE = 256
+
+# Properties sent with every tile feature
+TILE_PROPERTIES = ('district', 'state', 'dt_code', 'st_code')
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of a tile in degrees"""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def tile_for(lng: float, lat: float, z: int) -> Tuple[int, int]:
+    """Tile (x, y) containing a point at zoom z"""
+    n = 2 ** z
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_covering(bounds: Tuple[float, float, float, float], z: int) -> Iterator[Tuple[int, int]]:
+    """Every tile (x, y) at zoom z intersecting (west, south, east, north)"""
+    west, south, east, north = bounds
+    x0, y0 = tile_for(west, north, z)
+    x1, y1 = tile_for(east, south, z)
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield x, y
+
+
+def zoom_tolerance(z: int) -> float:
+    """Half a screen pixel at zoom z, in degrees"""
+    return 360.0 / (TILE_SIZE * 2 ** z) / 2
+
+
+def _feature_bounds(feature: Dict[str, Any]) -> List[float]:
+    geometry = feature['geometry']
+    polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+    xs = [x for polygon in polygons for x, _ in polygon[0]]
+    ys = [y for polygon in polygons for _, y in polygon[0]]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+class TileSource:
+    """District tiles for a set of state layers
+
+    The topology is built once; each zoom level is simplified on first use
+    and encoded tiles are kept in a bounded LRU.
+    """
+
+    def __init__(self, base_geojsons: Dict[str, Dict[str, Any]],
+                 min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM, max_tiles: int = 4096):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self._topology = build_topology(state_features(base_geojsons))
+        self._levels: Dict[int, Tuple[List[Dict[str, Any]], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._tiles = Memo(max_entries=max_tiles)
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        _, boxes = self._level(self.max_zoom)
+        return tuple(boxes[:, :2].min(axis=0)) + tuple(boxes[:, 2:].max(axis=0))
+
+    def _level(self, z: int) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Simplified features of zoom z and their bounding boxes"""
+        with self._lock:
+            level = self._levels.get(z)
+            if level is None:
+                simplified = simplify_topology(self._topology, zoom_tolerance(z))
+                # Coordinates finer than a tenth of a pixel are not visible
+                digits = max(0, math.ceil(-math.log10(zoom_tolerance(z) / 5)))
+                features = []
+                for ix, feature in enumerate(to_features(simplified, fallback=self._topology, digits=digits)):
+                    if not feature['geometry']['coordinates']:
+                        continue
+                    properties = {key: feature['properties'].get(key) for key in TILE_PROPERTIES}
+                    features.append({'type': 'Feature', 'id': ix, 'properties': properties,
+                                     'geometry': feature['geometry']})
+                boxes = np.array([_feature_bounds(feature) for feature in features]).reshape(-1, 4)
+                level = self._levels[z] = (features, boxes)
+            return level
+
+    def tile(self, z: int, x: int, y: int) -> Dict[str, Any]:
+        """FeatureCollection of the districts touching tile z/x/y"""
+        if not self.min_zoom <= z <= self.max_zoom:
+            return {'type': 'FeatureCollection', 'features': []}
+        features, boxes = self._level(z)
+        west, south, east, north = tile_bounds(z, x, y)
+        hits = np.flatnonzero((boxes[:, 0] <= east) & (boxes[:, 2] >= west) &
+                              (boxes[:, 1] <= north) & (boxes[:, 3] >= south))
+        return {'type': 'FeatureCollection', 'features': [features[i] for i in hits]}
+
+    def tile_bytes(self, z: int, x: int, y: int) -> bytes:
+        """Encoded tile, cached"""
+        return self._tiles.get((z, x, y), lambda: json.dumps(
+            self.tile(z, x, y), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def write_pyramid(self, output_dir) -> Dict[str, int]:
+        """Write every non-empty tile as <output_dir>/z/x/y.geojson"""
+        counts = {'tiles': 0, 'bytes': 0}
+        for z in range(self.min_zoom, self.max_zoom + 1):
+            for x, y in tiles_covering(self.bounds, z):
+                tile = self.tile(z, x, y)
+                if not tile['features']:
+                    continue
+                path = Path(output_dir) / str(z) / str(x) / f"{y}.geojson"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                raw = json.dumps(tile, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                path.write_bytes(raw)
+                counts['tiles'] += 1
+                counts['bytes'] += len(raw)
+        return counts
@@ -0,0 +1,99 @@
+import json
+import argparse
+import math
+import time
+from pathlib import Path
+
+from shapely.geometry import shape
+
+from topology import build_topology, read_topojson, to_topojson
+
+def quantization_tolerance(precision):
+    """Farthest a vertex can move when rounded to a 10 ** -precision degree grid
+
+    Each coordinate moves by at most half a step, so a vertex by at most
+    half the diagonal of a grid cell. Edges interpolate their vertices, so
+    the same bound holds for the whole shape.
+    """
+    return math.sqrt(2) / 2 * 10 ** -precision
+
+def check_fidelity(original, decoded, tolerance):
+    """Return a list of problems between two FeatureCollections (empty if they match)"""
+    problems = []
+    if len(original['features']) != len(decoded['features']):
+        return [f"feature count {len(original['features'])} != {len(decoded['features'])}"]
+    for before, after in zip(original['features'], decoded['features']):
+        district = before['properties'].get('district')
+        if before['properties'] != after['properties']:
+            problems.append(f"{district}: properties differ")
+            continue
+        if not before.get('geometry'):
+            continue
+        # Within quantization_tolerance unless an arc was corrupted
+        distance = shape(before['geometry']).hausdorff_distance(shape(after['geometry']))
+        if distance > tolerance:
+            problems.append(f"{district}: shape moved by {distance:.2e} deg")
+    return problems
+
+def convert_states(states_dir, precision=5, check=True):
+    try:
+        state_files = sorted(Path(states_dir).glob("*.json"))
+        totals = {'geojson_bytes': 0, 'topojson_bytes': 0, 'geojson_parse': 0.0, 'topojson_parse': 0.0}
+        failed = []
+
+        for state_file in state_files:
+            with open(state_file, 'rb') as f:
+                raw = f.read()
+            start = time.perf_counter()
+            geojson = json.loads(raw)
+            totals['geojson_parse'] += time.perf_counter() - start
+
+            # Quantize, share borders and write next to the GeoJSON file
+            topojson = to_topojson(build_topology(geojson['features'], precision))
+            encoded = json.dumps(topojson, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            output_path = state_file.with_suffix('.topojson')
+            with open(output_path, 'wb') as f:
+                f.write(encoded)
+
+            start = time.perf_counter()
+            decoded = read_topojson(encoded)
+            totals['topojson_parse'] += time.perf_counter() - start
+            totals['geojson_bytes'] += len(raw)
+            totals['topojson_bytes'] += len(encoded)
+
+            if check:
+                problems = check_fidelity(geojson, decoded, tolerance=quantization_tolerance(precision))
+                if problems:
+                    failed.append(state_file.stem)
+                    print(f"{state_file.stem}: " + "; ".join(problems[:5]))
+
+        print(f"Converted {len(state_files)} state files in {states_dir}")
+        print(f"Size:  {totals['geojson_bytes']:,} -> {totals['topojson_bytes']:,} bytes "
+              f"({totals['geojson_bytes'] / max(totals['topojson_bytes'], 1):.1f}x smaller)")
+        print(f"Parse: {totals['geojson_parse'] * 1e3:.0f} -> {totals['topojson_parse'] * 1e3:.0f} ms "
+              f"(GeoJSON json.loads vs TopoJSON decode)")
+        if check:
+            print("Fidelity check: " + (f"FAILED for {', '.join(failed)}" if failed else "all districts match"))
+        return not failed
+
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: a state file in '{states_dir}' contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert state GeoJSON files to quantized TopoJSON (<state>.topojson)')
+    parser.add_argument('states_dir', help='Directory containing the state GeoJSON files')
+    parser.add_argument('--precision', type=int, default=5, help='Decimal places kept in coordinates')
+    parser.add_argument('--no-check', action='store_true', help='Skip the round-trip fidelity check')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided directory
+    convert_states(args.states_dir, args.precision, check=not args.no_check)
@@ -0,0 +1,264 @@
+"""Arc topology for district polygons.
+
+Rings are cut into arcs at junctions (points where neighbouring rings stop
+sharing a border), and each shared border is stored once. Simplifying the
+arcs instead of the polygons keeps neighbouring districts gap- and
+overlap-free, and the same structure is what TopoJSON serializes.
+"""
+import json
+import math
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+Point = Tuple[int, int]
+
+
+def _quantize(ring: Sequence[Sequence[float]], scale: float) -> List[Point]:
+    points = [(round(x * scale), round(y * scale)) for x, y, *_ in ring]
+    # Drop the closing point and any repeats introduced by rounding
+    deduped = [p for i, p in enumerate(points) if i == 0 or p != points[i - 1]]
+    while len(deduped) > 1 and deduped[-1] == deduped[0]:
+        deduped.pop()
+    return deduped
+
+
+def _polygons(geometry: Dict[str, Any]) -> List[List[List[List[float]]]]:
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def _find_junctions(rings: List[List[Point]]) -> set:
+    neighbours = defaultdict(set)
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            neighbours[point].add(frozenset((ring[i - 1], ring[(i + 1) % n])))
+    return {point for point, pairs in neighbours.items() if len(pairs) > 1}
+
+
+def _canonical_ring(ring: List[Point]) -> Tuple[Tuple[Point, ...], bool]:
+    """Rotation/direction-independent key for a ring without junctions"""
+    start = ring.index(min(ring))
+    rotated = ring[start:] + ring[:start]
+    backwards = [rotated[0]] + rotated[:0:-1]
+    if backwards < rotated:
+        return tuple(backwards + [backwards[0]]), True
+    return tuple(rotated + [rotated[0]]), False
+
+
+def build_topology(features: List[Dict[str, Any]], precision: int = 5) -> Dict[str, Any]:
+    """Build arcs and arc-indexed geometries from GeoJSON features
+
+    Coordinates are snapped to `precision` decimal places. Arc references
+    follow TopoJSON: `~i` (i.e. -i - 1) means arc `i` reversed.
+    """
+    scale = 10 ** precision
+    shapes = []
+    all_rings = []
+    for feature in features:
+        polygons = []
+        geometry = feature.get('geometry')
+        for polygon in _polygons(geometry) if geometry else []:
+            rings = [_quantize(ring, scale) for ring in polygon]
+            rings = [ring for ring in rings if len(ring) >= 3]
+            if rings:
+                polygons.append(rings)
+                all_rings.extend(rings)
+        shapes.append(polygons)
+
+    junctions = _find_junctions(all_rings)
+    arcs: List[List[Point]] = []
+    arc_ids: Dict[Tuple[Point, ...], int] = {}
+
+    def add_arc(points: List[Point]) -> int:
+        key = tuple(points)
+        if key in arc_ids:
+            return arc_ids[key]
+        reverse_key = key[::-1]
+        if reverse_key in arc_ids:
+            return ~arc_ids[reverse_key]
+        arc_ids[key] = len(arcs)
+        arcs.append(points)
+        return arc_ids[key]
+
+    def ring_arcs(ring: List[Point]) -> List[int]:
+        cuts = [i for i, point in enumerate(ring) if point in junctions]
+        if not cuts:
+            key, reversed_ = _canonical_ring(ring)
+            ix = add_arc(list(key))
+            return [~ix if reversed_ else ix]
+        rotated = ring[cuts[0]:] + ring[:cuts[0]]
+        offsets = [i - cuts[0] for i in cuts] + [len(ring)]
+        rotated.append(rotated[0])
+        return [add_arc(rotated[start:end + 1]) for start, end in zip(offsets, offsets[1:])]
+
+    geometries = []
+    for feature, polygons in zip(features, shapes):
+        geometries.append({
+            'type': 'MultiPolygon',
+            'arcs': [[ring_arcs(ring) for ring in polygon] for polygon in polygons],
+            'properties': feature.get('properties', {}),
+        })
+    return {'scale': scale, 'arcs': arcs, 'geometries': geometries}
+
+
+def _simplify(points: List[Point], tolerance: float) -> List[Point]:
+    """Douglas-Peucker on one arc; both endpoints are always kept"""
+    n = len(points)
+    if n <= 2:
+        return points
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = points[first]
+        x2, y2 = points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        max_dist, index = -1.0, None
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length_sq == 0:
+                # Closed arc: measure from the shared endpoint
+                dist = (px - x1) ** 2 + (py - y1) ** 2
+            else:
+                cross = dx * (py - y1) - dy * (px - x1)
+                dist = cross * cross / length_sq
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and (max_dist > tolerance_sq or length_sq == 0):
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_topology(topology: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Return a copy of `topology` with every arc simplified to `tolerance` degrees"""
+    scaled = tolerance * topology['scale']
+    return dict(topology, arcs=[_simplify(arc, scaled) for arc in topology['arcs']])
+
+
+def _ring_points(arcs: List[List[Point]], refs: List[int]) -> List[Point]:
+    points: List[Point] = []
+    for ref in refs:
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        points.extend(arc if not points else arc[1:])
+    return points
+
+
+def to_features(topology: Dict[str, Any], fallback: Dict[str, Any] = None,
+                digits: int = None) -> List[Dict[str, Any]]:
+    """Rebuild GeoJSON features from a topology
+
+    Rings that collapse below four positions after simplification are taken
+    from `fallback` (normally the unsimplified topology) instead.
+    """
+    scale = topology['scale']
+    digits = len(str(scale)) - 1 if digits is None else digits
+    features = []
+    for geometry in topology['geometries']:
+        polygons = []
+        for polygon in geometry['arcs']:
+            rings = []
+            for refs in polygon:
+                ring = _ring_points(topology['arcs'], refs)
+                if len(ring) < 4 and fallback is not None:
+                    ring = _ring_points(fallback['arcs'], refs)
+                if len(ring) >= 4:
+                    rings.append([[round(x / scale, digits), round(y / scale, digits)] for x, y in ring])
+                elif not rings:
+                    # Shell collapsed: drop the whole polygon
+                    break
+            if rings:
+                polygons.append(rings)
+        if len(polygons) == 1:
+            shape = {'type': 'Polygon', 'coordinates': polygons[0]}
+        else:
+            shape = {'type': 'MultiPolygon', 'coordinates': polygons}
+        features.append({'type': 'Feature', 'properties': geometry['properties'], 'geometry': shape})
+    return features
+
+
+def to_topojson(topology: Dict[str, Any], object_name: str = 'districts') -> Dict[str, Any]:
+    """Serialize a topology as quantized, delta-encoded TopoJSON"""
+    arcs = topology['arcs']
+    x0 = min((x for arc in arcs for x, _ in arc), default=0)
+    y0 = min((y for arc in arcs for _, y in arc), default=0)
+    encoded = []
+    for arc in arcs:
+        previous = (x0, y0)
+        deltas = []
+        for x, y in arc:
+            deltas.append([x - previous[0], y - previous[1]])
+            previous = (x, y)
+        encoded.append(deltas)
+
+    geometries = []
+    for geometry in topology['geometries']:
+        polygons = geometry['arcs']
+        if len(polygons) == 1:
+            geometries.append({'type': 'Polygon', 'arcs': polygons[0], 'properties': geometry['properties']})
+        else:
+            geometries.append({'type': 'MultiPolygon', 'arcs': polygons, 'properties': geometry['properties']})
+
+    scale = topology['scale']
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [1 / scale, 1 / scale], 'translate': [x0 / scale, y0 / scale]},
+        'objects': {object_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': encoded,
+    }
+
+
+def read_topojson(raw: bytes) -> Dict[str, Any]:
+    """Decode a TopoJSON document straight into a GeoJSON FeatureCollection
+
+    All geometry collections in `objects` are concatenated. Usable as a
+    data_cache parser.
+    """
+    topo = json.loads(raw)
+    (sx, sy), (tx, ty) = topo['transform']['scale'], topo['transform']['translate']
+    digits = max(0, round(-math.log10(sx)))
+
+    # Undo the delta encoding for all arcs at once
+    encoded = topo['arcs']
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    positions = np.array(list(chain.from_iterable(encoded)), dtype=np.int64).reshape(-1, 2).cumsum(axis=0)
+    offsets = np.zeros((len(encoded), 2), dtype=np.int64)
+    offsets[starts > 0] = positions[starts[starts > 0] - 1]
+    positions -= np.repeat(offsets, lengths, axis=0)
+    coords = np.round(positions * [sx, sy] + [tx, ty], digits).tolist()
+    arcs = [coords[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+
+    def ring(refs):
+        if len(refs) == 1:
+            return arcs[refs[0]] if refs[0] >= 0 else arcs[~refs[0]][::-1]
+        points = []
+        for ref in refs:
+            arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+            points.extend(arc if not points else arc[1:])
+        return points
+
+    features = []
+    for topo_object in topo['objects'].values():
+        for geometry in topo_object['geometries']:
+            if geometry['type'] == 'Polygon':
+                shape = {'type': 'Polygon', 'coordinates': [ring(refs) for refs in geometry['arcs']]}
+            elif geometry['type'] == 'MultiPolygon':
+                shape = {'type': 'MultiPolygon',
+                         'coordinates': [[ring(refs) for refs in polygon] for polygon in geometry['arcs']]}
+            else:
+                shape = None
+            features.append({'type': 'Feature', 'properties': geometry.get('properties', {}), 'geometry': shape})
+    return {'type': 'FeatureCollection', 'features': features}
@@ -0,0 +1,242 @@
+"""Word error rate engine for Reference/ModelOutput pairs.
+
+Transcripts are normalized (markup such as <noise>, [breathing] and {light}
+removed, punctuation stripped, Unicode NFC) and split on whitespace. Edit
+distance is computed for whole batches of pairs at once: pairs are padded
+into integer arrays and the DP advances one reference word per step for the
+entire batch, with insertions resolved by a cumulative-minimum scan.
+"""
+import json
+import argparse
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# <noise>, </noise>, <\noise>, [breathing], {light}: annotations, not speech
+_MARKUP = re.compile(r"<[^>]*>|\[[^\]]*\]|\{[^}]*\}")
+# Latin and Indic punctuation (danda, double danda, abbreviation sign)
+_PUNCTUATION = re.compile(r"[।॥॰!\"#$%&'()*+,\-./:;=?@\\^_`|~‘’“”–—…]")
+
+_BATCH_SIZE = 256
+
+# Alignment operations
+HIT, SUBSTITUTION, DELETION, INSERTION = 'hit', 'sub', 'del', 'ins'
+
+
+def normalize(text: str) -> str:
+    """Normalize a transcript for scoring"""
+    text = unicodedata.normalize('NFC', text or '')
+    text = _MARKUP.sub(' ', text)
+    text = _PUNCTUATION.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized words of a transcript"""
+    return normalize(text).split()
+
+
+def _encode(token_lists: Sequence[List[str]], vocab: Dict[str, int], pad: int) -> np.ndarray:
+    width = max((len(tokens) for tokens in token_lists), default=0)
+    encoded = np.full((len(token_lists), width), pad, dtype=np.int64)
+    for row, tokens in enumerate(token_lists):
+        encoded[row, :len(tokens)] = [vocab.setdefault(token, len(vocab)) for token in tokens]
+    return encoded
+
+
+def _distance_matrices(refs: np.ndarray, hyps: np.ndarray) -> np.ndarray:
+    """Levenshtein DP tables [batch, ref_len + 1, hyp_len + 1] for padded pairs
+
+    Cells beyond a pair's own lengths hold garbage but never influence the
+    cells inside them.
+    """
+    batch, n = refs.shape
+    m = hyps.shape[1]
+    columns = np.arange(m + 1)
+    dp = np.empty((batch, n + 1, m + 1), dtype=np.int32)
+    dp[:, 0, :] = columns
+    for i in range(1, n + 1):
+        previous = dp[:, i - 1, :]
+        substitute = previous[:, :-1] + (refs[:, i - 1, None] != hyps)
+        delete = previous[:, 1:] + 1
+        row = np.empty((batch, m + 1), dtype=np.int32)
+        row[:, 0] = i
+        row[:, 1:] = np.minimum(substitute, delete)
+        # cur[j] = min(row[j], cur[j - 1] + 1) for all j at once
+        dp[:, i, :] = np.minimum.accumulate(row - columns, axis=1) + columns
+    return dp
+
+
+def _backtrace(dp: np.ndarray, ref: List[str], hyp: List[str], with_ops: bool):
+    i, j = len(ref), len(hyp)
+    counts = {SUBSTITUTION: 0, DELETION: 0, INSERTION: 0}
+    ops = []
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and dp[i, j] == dp[i - 1, j - 1] + (ref[i - 1] != hyp[j - 1]):
+            op = HIT if ref[i - 1] == hyp[j - 1] else SUBSTITUTION
+            if with_ops:
+                ops.append((op, ref[i - 1], hyp[j - 1]))
+            i, j = i - 1, j - 1
+        elif i > 0 and dp[i, j] == dp[i - 1, j] + 1:
+            op = DELETION
+            if with_ops:
+                ops.append((op, ref[i - 1], None))
+            i -= 1
+        else:
+            op = INSERTION
+            if with_ops:
+                ops.append((op, None, hyp[j - 1]))
+            j -= 1
+        if op != HIT:
+            counts[op] += 1
+    ops.reverse()
+    return counts, ops
+
+
+def _score(counts: Dict[str, int], ref_words: int) -> Dict[str, Any]:
+    errors = counts[SUBSTITUTION] + counts[DELETION] + counts[INSERTION]
+    return {
+        'Substitutions': counts[SUBSTITUTION],
+        'Deletions': counts[DELETION],
+        'Insertions': counts[INSERTION],
+        'Errors': errors,
+        'ReferenceWords': ref_words,
+        'WER': wer_percent(errors, ref_words),
+    }
+
+
+def wer_percent(errors: int, ref_words: int) -> float:
+    if ref_words == 0:
+        return 0.0 if errors == 0 else 100.0
+    return 100.0 * errors / ref_words
+
+
+def score_pairs(pairs: Iterable[Tuple[str, str]], with_alignment: bool = False) -> List[Dict[str, Any]]:
+    """Score (reference, hypothesis) pairs in batches
+
+    Returns one dict per pair with Substitutions, Deletions, Insertions,
+    Errors, ReferenceWords and WER (percent), plus the word Alignment as
+    (op, ref_word, hyp_word) tuples when `with_alignment` is set.
+    """
+    tokenized = [(tokenize(ref), tokenize(hyp)) for ref, hyp in pairs]
+    results: List[Dict[str, Any]] = [None] * len(tokenized)
+    # Similar lengths share a batch to keep padding small
+    order = sorted(range(len(tokenized)), key=lambda k: (len(tokenized[k][0]), len(tokenized[k][1])))
+    vocab: Dict[str, int] = {}
+    for start in range(0, len(order), _BATCH_SIZE):
+        batch = order[start:start + _BATCH_SIZE]
+        refs = _encode([tokenized[k][0] for k in batch], vocab, pad=-1)
+        hyps = _encode([tokenized[k][1] for k in batch], vocab, pad=-2)
+        dp = _distance_matrices(refs, hyps)
+        for row, k in enumerate(batch):
+            ref, hyp = tokenized[k]
+            counts, ops = _backtrace(dp[row], ref, hyp, with_alignment)
+            results[k] = _score(counts, len(ref))
+            if with_alignment:
+                results[k]['Alignment'] = ops
+    return results
+
+
+def combine_scores(scores: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pool the counts of several scores into one"""
+    counts = {SUBSTITUTION: 0, DELETION: 0, INSERTION: 0}
+    ref_words = 0
+    for score in scores:
+        counts[SUBSTITUTION] += score['Substitutions']
+        counts[DELETION] += score['Deletions']
+        counts[INSERTION] += score['Insertions']
+        ref_words += score['ReferenceWords']
+    return _score(counts, ref_words)
+
+
+def score_results(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Score every sample of {model: {district: {WER, Samples}}} results
+
+    Returns {model: {'total': score, 'districts': {district: {'total': score,
+    'samples': {sample_id: score}}}}}. District and model scores pool words
+    across samples rather than averaging sample WERs. Districts without
+    samples are left out.
+    """
+    keys, pairs = [], []
+    for model, districts in data.items():
+        for district, district_data in districts.items():
+            for sample_id, sample in district_data.get('Samples', {}).items():
+                keys.append((model, district, sample_id))
+                pairs.append((sample.get('Reference', ''), sample.get('ModelOutput', '')))
+
+    scored: Dict[str, Any] = {}
+    for (model, district, sample_id), score in zip(keys, score_pairs(pairs)):
+        model_scores = scored.setdefault(model, {'districts': {}})
+        district_scores = model_scores['districts'].setdefault(district, {'samples': {}})
+        district_scores['samples'][sample_id] = score
+
+    for model_scores in scored.values():
+        for district_scores in model_scores['districts'].values():
+            district_scores['total'] = combine_scores(district_scores['samples'].values())
+        model_scores['total'] = combine_scores(d['total'] for d in model_scores['districts'].values())
+    return scored
+
+
+def apply_scores(data: Dict[str, Any], scored: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of `data` with recomputed WER and error counts written in"""
+    fields = ('Substitutions', 'Deletions', 'Insertions', 'ReferenceWords')
+    updated = {}
+    for model, districts in data.items():
+        updated[model] = {}
+        for district, district_data in districts.items():
+            district_scores = scored.get(model, {}).get('districts', {}).get(district)
+            if district_scores is None:
+                updated[model][district] = district_data
+                continue
+            total = district_scores['total']
+            record = dict(district_data, WER=f"{total['WER']:.2f}", **{k: total[k] for k in fields})
+            record['Samples'] = {
+                sample_id: dict(sample, WER=round(district_scores['samples'][sample_id]['WER'], 2),
+                                **{k: district_scores['samples'][sample_id][k] for k in fields})
+                for sample_id, sample in district_data['Samples'].items()
+            }
+            updated[model][district] = record
+    return updated
+
+
+def rescore_file(json_file_path, output_file_path):
+    try:
+        # Read the JSON file
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        scored = score_results(data)
+
+        # Write the rescored data to the output file
+        with open(output_file_path, 'w', encoding='utf-8') as f:
+            json.dump(apply_scores(data, scored), f, ensure_ascii=False, indent=4)
+
+        for model, model_scores in scored.items():
+            total = model_scores['total']
+            print(f"{model}: WER {total['WER']:.2f}% over {total['ReferenceWords']} words "
+                  f"(S={total['Substitutions']}, D={total['Deletions']}, I={total['Insertions']})")
+        print(f"Rescored data written to {output_file_path}")
+        return True
+
+    except FileNotFoundError:
+        print(f"Error: File '{json_file_path}' not found")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: '{json_file_path}' contains invalid JSON format")
+        return False
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return False
+
+# Command line argument parsing
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Recompute WER for every Reference/ModelOutput pair in a results JSON file')
+    parser.add_argument('input_json', help='Path to the input JSON file')
+    parser.add_argument('output_json', help='Path to the output JSON file')
+
+    args = parser.parse_args()
+
+    # Call the function with the provided file paths
+    rescore_file(args.input_json, args.output_json)